@@ -0,0 +1,51 @@
+# alembic/versions/9d0e1f2a3b4c_add_generation_jobs.py
+"""add_generation_jobs
+
+Revision ID: 9d0e1f2a3b4c
+Revises: 8c9d0e1f2a3b
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = '9d0e1f2a3b4c'
+down_revision = '8c9d0e1f2a3b'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    job_status = sa.Enum('PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus')
+    job_status.create(op.get_bind())
+
+    op.create_table('generation_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('frequency', postgresql.ENUM('HOURLY', 'DAILY', name='updatefrequency', create_type=False), nullable=False),
+        sa.Column('user_ids', sa.JSON(), nullable=False),
+        sa.Column('priority', sa.String(), nullable=False, server_default='scheduled'),
+        sa.Column('fire_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('dedupe_key', sa.String(), nullable=True),
+        sa.Column('status', postgresql.ENUM('PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus', create_type=False), nullable=False, server_default='PENDING'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_by', sa.String(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dedupe_key')
+    )
+    op.create_index(op.f('ix_generation_jobs_id'), 'generation_jobs', ['id'])
+    op.create_index('ix_generation_jobs_status_run_after', 'generation_jobs', ['status', 'run_after'])
+
+def downgrade():
+    op.drop_index('ix_generation_jobs_status_run_after', table_name='generation_jobs')
+    op.drop_index(op.f('ix_generation_jobs_id'), table_name='generation_jobs')
+    op.drop_table('generation_jobs')
+
+    job_status = sa.Enum(name='jobstatus')
+    job_status.drop(op.get_bind())
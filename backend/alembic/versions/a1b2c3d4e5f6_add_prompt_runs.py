@@ -0,0 +1,40 @@
+# alembic/versions/a1b2c3d4e5f6_add_prompt_runs.py
+"""add_prompt_runs
+
+Revision ID: a1b2c3d4e5f6
+Revises: 9d0e1f2a3b4c
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'a1b2c3d4e5f6'
+down_revision = '9d0e1f2a3b4c'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('prompt_runs',
+        sa.Column('prompt_id', sa.Integer(), nullable=False),
+        sa.Column('frequency', postgresql.ENUM('HOURLY', 'DAILY', name='updatefrequency', create_type=False), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['prompt_id'], ['prompts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('prompt_id', 'frequency')
+    )
+
+    # Seed from existing news so the first start does not see every prompt as missed
+    op.execute("""
+        INSERT INTO prompt_runs (prompt_id, frequency, last_run_at)
+        SELECT prompt_id, frequency, MAX(created_at) FROM news GROUP BY prompt_id, frequency
+    """)
+
+    op.add_column('generation_jobs', sa.Column('prompt_ids', sa.JSON(), nullable=True))
+    op.add_column('generation_jobs', sa.Column('window_start', sa.DateTime(timezone=True), nullable=True))
+
+def downgrade():
+    op.drop_column('generation_jobs', 'window_start')
+    op.drop_column('generation_jobs', 'prompt_ids')
+    op.drop_table('prompt_runs')
@@ -0,0 +1,35 @@
+# alembic/versions/b2c3d4e5f6a7_add_news_listing_indexes.py
+"""add_news_listing_indexes
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = 'b2c3d4e5f6a7'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns). Every news listing orders by (created_at, id) DESC;
+# a b-tree is scanned backwards for that, so ascending columns suffice.
+INDEXES = [
+    ('ix_news_created_at_id', 'news', ['created_at', 'id']),  # public/visible feeds
+    ('ix_news_prompt_id_created_at', 'news', ['prompt_id', 'created_at', 'id']),  # per-prompt pages, FK cascades
+    ('ix_news_frequency_created_at', 'news', ['frequency', 'created_at', 'id']),  # frequency-filtered feeds
+    ('ix_prompts_visibility', 'prompts', ['visibility']),
+]
+
+def upgrade():
+    # Build without blocking writes to news; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,36 @@
+# alembic/versions/c3d4e5f6a7b8_add_news_counts.py
+"""add_news_counts
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('news_counts',
+        sa.Column('prompt_id', sa.Integer(), nullable=False),
+        sa.Column('frequency', postgresql.ENUM('HOURLY', 'DAILY', name='updatefrequency', create_type=False), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['prompt_id'], ['prompts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('prompt_id', 'frequency')
+    )
+
+    # Lock news while seeding so no row is counted twice or missed
+    op.execute("LOCK TABLE news IN SHARE MODE")
+    op.execute("""
+        INSERT INTO news_counts (prompt_id, frequency, total)
+        SELECT prompt_id, frequency, COUNT(*) FROM news GROUP BY prompt_id, frequency
+    """)
+
+def downgrade():
+    op.drop_table('news_counts')
@@ -0,0 +1,22 @@
+# alembic/versions/d4e5f6a7b8c9_add_generation_job_batch_id.py
+"""add_generation_job_batch_id
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('generation_jobs', sa.Column('batch_id', sa.String(), nullable=True))
+
+def downgrade():
+    op.drop_column('generation_jobs', 'batch_id')
@@ -0,0 +1,33 @@
+# alembic/versions/e5f6a7b8c9d0_add_prompt_listing_indexes.py
+"""add_prompt_listing_indexes
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns). Prompt listings page by (created_at, id) DESC.
+INDEXES = [
+    ('ix_prompts_user_id_created_at_id', 'prompts', ['user_id', 'created_at', 'id']),  # own prompts
+    ('ix_prompts_visibility_created_at_id', 'prompts', ['visibility', 'created_at', 'id']),  # public/internal
+    ('ix_prompts_created_at_id', 'prompts', ['created_at', 'id']),  # own, internal and public together
+]
+
+def upgrade():
+    # Build without blocking writes to prompts; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
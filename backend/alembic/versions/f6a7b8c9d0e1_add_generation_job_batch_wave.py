@@ -0,0 +1,25 @@
+# alembic/versions/f6a7b8c9d0e1_add_generation_job_batch_wave.py
+"""add_generation_job_batch_wave
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        'generation_jobs',
+        sa.Column('batch_wave', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+
+def downgrade():
+    op.drop_column('generation_jobs', 'batch_wave')
@@ -0,0 +1,72 @@
+# app/api/v1/endpoints/admin.py
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_superuser
+from app.core.database import get_db
+from app.core.metrics import metrics
+from app.models.user import User
+from app.services.job_queue import GenerationJobQueue
+from app.services.scheduler import schedule_snapshot
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/scheduler")
+async def get_scheduler_status(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Upcoming fire times and queued jobs to list"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser)
+) -> Dict[str, Any]:
+    """
+    Upcoming fire times, wave forecasts and generation queue state.
+
+    Fire times and waves are derived from the users and generation_jobs
+    tables, so they are reported the same whichever process is the
+    scheduler leader (e.g. `python -m app.worker`).
+    """
+    try:
+        scheduler = getattr(request.app.state, "scheduler", None)
+        election = getattr(request.app.state, "scheduler_election", None)
+        schedule = schedule_snapshot(db, limit)
+
+        job_queue = GenerationJobQueue(db)
+        jobs = [
+            {
+                "id": job.id,
+                "frequency": job.frequency.value,
+                "status": job.status.value,
+                "priority": job.priority,
+                "fire_at": job.fire_at.isoformat() if job.fire_at else None,
+                "run_after": job.run_after.isoformat(),
+                "users": len(job.user_ids),
+                "prompts": len(job.prompt_ids) if job.prompt_ids is not None else None,
+                "attempts": job.attempts,
+                "locked_by": job.locked_by,
+                "last_error": job.last_error
+            }
+            for job in job_queue.upcoming(limit)
+        ]
+
+        return {
+            "scheduler_running": scheduler.running if scheduler else False,
+            "scheduler_leader": election.is_leader if election else False,
+            "spread_window": schedule["spread_window"],
+            "upcoming": schedule["upcoming"],
+            "waves": schedule["waves"],
+            "queue": job_queue.depth(),
+            "jobs": jobs,
+            "metrics": metrics.snapshot()
+        }
+
+    except Exception as e:
+        logger.error(f"Error reading scheduler status: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error reading scheduler status"
+        )
@@ -1,8 +1,10 @@
 # app/api/v1/endpoints/news.py
 from typing import List, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Path, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
+import json
 
 from app.core.database import get_db
 from app.models.news import News, UpdateFrequency
@@ -21,10 +23,19 @@ from app.core.auth import (
     is_public_path
 )
 from app.services.news import NewsService
+from app.services.news_counts import CountMode
 from app.services.rss import RSSService
+from app.services.llm_queue import JobPriority
+from app.utils.helpers import Deadline
+from app.config.settings import get_settings
 
+settings = get_settings()
 router = APIRouter()
 
+def _sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 # Public Routes
 @router.get(
     "/public",
@@ -38,6 +49,13 @@ async def list_public_news(
     limit: int = Query(100, ge=1, le=100),
     prompt_id: Optional[int] = None,
     frequency: Optional[UpdateFrequency] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over skip"),
+    include_total: bool = Query(True, description="Return the total number of matching items"),
+    count_mode: CountMode = Query(
+        CountMode.CACHED,
+        description="How total is computed: exact (COUNT(*)), cached (maintained counters, "
+                    "briefly cached) or estimated (query planner estimate)"
+    ),
     db: Session = Depends(get_db)
 ) -> Any:
     """Get list of news from public prompts."""
@@ -50,7 +68,10 @@ async def list_public_news(
             skip=skip,
             limit=limit,
             prompt_id=prompt_id,
-            frequency=frequency
+            frequency=frequency,
+            cursor=cursor,
+            include_total=include_total,
+            count_mode=count_mode
         )
     except HTTPException as e:
         raise e
@@ -69,6 +90,13 @@ async def get_news_by_prompt_path(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     frequency: Optional[UpdateFrequency] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over skip"),
+    include_total: bool = Query(True, description="Return the total number of matching items"),
+    count_mode: CountMode = Query(
+        CountMode.CACHED,
+        description="How total is computed: exact (COUNT(*)), cached (maintained counters, "
+                    "briefly cached) or estimated (query planner estimate)"
+    ),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(public_route_optional_auth)
 ) -> Any:
@@ -81,7 +109,10 @@ async def get_news_by_prompt_path(
             current_user=current_user,
             skip=skip,
             limit=limit,
-            frequency=frequency
+            frequency=frequency,
+            cursor=cursor,
+            include_total=include_total,
+            count_mode=count_mode
         )
     except HTTPException as e:
         raise e
@@ -128,6 +159,13 @@ async def get_news(
     frequency: Optional[UpdateFrequency] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over skip"),
+    include_total: bool = Query(True, description="Return the total number of matching items"),
+    count_mode: CountMode = Query(
+        CountMode.CACHED,
+        description="How total is computed: exact (COUNT(*)), cached (maintained counters, "
+                    "briefly cached) or estimated (query planner estimate)"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -139,7 +177,10 @@ async def get_news(
             prompt_id=prompt_id,
             frequency=frequency,
             skip=skip,
-            limit=limit
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+            count_mode=count_mode
         )
     except HTTPException as e:
         raise e
@@ -172,7 +213,9 @@ async def create_news(
             news_service.generate_news,
             prompt_id=news_in.prompt_id,
             frequency=news_in.frequency,
-            feeds=feeds
+            feeds=feeds,
+            priority=JobPriority.INTERACTIVE,
+            deadline=Deadline(settings.NEWS_GENERATION_TIMEOUT_INTERACTIVE)
         )
 
         return {
@@ -190,6 +233,50 @@ async def create_news(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post(
+    "/stream",
+    dependencies=[Depends(get_current_active_user)],
+    summary="Stream News Generation",
+    description="Generate news and stream LLM tokens as server-sent events. The final item is stored."
+)
+async def stream_news(
+    news_in: NewsCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> StreamingResponse:
+    """Generate news on demand, relaying tokens as they arrive."""
+    news_service = NewsService(db)
+    rss_service = RSSService()
+
+    # Verify prompt access before the stream starts so errors keep their status code
+    prompt_id = news_service.verify_prompt_access(news_in.prompt_id, current_user).id
+    # The stream outlives this check by the feed fetch and the whole
+    # generation: return the connection now rather than when it ends
+    db.close()
+
+    async def event_stream():
+        # Emit immediately so clients get their first byte before feeds are fetched
+        yield _sse_event("status", {"status": "fetching_feeds", "prompt_id": prompt_id})
+        deadline = Deadline(settings.NEWS_GENERATION_TIMEOUT_INTERACTIVE)
+        try:
+            feeds = await rss_service.fetch_feeds()
+            yield _sse_event("status", {"status": "generating", "prompt_id": prompt_id})
+            async for event in news_service.stream_news(
+                prompt_id=news_in.prompt_id,
+                frequency=news_in.frequency,
+                feeds=feeds,
+                deadline=deadline
+            ):
+                yield _sse_event(event["event"], event["data"])
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get(
     "/{news_id}",
     response_model=NewsResponse,
@@ -50,10 +50,12 @@ def get_prompt_service_public(db: Session = Depends(get_db)) -> PromptService:
 )
 async def list_public_prompts(
     request: Request,
+    response: Response,
     prompt_service: PromptService = Depends(get_prompt_service_public),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, le=100),
-    search: Optional[str] = Query(None, min_length=1)
+    search: Optional[str] = Query(None, min_length=1),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; takes precedence over skip"),
 ) -> Any:
     """Get list of public prompts. No authentication required."""
     try:
@@ -62,11 +64,14 @@ async def list_public_prompts(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access forbidden"
             )
-        prompts = prompt_service.get_public_prompts(
+        prompts, next_cursor = prompt_service.get_public_prompts(
             skip=skip,
             limit=limit,
-            search=search
+            search=search,
+            cursor=cursor
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return prompts
     except HTTPException as e:
         raise e
@@ -168,24 +173,29 @@ async def create_prompt(
     description="Get list of prompts for current user. Requires authentication."
 )
 async def list_prompts(
+    response: Response,
     prompt_service: PromptService = Depends(get_prompt_service),
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, le=100),
     search: Optional[str] = Query(None, min_length=1),
     include_internal: bool = Query(True, description="Include internal prompts from other users"),
-    include_public: bool = Query(True, description="Include public prompts from other users")
+    include_public: bool = Query(True, description="Include public prompts from other users"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; takes precedence over skip"),
 ) -> Any:
     """Get list of prompts for current user including internal and public prompts based on preferences."""
     try:
-        prompts = prompt_service.get_prompts(
+        prompts, next_cursor = prompt_service.get_prompts(
             user=current_user,
             skip=skip,
             limit=limit,
             search=search,
             include_internal=include_internal,
-            include_public=include_public
+            include_public=include_public,
+            cursor=cursor
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return prompts
     except HTTPException as e:
         raise e
@@ -203,20 +213,25 @@ async def list_prompts(
     description="Get list of internal prompts from other users. Requires authentication."
 )
 async def list_internal_prompts(
+    response: Response,
     prompt_service: PromptService = Depends(get_prompt_service),
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, le=100),
-    search: Optional[str] = Query(None, min_length=1)
+    search: Optional[str] = Query(None, min_length=1),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; takes precedence over skip"),
 ) -> Any:
     """Get list of internal prompts from other users."""
     try:
-        prompts = prompt_service.get_internal_prompts(
+        prompts, next_cursor = prompt_service.get_internal_prompts(
             user=current_user,
             skip=skip,
             limit=limit,
-            search=search
+            search=search,
+            cursor=cursor
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return prompts
     except HTTPException as e:
         raise e
@@ -226,6 +241,52 @@ async def list_internal_prompts(
             detail=str(e)
         )
 
+@router.get(
+    "/with-stats",
+    response_model=List[PromptWithStats],
+    dependencies=[Depends(get_current_active_user)],
+    summary="List User Prompts with Statistics",
+    description="Same listing as `GET /prompts/`, with news statistics for every prompt. Requires authentication."
+)
+async def list_prompts_with_stats(
+    response: Response,
+    prompt_service: PromptService = Depends(get_prompt_service),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, le=100),
+    search: Optional[str] = Query(None, min_length=1),
+    include_internal: bool = Query(True, description="Include internal prompts from other users"),
+    include_public: bool = Query(True, description="Include public prompts from other users"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; takes precedence over skip")
+) -> Any:
+    """Get a page of prompts with their news statistics, computed for the whole page in one query."""
+    try:
+        prompts, next_cursor = prompt_service.get_prompts(
+            user=current_user,
+            skip=skip,
+            limit=limit,
+            search=search,
+            include_internal=include_internal,
+            include_public=include_public,
+            cursor=cursor
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [
+            PromptWithStats(
+                **PromptSchema.model_validate(item["prompt"]).model_dump(),
+                news_count=item["news_count"]
+            )
+            for item in prompt_service.with_news_stats(prompts)
+        ]
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
 @router.get(
     "/{prompt_id}",
     response_model=PromptWithStats,
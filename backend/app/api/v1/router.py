@@ -10,7 +10,7 @@ settings = get_settings()
 api_router = APIRouter()
 
 # Import endpoint modules after router creation
-from app.api.v1.endpoints import auth, users, prompts, news
+from app.api.v1.endpoints import auth, users, prompts, news, admin
 
 # Standard error responses
 common_responses: Dict[int, Dict[str, str]] = {
@@ -72,6 +72,17 @@ api_router.include_router(
     }
 )
 
+# Include admin router (superusers only)
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"],
+    responses={
+        **common_responses,
+        200: {"description": "Successful admin operation"}
+    }
+)
+
 @api_router.get(
     "/health",
     tags=["health"],
@@ -2,6 +2,8 @@
 from typing import List, Optional, Dict, Any
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+import os
+import tempfile
 
 class Settings(BaseSettings):
     # Base Configuration
@@ -20,6 +22,16 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5432"
     POSTGRES_DB: str
     DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a pooled connection is replaced
+    # Short background sessions (see job_session) open at once per kind of work;
+    # keep the sum below DB_POOL_SIZE + DB_MAX_OVERFLOW so API requests always get a connection
+    DB_BACKGROUND_SESSIONS: int = 4
+    DB_SCHEDULER_SESSIONS: int = 2
+    # Requests running more queries than this are logged and counted (see X-Query-Count)
+    DB_QUERY_BUDGET: int = 20
     
     # JWT Configuration
     SECRET_KEY: str
@@ -35,10 +47,92 @@ class Settings(BaseSettings):
     ]
     
     # LLM Configuration
+    LLM_PROVIDER: str = "openai"  # openai (any OpenAI-compatible server) or mock
+    LLM_API_BASE: str = "https://api.openai.com/v1"
     LLM_MODEL: str = "gpt-3.5-turbo"
     LLM_API_KEY: str
     LLM_MAX_TOKENS: int = 1000
     LLM_TEMPERATURE: float = 0.7
+    # Model routing: the first matching route serves a request, LLM_MODEL the rest. Each
+    # route is a JSON object with "model" plus optional "name", "max_tokens",
+    # "max_input_tokens", "frequencies", "template_types", "requests_per_minute",
+    # "tokens_per_minute" and "encoding", e.g.
+    # [{"model": "gpt-4o-mini", "max_input_tokens": 4000, "frequencies": ["hourly"], "max_tokens": 600}]
+    # Routes on the same model share its rate limits, so they must not set different ones.
+    LLM_ROUTES: List[Dict[str, Any]] = []
+    # Per-call HTTP limits (seconds)
+    LLM_CONNECT_TIMEOUT: float = 10.0
+    LLM_READ_TIMEOUT: float = 60.0
+    LLM_TOTAL_TIMEOUT: float = 120.0
+    # Combine prompts sharing a frequency and article window into one request
+    LLM_BATCH_PROMPTS: bool = True
+    LLM_BATCH_MAX_PROMPTS: int = 5
+    LLM_BATCH_MAX_OUTPUT_TOKENS: int = 4096
+    # Send daily digests through the provider's offline Batch API instead of chat completions
+    LLM_DAILY_BATCH_MODE: bool = False
+    # Whether LLM_API_BASE serves /files and /batches; unset means only for api.openai.com
+    LLM_API_BATCHES: Optional[bool] = None
+    LLM_BATCH_COLLECT_SECONDS: float = 300.0  # a daily batch wave is submitted every this many seconds
+    LLM_BATCH_POLL_INTERVAL: float = 60.0
+    LLM_BATCH_MAX_WAIT: float = 24 * 3600.0  # then fall back to synchronous generation
+    # Whole-generation deadlines (seconds) set by each kind of caller
+    NEWS_GENERATION_TIMEOUT_INTERACTIVE: float = 180.0
+    NEWS_GENERATION_TIMEOUT_SCHEDULED: float = 900.0
+    LLM_REQUESTS_PER_MINUTE: int = 50
+    LLM_TOKENS_PER_MINUTE: int = 15000  # OpenAI's TPM limit
+    # "auto" = redis when REDIS_URL is set, otherwise the host-local sqlite ledger
+    LLM_RATE_LIMIT_BACKEND: str = "auto"  # auto, local, sqlite, redis
+    LLM_RATE_LIMIT_PATH: str = os.path.join(tempfile.gettempdir(), "whatsnews_ratelimit.db")
+    # Adaptive (AIMD) bounds on in-flight LLM requests
+    LLM_INITIAL_CONCURRENCY: int = 4
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 16
+    # Head start (seconds) interactive requests get over each lower priority class
+    LLM_PRIORITY_OFFSET_SCHEDULED: float = 60.0
+    LLM_PRIORITY_OFFSET_BACKFILL: float = 300.0
+    # Share of each shared rate-limit bucket scheduled and backfill work leaves
+    # for interactive requests, whichever process they come from
+    LLM_INTERACTIVE_RESERVE: float = 0.2
+
+    # Run the scheduler / generation worker inside the API process. Turn both off
+    # when they run separately via `python -m app.worker`
+    SCHEDULER_ENABLED: bool = True
+    GENERATION_WORKER_ENABLED: bool = True
+    # Port `python -m app.worker` serves Prometheus /metrics on (0 to disable)
+    WORKER_METRICS_PORT: int = 9100
+    # Seconds between leader-lock attempts (standbys) and liveness checks (leader)
+    SCHEDULER_LEADER_CHECK_INTERVAL: float = 15.0
+
+    # Spread each hour's runs over a window instead of firing everyone at :00
+    SCHEDULER_SPREAD_WINDOW: float = 900.0  # seconds
+    SCHEDULER_SPREAD_SLOTS: int = 15  # distinct offsets; users sharing one form one cohort
+    SCHEDULER_MAX_SPREAD_WINDOW: float = 3000.0  # the window may grow to fit the LLM budget up to this
+    SCHEDULER_WAVE_TOKENS_PER_REQUEST: int = 3000  # for planning waves against LLM_TOKENS_PER_MINUTE
+    SCHEDULER_METRICS_INTERVAL: float = 60.0  # seconds between gauge updates and wave-completion checks
+
+    # Missed-run catch-up at scheduler start
+    SCHEDULER_CATCHUP_GRACE: float = 1800.0  # runs younger than this may still be queued
+    SCHEDULER_CATCHUP_JOB_SIZE: int = 50  # prompts per catch-up job
+    SCHEDULER_CATCHUP_STAGGER: float = 30.0  # seconds between catch-up job releases
+
+    # List totals served from news_counts (count_mode=cached) stay this fresh
+    NEWS_COUNT_CACHE_TTL: float = 30.0  # seconds
+    NEWS_COUNT_CACHE_SIZE: int = 10000  # cached filter combinations
+
+    # Durable generation jobs (generation_jobs table) and the workers claiming them
+    GENERATION_JOB_LEASE_SECONDS: int = 300  # renewed every third of this while running
+    GENERATION_JOB_MAX_ATTEMPTS: int = 5
+    GENERATION_JOB_RETRY_BASE: float = 30.0  # seconds, doubled per failed attempt
+    GENERATION_JOB_RETRY_CAP: float = 1800.0
+    GENERATION_WORKER_CONCURRENCY: int = 4  # jobs one worker runs at a time
+    GENERATION_WORKER_POLL_INTERVAL: float = 5.0
+
+    # Mock LLM provider (LLM_PROVIDER=mock) for offline benchmarks
+    LLM_MOCK_LATENCY: float = 0.5  # seconds before the first token
+    LLM_MOCK_TOKENS_PER_SECOND: float = 50.0
+    LLM_MOCK_REQUESTS_PER_MINUTE: int = 0  # simulate 429s above this rate, 0 = off
+    LLM_MOCK_RATE_LIMIT_EVERY: int = 0  # simulate a 429 on every Nth request, 0 = off
+    LLM_MOCK_BATCH_LATENCY: float = 5.0  # seconds until a mock batch job completes
     
     # Cache Configuration
     REDIS_URL: Optional[str] = None
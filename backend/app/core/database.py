@@ -1,25 +1,59 @@
 # app/core/database.py
-from sqlalchemy import create_engine
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Iterator
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import QueuePool
 from app.config.settings import get_settings
+from app.core.metrics import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Kind of work the current session belongs to, for labelling pool waits
+_session_kind: ContextVar[str] = ContextVar("session_kind", default="request")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe("db_checkout_wait_seconds", time.monotonic() - started, {"kind": _session_kind.get()})
+
+
 # Create the SQLAlchemy engine
 engine = create_engine(
     settings.get_database_url(),
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
     pool_pre_ping=True,
     echo=settings.DEBUG
 )
 
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    metrics.set_gauge("db_pool_checked_out", engine.pool.checkedout())
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    metrics.set_gauge("db_pool_checked_out", engine.pool.checkedout())
+
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -37,15 +71,67 @@ def get_db() -> Session:
     finally:
         db.close()
 
+
+@contextmanager
+def session_scope(kind: str = "request") -> Iterator[Session]:
+    """
+    Short-lived session: committed on success, rolled back on error, always closed.
+
+    The session checks a connection out on its first query and returns it on
+    each commit, so a caller that commits before awaiting network I/O holds
+    no connection while it waits. Pool waits are recorded under `kind`.
+    """
+    token = _session_kind.set(kind)
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        _session_kind.reset(token)
+
+
+# Sessions each kind of background work may hold at once; scheduler
+# bookkeeping has its own limit so busy generation never blocks dispatch
+_session_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def _session_limit(kind: str) -> asyncio.Semaphore:
+    if kind not in _session_limits:
+        size = settings.DB_SCHEDULER_SESSIONS if kind == "scheduler" else settings.DB_BACKGROUND_SESSIONS
+        _session_limits[kind] = asyncio.Semaphore(size)
+    return _session_limits[kind]
+
+
+@asynccontextmanager
+async def job_session(kind: str = "job") -> AsyncIterator[Session]:
+    """
+    Session for the database reads and writes of one background step.
+
+    Open it around database work only, never across RSS fetches or LLM
+    calls. Each `kind` has its own limit (DB_SCHEDULER_SESSIONS for the
+    scheduler, DB_BACKGROUND_SESSIONS otherwise); time spent waiting for a
+    slot is recorded per kind, as are pool waits.
+    """
+    started = time.monotonic()
+    async with _session_limit(kind):
+        metrics.observe("db_session_wait_seconds", time.monotonic() - started, {"kind": kind})
+        with session_scope(kind) as db:
+            yield db
+
+
 # Database initialization function
 def init_db() -> None:
     try:
         # Import all models here to ensure they are registered
-        from app.models import user, prompt, news  # noqa: F401
-        
+        from app.models import user, prompt, news, generation_job, prompt_run, news_count  # noqa: F401
+
         # Create all tables
         Base.metadata.create_all(bind=engine)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
-        raise
\ No newline at end of file
+        raise
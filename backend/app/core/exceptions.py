@@ -0,0 +1,5 @@
+# app/core/exceptions.py
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an operation cannot finish before its caller's deadline."""
+    pass
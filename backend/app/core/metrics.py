@@ -0,0 +1,82 @@
+# app/core/metrics.py
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics store.
+
+    Gauges hold the last value set, counters only go up and summaries keep
+    count/sum/max of observed values. Everything is keyed by metric name and
+    an optional set of labels. In the Prometheus output a summary's max is
+    a separate `<name>_max` gauge, since summaries only carry count and sum.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._summaries: Dict[str, Dict[LabelKey, Dict[str, float]]] = {}
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = float(value)
+
+    def inc(self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            summary = series.setdefault(_label_key(labels), {"count": 0, "sum": 0.0, "max": 0.0})
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly copy of every series."""
+        def series(values):
+            return [{"labels": dict(key), "value": value} for key, value in values.items()]
+
+        with self._lock:
+            return {
+                "gauges": {name: series(values) for name, values in self._gauges.items()},
+                "counters": {name: series(values) for name, values in self._counters.items()},
+                "summaries": {name: series(values) for name, values in self._summaries.items()},
+            }
+
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        def fmt(name: str, key: LabelKey, value: float) -> str:
+            labels = ",".join(f'{k}="{v}"' for k, v in key)
+            return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+        lines = []
+        with self._lock:
+            for name, values in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(fmt(name, key, value) for key, value in values.items())
+            for name, values in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(fmt(f"{name}_total", key, value) for key, value in values.items())
+            for name, values in sorted(self._summaries.items()):
+                lines.append(f"# TYPE {name} summary")
+                for key, summary in values.items():
+                    lines.append(fmt(f"{name}_count", key, summary["count"]))
+                    lines.append(fmt(f"{name}_sum", key, summary["sum"]))
+                lines.append(f"# TYPE {name}_max gauge")
+                lines.extend(fmt(f"{name}_max", key, summary["max"]) for key, summary in values.items())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
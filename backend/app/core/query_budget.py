@@ -0,0 +1,47 @@
+# app/core/query_budget.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+
+from app.core.database import engine
+
+
+class QueryCounter:
+    """Statements executed by the code running under `count_queries()`."""
+
+    def __init__(self):
+        self.count = 0
+
+
+# A mutable holder, so threads and tasks started from a copy of the context
+# (FastAPI's threadpool, BaseHTTPMiddleware's call_next) count into it too
+_current: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count database statements issued inside the block.
+
+    Used per request by the query-budget middleware, and usable directly to
+    assert that a code path runs a constant number of queries:
+
+        with count_queries() as queries:
+            service.get_public_news(limit=50)
+        assert queries.count <= 2
+    """
+    counter = QueryCounter()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
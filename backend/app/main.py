@@ -2,12 +2,17 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from app.config.settings import get_settings
 from app.core.database import init_db
-from app.services.scheduler import NewsScheduler
-from app.core.database import get_db
+from app.core.metrics import metrics
+from app.core.query_budget import count_queries
+from app.services.job_queue import publish_queue_depth
+from app.services.leader import LeaderElector
+from app.services.scheduler import NewsScheduler, elect_scheduler
+from app.services.generation_worker import GenerationWorker
+from app.services.llm import llm_service
 import logging
 import time
 from typing import Union
@@ -24,6 +29,8 @@ settings = get_settings()
 
 # Initialize scheduler
 scheduler: Union[NewsScheduler, None] = None
+scheduler_election: Union[LeaderElector, None] = None
+worker: Union[GenerationWorker, None] = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -34,10 +41,19 @@ async def lifespan(app: FastAPI):
     init_db()
     
     # Initialize scheduler
-    global scheduler
-    db = next(get_db())
-    scheduler = NewsScheduler(db)
-    await scheduler.start()
+    # Scheduling and generation can instead run in `python -m app.worker`;
+    # either way only the elected leader among all processes schedules
+    global scheduler, scheduler_election, worker
+    if settings.SCHEDULER_ENABLED:
+        scheduler = NewsScheduler()
+        scheduler_election = elect_scheduler(scheduler)
+        await scheduler_election.start()
+    # The admin endpoints inspect the in-process scheduler, if any
+    app.state.scheduler = scheduler
+    app.state.scheduler_election = scheduler_election
+    if settings.GENERATION_WORKER_ENABLED:
+        worker = GenerationWorker()
+        await worker.start()
     
     logger.info("Application startup complete")
     
@@ -45,8 +61,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application...")
-    if scheduler:
-        await scheduler.stop()
+    if scheduler_election:
+        await scheduler_election.stop()
+    if worker:
+        await worker.stop()
     logger.info("Application shutdown complete")
 
 # Create FastAPI application
@@ -67,6 +85,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],  # prompt list pagination
     )
 
 # Exception handlers
@@ -86,15 +105,40 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
+# Per-request database query budget
+@app.middleware("http")
+async def enforce_query_budget(request: Request, call_next):
+    with count_queries() as queries:
+        response = await call_next(request)
+    response.headers["X-Query-Count"] = str(queries.count)
+    if queries.count > settings.DB_QUERY_BUDGET:
+        route = request.scope.get("route")
+        path = route.path if route else request.url.path
+        metrics.inc("db_query_budget_exceeded", labels={"path": path})
+        logger.warning(
+            f"{request.method} {path} ran {queries.count} queries "
+            f"(budget {settings.DB_QUERY_BUDGET})"
+        )
+    return response
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
         "version": settings.VERSION,
-        "scheduler_running": scheduler.running if scheduler else False
+        "scheduler_running": scheduler.running if scheduler else False,
+        "scheduler_leader": scheduler_election.is_leader if scheduler_election else False,
+        "generation_worker_running": worker.running if worker else False,
+        "llm_rate_limiter": llm_service.get_rate_limit_stats()
     }
 
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    publish_queue_depth()
+    return metrics.render_prometheus()
+
 # Import and include API router
 from app.api.v1.router import api_router
 app.include_router(api_router, prefix=settings.API_V1_STR)
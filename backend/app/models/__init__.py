@@ -3,6 +3,9 @@ from app.models.base import TimestampedModel, Base
 from app.models.user import User
 from app.models.prompt import Prompt
 from app.models.news import News, UpdateFrequency
+from app.models.generation_job import GenerationJob, JobStatus
+from app.models.prompt_run import PromptRun
+from app.models.news_count import NewsCount
 
 __all__ = [
     "Base",
@@ -10,5 +13,9 @@ __all__ = [
     "User",
     "Prompt",
     "News",
-    "UpdateFrequency"
+    "UpdateFrequency",
+    "GenerationJob",
+    "JobStatus",
+    "PromptRun",
+    "NewsCount"
 ]
\ No newline at end of file
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Index, Boolean
+from sqlalchemy.sql import func, false
+from app.models.base import TimestampedModel
+from app.models.news import UpdateFrequency
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"  # waiting for run_after
+    RUNNING = "running"  # leased by a worker until lease_expires_at
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"  # gave up after max_attempts
+
+
+class GenerationJob(TimestampedModel):
+    """A scheduled news generation run for a cohort of users, claimed by workers."""
+    __tablename__ = "generation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    frequency = Column(Enum(UpdateFrequency), nullable=False)
+    user_ids = Column(JSON, nullable=False)
+    prompt_ids = Column(JSON, nullable=True)  # catch-up jobs name their prompts directly
+    window_start = Column(DateTime(timezone=True), nullable=True)  # catch-up content window start
+    batch_id = Column(String, nullable=True)  # provider batch job whose results this job collects
+    batch_wave = Column(Boolean, nullable=False, default=False, server_default=false())  # submits prompt_ids as a daily batch
+    priority = Column(String, nullable=False, default="scheduled")
+    fire_at = Column(DateTime(timezone=True), nullable=True)  # schedule instant the job was created for
+    dedupe_key = Column(String, unique=True, nullable=True)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+    )
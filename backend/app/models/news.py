@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, select
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, Index, select
 from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.ext.hybrid import hybrid_property
 from app.models.base import TimestampedModel
@@ -23,6 +23,14 @@ class News(TimestampedModel):
     # Relationships
     prompt = relationship("Prompt", back_populates="news_items")
 
+    # Listings order by (created_at, id) DESC (b-trees scan backwards for it); the
+    # trailing id keeps filtered listings from sorting ties on created_at
+    __table_args__ = (
+        Index("ix_news_created_at_id", "created_at", "id"),
+        Index("ix_news_prompt_id_created_at", "prompt_id", "created_at", "id"),
+        Index("ix_news_frequency_created_at", "frequency", "created_at", "id"),
+    )
+
     # Hybrid property to get visibility from parent prompt
     @hybrid_property
     def visibility(self):
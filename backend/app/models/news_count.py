@@ -0,0 +1,69 @@
+from sqlalchemy import Column, Integer, ForeignKey, Enum, event, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.util import identity_key
+from app.models.base import Base
+from app.models.news import News, UpdateFrequency
+from app.models.prompt import Prompt
+
+
+class NewsCount(Base):
+    """
+    Number of news rows per (prompt, frequency), so list totals need no COUNT(*).
+
+    Kept current by the ORM events below, in the same transaction as the
+    change. Bulk `query.delete()`/`update()` and raw SQL bypass them;
+    deleting a prompt removes its rows by FK cascade instead.
+    Visibility is the prompt's, so totals per visibility join prompts.
+    """
+    __tablename__ = "news_counts"
+
+    prompt_id = Column(Integer, ForeignKey("prompts.id", ondelete="CASCADE"), primary_key=True)
+    frequency = Column(Enum(UpdateFrequency), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+def _adjust(connection, prompt_id: int, frequency: UpdateFrequency, delta: int) -> None:
+    table = NewsCount.__table__
+    connection.execute(
+        insert(table)
+        .values(prompt_id=prompt_id, frequency=frequency, total=max(delta, 0))
+        .on_conflict_do_update(
+            index_elements=[table.c.prompt_id, table.c.frequency],
+            set_={"total": table.c.total + delta}
+        )
+    )
+
+
+@event.listens_for(News, "after_insert")
+def _count_inserted(mapper, connection, target):
+    _adjust(connection, target.prompt_id, target.frequency, 1)
+
+
+def _prompt_deleted(target: News) -> bool:
+    """True if the item's prompt is deleted in the same flush; its news_counts rows go with it."""
+    session = object_session(target)
+    if session is None:
+        return False
+    prompt = session.identity_map.get(identity_key(Prompt, target.prompt_id))
+    return prompt is not None and prompt in session.deleted
+
+
+@event.listens_for(News, "after_delete")
+def _count_deleted(mapper, connection, target):
+    if not _prompt_deleted(target):
+        _adjust(connection, target.prompt_id, target.frequency, -1)
+
+
+@event.listens_for(News, "after_update")
+def _count_moved(mapper, connection, target):
+    state = inspect(target)
+    prompt_history = state.attrs.prompt_id.history
+    frequency_history = state.attrs.frequency.history
+    if not (prompt_history.deleted or frequency_history.deleted):
+        return
+    old_prompt_id = prompt_history.deleted[0] if prompt_history.deleted else target.prompt_id
+    old_frequency = frequency_history.deleted[0] if frequency_history.deleted else target.frequency
+    if (old_prompt_id, old_frequency) != (target.prompt_id, target.frequency):
+        _adjust(connection, old_prompt_id, old_frequency, -1)
+        _adjust(connection, target.prompt_id, target.frequency, 1)
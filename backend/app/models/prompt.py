@@ -1,5 +1,5 @@
 # app/models/prompt.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.models.base import TimestampedModel
 import enum
@@ -30,16 +30,22 @@ class Prompt(TimestampedModel):
     content = Column(Text, nullable=False)
     template_type = Column(Enum(TemplateType), nullable=False, default=TemplateType.SUMMARY)
     custom_template = Column(Text, nullable=True)  # For custom templates, null means use default template
-    visibility = Column(Enum(VisibilityType), nullable=False, default=VisibilityType.PRIVATE)
+    visibility = Column(Enum(VisibilityType), nullable=False, default=VisibilityType.PRIVATE, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="prompts")
-    news_items = relationship("News", back_populates="prompt", cascade="all, delete-orphan")
+    # Deleting a prompt leaves its news (and news_counts) to the FK cascades
+    # rather than loading and deleting every item
+    news_items = relationship("News", back_populates="prompt", cascade="all, delete-orphan", passive_deletes=True)
 
-    # Unique constraint for user_id + slug combination
+    # Unique constraint for user_id + slug combination; listings page by
+    # (created_at, id) DESC within an owner, a visibility, or across both
     __table_args__ = (
         UniqueConstraint('user_id', 'slug', name='uq_user_prompt_slug'),
+        Index("ix_prompts_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_prompts_visibility_created_at_id", "visibility", "created_at", "id"),
+        Index("ix_prompts_created_at_id", "created_at", "id"),
     )
 
     def generate_slug(self) -> str:
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum
+from app.models.base import Base
+from app.models.news import UpdateFrequency
+
+
+class PromptRun(Base):
+    """Last completed generation per (prompt, frequency), used to detect missed runs."""
+    __tablename__ = "prompt_runs"
+
+    prompt_id = Column(Integer, ForeignKey("prompts.id", ondelete="CASCADE"), primary_key=True)
+    frequency = Column(Enum(UpdateFrequency), primary_key=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=False)
@@ -99,8 +99,9 @@ class PublicNewsResponse(NewsResponse):
 
 
 class NewsListResponse(BaseModel):
-    total: int = Field(..., description="Total number of news items")
+    total: Optional[int] = Field(None, description="Total number of news items (omitted unless include_total)")
     items: List[NewsResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page; null on the last page")
 
     model_config = {
         "from_attributes": True,
@@ -116,7 +117,8 @@ class NewsListResponse(BaseModel):
                     "created_at": "2024-03-14T12:00:00Z",
                     "updated_at": "2024-03-14T12:00:00Z",
                     "visibility": "PUBLIC"
-                }]
+                }],
+                "next_cursor": None
             }
         }
     }
\ No newline at end of file
@@ -0,0 +1,247 @@
+# app/services/batch_jobs.py
+import json
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config.settings import get_settings
+from app.core.database import job_session, session_scope
+from app.models.generation_job import GenerationJob
+from app.models.news import News, UpdateFrequency
+from app.models.prompt import Prompt
+from app.models.user import User
+from app.services.job_queue import GenerationJobQueue
+from app.services.llm import llm_service
+from app.services.llm_queue import JobPriority
+from app.services.news import GenerationTarget, NewsService
+from app.services.rss import RSSService
+from app.utils.helpers import Deadline
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _custom_id(prompt_id: int) -> str:
+    return f"news-{prompt_id}"
+
+
+class DailyBatchService:
+    """
+    Generates daily digests through the provider's offline Batch API.
+
+    Daily runs are latency-insensitive, so instead of competing with hourly
+    and on-demand traffic for the per-minute budget they are collected into
+    waves, serialized to one JSONL job per model and submitted as batches.
+
+    Each step is a generation job, so no worker waits between them:
+    cohort jobs add their prompts to the pending wave job of the next
+    LLM_BATCH_COLLECT_SECONDS boundary and complete. The wave job, when
+    claimed, submits the batches and records each one as a collection job
+    (its batch id and prompts are the manifest), which polls the batch,
+    deferring itself every LLM_BATCH_POLL_INTERVAL until it finishes.
+    Prompts the batch does not answer (failure, expiry, LLM_BATCH_MAX_WAIT
+    exceeded) fall back to synchronous generation at backfill priority.
+
+    No database session is held while waiting: loading prompts and storing
+    results each use their own short session.
+    """
+
+    def __init__(self):
+        self.rss_service = RSSService()
+
+    @staticmethod
+    def _wave_at(now: datetime) -> datetime:
+        """The next wave boundary; boundaries are epoch-aligned, so every worker picks the same one."""
+        period = settings.LLM_BATCH_COLLECT_SECONDS
+        return datetime.fromtimestamp((math.floor(now.timestamp() / period) + 1) * period, timezone.utc)
+
+    def hand_off(self, db: Session, prompt_ids: List[int]) -> datetime:
+        """
+        Add prompts to the next daily wave job; returns when that wave runs.
+
+        The hand-off is durable once this returns, so the cohort job can
+        complete right away.
+        """
+        queue = GenerationJobQueue(db)
+        wave_at = self._wave_at(datetime.now(timezone.utc))
+        while not queue.join_wave(prompt_ids, wave_at):
+            # Already claimed: its prompts are being submitted
+            wave_at += timedelta(seconds=settings.LLM_BATCH_COLLECT_SECONDS)
+        return wave_at
+
+    def _load_targets(self, db: Session, prompt_ids: List[int]) -> List[GenerationTarget]:
+        return [
+            GenerationTarget(
+                prompt_id=prompt.id,
+                content=prompt.content,
+                template_type=prompt.template_type,
+                custom_template=prompt.custom_template,
+                timezone=user.timezone
+            )
+            for prompt, user in (
+                db.query(Prompt, User)
+                .join(User, Prompt.user_id == User.id)
+                .filter(Prompt.id.in_(prompt_ids))
+                .all()
+            )
+        ]
+
+    async def _build_job(
+        self,
+        targets: List[GenerationTarget],
+        feeds: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """One batch line per prompt that has new content in its owner's window, and the prompts without."""
+        lines = []
+        empty: List[int] = []
+        content_by_timezone: Dict[str, str] = {}
+        for target in targets:
+            if target.timezone not in content_by_timezone:
+                content_by_timezone[target.timezone] = NewsService._filter_content_by_time(
+                    feeds=feeds,
+                    frequency=UpdateFrequency.DAILY,
+                    user_timezone=target.timezone
+                )
+            feed_content = content_by_timezone[target.timezone]
+            if not feed_content:
+                logger.info(f"No new content for prompt {target.prompt_id}")
+                empty.append(target.prompt_id)
+                continue
+            lines.append(await llm_service.build_batch_job_line(
+                custom_id=_custom_id(target.prompt_id),
+                feed_content=feed_content,
+                prompt_content=target.content,
+                frequency=UpdateFrequency.DAILY,
+                template_type=target.template_type,
+                custom_template=target.custom_template
+            ))
+        return lines, empty
+
+    async def submit_wave(self, prompt_ids: List[int]) -> List[int]:
+        """
+        Serialize a daily wave to JSONL, submit it and record its collection jobs.
+
+        Batch jobs are limited to a single model, so a wave spanning several
+        routes is split into one job per model. Returns the prompts that
+        neither went into a recorded batch nor got a digest from the
+        synchronous fallback.
+        """
+        try:
+            feeds = await self.rss_service.fetch_feeds()
+            async with job_session("batch") as db:
+                targets = self._load_targets(db, prompt_ids)
+            lines, empty = await self._build_job(targets, feeds)
+            if empty:
+                async with job_session("batch") as db:
+                    NewsService(db)._record_runs(empty, UpdateFrequency.DAILY)
+        except Exception as e:
+            logger.error(f"Could not build daily batch job, generating synchronously: {str(e)}")
+            return await self._fallback(prompt_ids, JobPriority.SCHEDULED)
+
+        jobs: Dict[str, List[Dict[str, Any]]] = {}
+        for line in lines:
+            jobs.setdefault(line["body"]["model"], []).append(line)
+
+        failed: List[int] = []
+        for model, job_lines in jobs.items():
+            submitted_ids = [int(line["custom_id"].split("-", 1)[1]) for line in job_lines]
+            try:
+                await self._submit_job(model, job_lines, submitted_ids)
+            except Exception as e:
+                logger.error(f"Could not submit daily batch job for {model}, generating synchronously: {str(e)}")
+                failed.extend(await self._fallback(submitted_ids, JobPriority.SCHEDULED))
+        return failed
+
+    async def _submit_job(self, model: str, lines: List[Dict[str, Any]], prompt_ids: List[int]) -> str:
+        """Submit one job's JSONL and record the generation job that collects its results."""
+        jsonl = "".join(json.dumps(line) + "\n" for line in lines)
+        batch_id = await llm_service.submit_batch_job(jsonl)
+        async with job_session("batch") as db:
+            GenerationJobQueue(db).enqueue(
+                frequency=UpdateFrequency.DAILY,
+                user_ids=[],
+                prompt_ids=prompt_ids,
+                batch_id=batch_id,
+                priority=JobPriority.BACKFILL,
+                run_after=datetime.now(timezone.utc) + timedelta(seconds=settings.LLM_BATCH_POLL_INTERVAL),
+                dedupe_key=f"batch:{batch_id}"
+            )
+        logger.info(f"Submitted daily batch job {batch_id} ({model}) with {len(prompt_ids)} prompts")
+        return batch_id
+
+    async def collect(self, job: GenerationJob) -> Optional[List[int]]:
+        """
+        Store the digests of a collection job's batch once it has finished.
+
+        Returns None while the batch is still running and LLM_BATCH_MAX_WAIT
+        has not passed; otherwise the prompts that got a digest neither from
+        the batch nor from the synchronous fallback.
+        """
+        try:
+            summaries = await llm_service.poll_batch_job(job.batch_id)
+        except Exception as e:
+            # Transient polling errors: keep trying until the job's deadline
+            logger.error(f"Error polling batch job {job.batch_id}: {str(e)}")
+            summaries = None
+        if summaries is None:
+            if (datetime.now(timezone.utc) - job.created_at).total_seconds() < settings.LLM_BATCH_MAX_WAIT:
+                return None
+            logger.warning(f"Batch job {job.batch_id} did not finish within {settings.LLM_BATCH_MAX_WAIT}s")
+            summaries = {}
+
+        stored = 0
+        missing: List[int] = []
+        async with job_session("batch") as db:
+            news_service = NewsService(db)
+            # An earlier attempt may have stored some digests before it died
+            done = {
+                prompt_id for (prompt_id,) in
+                db.query(News.prompt_id).filter(
+                    News.prompt_id.in_(job.prompt_ids),
+                    News.frequency == UpdateFrequency.DAILY,
+                    News.created_at >= job.created_at
+                ).all()
+            }
+            for target in self._load_targets(db, job.prompt_ids):
+                if target.prompt_id in done:
+                    continue
+                summary = summaries.get(_custom_id(target.prompt_id))
+                if summary is None:
+                    missing.append(target.prompt_id)
+                    continue
+                try:
+                    news_service._store_news(
+                        target.prompt_id, UpdateFrequency.DAILY, summary, target.timezone, generated_at=job.created_at
+                    )
+                    stored += 1
+                except Exception as e:
+                    db.rollback()
+                    missing.append(target.prompt_id)
+                    logger.error(f"Error storing batch digest for prompt {target.prompt_id}: {str(e)}")
+        logger.info(f"Batch job {job.batch_id}: stored {stored} daily digests, {len(missing)} missing")
+
+        if not missing:
+            return []
+        return await self._fallback(missing, JobPriority.BACKFILL)
+
+    async def _fallback(self, prompt_ids: List[int], priority: JobPriority) -> List[int]:
+        """Generate digests the batch path could not deliver through regular completions; returns the failures."""
+        try:
+            feeds = await self.rss_service.fetch_feeds()
+            # Not a job session: generation commits before each LLM call, so
+            # the session holds a connection only around its reads and writes
+            with session_scope("batch") as db:
+                outcome = await NewsService(db).generate_news_batch(
+                    prompt_ids=prompt_ids,
+                    frequency=UpdateFrequency.DAILY,
+                    feeds=feeds,
+                    priority=priority,
+                    deadline=Deadline(settings.NEWS_GENERATION_TIMEOUT_SCHEDULED)
+                )
+            return outcome.failed
+        except Exception as e:
+            logger.error(f"Error in synchronous fallback for {len(prompt_ids)} daily digests: {str(e)}")
+            return list(prompt_ids)
@@ -0,0 +1,176 @@
+# app/services/concurrency.py
+import asyncio
+import logging
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, Optional
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse provider durations such as "1s", "6m0s", "20ms" or "0.5" into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def parse_rate_limit_headers(headers: Optional[Dict[str, str]]) -> Dict[str, Optional[float]]:
+    """Extract remaining budget and reset times from OpenAI-style rate-limit headers."""
+    normalized = {k.lower(): v for k, v in (headers or {}).items()}
+
+    def number(name: str) -> Optional[float]:
+        try:
+            return float(normalized[name])
+        except (KeyError, ValueError):
+            return None
+
+    return {
+        "limit_requests": number("x-ratelimit-limit-requests"),
+        "remaining_requests": number("x-ratelimit-remaining-requests"),
+        "remaining_tokens": number("x-ratelimit-remaining-tokens"),
+        "reset_requests": parse_duration(normalized.get("x-ratelimit-reset-requests")),
+        "reset_tokens": parse_duration(normalized.get("x-ratelimit-reset-tokens")),
+        "retry_after": parse_duration(normalized.get("retry-after")),
+    }
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight LLM requests.
+
+    Each success grows the limit by `increase / limit` (about +1 per window
+    of successful requests) unless the provider reports its request budget
+    is nearly spent; a 429 halves it and pauses new requests until the
+    provider's reset time. The current limit is published as the
+    ``llm_concurrency_limit`` gauge.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial_limit, max_limit))
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.in_flight = 0
+        self._cooldown_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+        self._publish()
+
+    def _publish(self) -> None:
+        labels = {"pool": self.name}
+        metrics.set_gauge("llm_concurrency_limit", self.limit, labels)
+        metrics.set_gauge("llm_in_flight", self.in_flight, labels)
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < max(1, int(self.limit))
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            while True:
+                remaining_cooldown = self._cooldown_until - time.monotonic()
+                if remaining_cooldown > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), remaining_cooldown)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self._has_capacity():
+                    self.in_flight += 1
+                    self._publish()
+                    return
+                await self._cond.wait()
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._publish()
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def on_success(self, headers: Optional[Dict[str, str]] = None) -> None:
+        """Grow the limit additively unless the provider says the budget is nearly spent."""
+        info = parse_rate_limit_headers(headers)
+        remaining = info["remaining_requests"]
+        if remaining is not None and remaining <= self.in_flight:
+            # Budget nearly spent: hold the limit and wait out the reset
+            if remaining == 0 and info["reset_requests"]:
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + info["reset_requests"])
+            return
+        if info["remaining_tokens"] == 0 and info["reset_tokens"]:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + info["reset_tokens"])
+            return
+
+        self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        self._publish()
+
+    def on_rate_limited(self, retry_after: Optional[float] = None, headers: Optional[Dict[str, str]] = None) -> float:
+        """
+        Shrink the limit after a 429 and return how long the caller should back off.
+
+        Concurrent 429s from the same burst only shrink the limit once.
+        """
+        now = time.monotonic()
+        info = parse_rate_limit_headers(headers)
+        if retry_after is None:
+            retry_after = info["retry_after"] or info["reset_requests"] or info["reset_tokens"]
+
+        if now - self._last_decrease > (retry_after or 1.0):
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self._last_decrease = now
+            logger.info(f"LLM concurrency limit for {self.name} reduced to {self.limit:.2f}")
+
+        delay = self.backoff_delay(0, retry_after)
+        self._cooldown_until = max(self._cooldown_until, now + delay)
+        metrics.inc("llm_rate_limited", labels={"pool": self.name})
+        self._publish()
+        return delay
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, or the provider's delay plus a little jitter."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, min(1.0, retry_after * 0.1 + 0.1))
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "cooldown_remaining": max(0.0, self._cooldown_until - time.monotonic()),
+        }
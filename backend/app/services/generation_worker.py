@@ -0,0 +1,270 @@
+# app/services/generation_worker.py
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.config.settings import get_settings
+from app.core.database import job_session, session_scope
+from app.core.metrics import metrics
+from app.models.generation_job import GenerationJob
+from app.models.news import UpdateFrequency
+from app.models.prompt import Prompt
+from app.services.batch_jobs import DailyBatchService
+from app.services.job_queue import GenerationJobQueue
+from app.services.llm import llm_service
+from app.services.llm_queue import JobPriority
+from app.services.news import NewsService
+from app.services.rss import RSSService
+from app.utils.helpers import Deadline
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class JobOutcome:
+    """What one run of a generation job achieved."""
+    generated: bool = False  # news was stored by this run
+    failed: List[int] = field(default_factory=list)  # prompts that got no news; retried
+    pending: bool = False  # the batch a collection job waits for is still running
+
+
+class GenerationWorker:
+    """
+    Claims generation jobs from the database queue and runs them.
+
+    Up to `concurrency` jobs run at once. Each running job renews its lease
+    every third of GENERATION_JOB_LEASE_SECONDS; if the lease is lost the job
+    is cancelled here because another worker may already be running it.
+
+    Jobs hold no database connection while fetching feeds or waiting on the
+    LLM: prompt lookups use a short job session, and generation commits its
+    reads before the first LLM call and each item as it is stored. Queue
+    bookkeeping (claims, heartbeats, outcomes) uses its own short sessions.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, concurrency: Optional[int] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency or settings.GENERATION_WORKER_CONCURRENCY
+        self.rss_service = RSSService()
+        self.batch_service = DailyBatchService()
+        self.running = False
+        self._loop_task: Optional[asyncio.Task] = None
+        self._jobs: Dict[int, asyncio.Task] = {}
+
+    async def _generate(
+        self,
+        frequency: UpdateFrequency,
+        user_ids: List[int],
+        priority: JobPriority,
+        prompt_ids: Optional[List[int]] = None,
+        window_start: Optional[datetime] = None
+    ) -> JobOutcome:
+        """
+        Generate news for all prompts of a cohort of users, or for the prompts of a catch-up job.
+
+        Daily digests in batch mode are added to the next batch wave job
+        instead, returning as soon as that is recorded.
+        """
+        async with job_session("generation") as db:
+            if prompt_ids is None:
+                # One prompt query for the whole cohort
+                prompt_ids = [
+                    prompt_id for (prompt_id,) in
+                    db.query(Prompt.id).filter(Prompt.user_id.in_(user_ids)).all()
+                ]
+            else:
+                # Catch-up prompts may have been deleted since the job was queued
+                prompt_ids = [
+                    prompt_id for (prompt_id,) in
+                    db.query(Prompt.id).filter(Prompt.id.in_(prompt_ids)).all()
+                ]
+        if not prompt_ids:
+            metrics.inc("scheduler_skipped", labels={"reason": "no_prompts", "frequency": frequency.value})
+            return JobOutcome()
+
+        # Daily digests can wait: hand them to the offline batch wave. Catch-up
+        # runs cover a custom article window, which batch jobs do not support.
+        if (frequency == UpdateFrequency.DAILY and window_start is None
+                and settings.LLM_DAILY_BATCH_MODE and llm_service.supports_batch_jobs):
+            async with job_session("generation") as db:
+                wave_at = self.batch_service.hand_off(db, prompt_ids)
+            logger.info(
+                f"Handed {len(prompt_ids)} daily digests from {len(user_ids)} users "
+                f"to the batch wave at {wave_at.isoformat()}"
+            )
+            return JobOutcome()
+
+        # Fetch RSS feeds once for the cohort; it shares one article window
+        feeds = await self.rss_service.fetch_feeds()
+        with session_scope("generation") as db:
+            outcome = await NewsService(db).generate_news_batch(
+                prompt_ids=prompt_ids,
+                frequency=frequency,
+                feeds=feeds,
+                priority=priority,
+                deadline=Deadline(settings.NEWS_GENERATION_TIMEOUT_SCHEDULED),
+                since=window_start
+            )
+        if window_start is not None:
+            logger.info(
+                f"Caught up {len(outcome.generated)}/{len(prompt_ids)} {frequency.value} news items "
+                f"missed since {window_start.isoformat()} ({len(outcome.failed)} failed)"
+            )
+        else:
+            logger.info(
+                f"Generated {len(outcome.generated)}/{len(prompt_ids)} {frequency.value} news items "
+                f"for a cohort of {len(user_ids)} users ({len(outcome.failed)} failed)"
+            )
+        return JobOutcome(generated=bool(outcome.generated), failed=outcome.failed)
+
+    async def _heartbeat(self, job_id: int, task: asyncio.Task) -> None:
+        interval = settings.GENERATION_JOB_LEASE_SECONDS / 3
+        while not task.done():
+            await asyncio.sleep(interval)
+            try:
+                with session_scope("queue") as db:
+                    renewed = GenerationJobQueue(db).heartbeat(job_id, self.worker_id)
+                if not renewed:
+                    logger.warning(f"Lost lease on generation job {job_id}, cancelling it")
+                    task.cancel()
+                    return
+            except Exception as e:
+                logger.error(f"Error renewing lease on generation job {job_id}: {str(e)}")
+
+    async def _run_job(self, job: GenerationJob) -> JobOutcome:
+        if job.batch_wave:
+            failed = await self.batch_service.submit_wave(sorted(set(job.prompt_ids)))
+            return JobOutcome(failed=failed)
+        if job.batch_id is not None:
+            failed = await self.batch_service.collect(job)
+            if failed is None:
+                return JobOutcome(pending=True)
+            return JobOutcome(generated=True, failed=failed)
+        return await self._generate(
+            job.frequency,
+            job.user_ids,
+            JobPriority(job.priority),
+            prompt_ids=job.prompt_ids,
+            window_start=job.window_start
+        )
+
+    @staticmethod
+    def _retry_window(job: GenerationJob) -> datetime:
+        """Start of the article window the job's first run read, for retrying some of its prompts."""
+        if job.window_start is not None:
+            return job.window_start
+        period = timedelta(hours=1) if job.frequency == UpdateFrequency.HOURLY else timedelta(days=1)
+        return (job.fire_at or job.created_at) - period
+
+    def _set_running_gauge(self) -> None:
+        metrics.set_gauge("generation_jobs_running", len(self._jobs), {"worker": self.worker_id})
+
+    async def _execute(self, job: GenerationJob) -> None:
+        job_id = job.id
+        labels = {"frequency": job.frequency.value, "priority": job.priority}
+        # Scheduled versus actual start; includes queueing and retry delays
+        scheduled_at = job.fire_at or job.run_after
+        metrics.observe(
+            "generation_job_start_lag_seconds",
+            (datetime.now(timezone.utc) - scheduled_at).total_seconds(),
+            labels
+        )
+        started = time.monotonic()
+
+        run = asyncio.create_task(self._run_job(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, run))
+        try:
+            outcome = await run
+        except asyncio.CancelledError:
+            if not self.running or not run.cancelled():
+                raise
+            metrics.inc("generation_jobs_lease_lost", labels=labels)
+            return  # lease lost: whoever holds it now owns the outcome
+        except Exception as e:
+            metrics.observe("generation_job_duration_seconds", time.monotonic() - started, {**labels, "outcome": "failed"})
+            with session_scope("queue") as db:
+                GenerationJobQueue(db).fail(job, self.worker_id, str(e) or type(e).__name__)
+            return
+        finally:
+            heartbeat.cancel()
+            self._jobs.pop(job_id, None)
+            self._set_running_gauge()
+
+        if outcome.pending:
+            with session_scope("queue") as db:
+                GenerationJobQueue(db).defer(job, self.worker_id, settings.LLM_BATCH_POLL_INTERVAL)
+            return
+        if outcome.failed:
+            # Retry only the prompts without news; the others must not get a second item
+            metrics.observe("generation_job_duration_seconds", time.monotonic() - started, {**labels, "outcome": "failed"})
+            with session_scope("queue") as db:
+                GenerationJobQueue(db).fail(
+                    job,
+                    self.worker_id,
+                    f"No news for {len(outcome.failed)} prompts: {outcome.failed[:20]}",
+                    prompt_ids=outcome.failed,
+                    window_start=self._retry_window(job)
+                )
+            return
+
+        with session_scope("queue") as db:
+            GenerationJobQueue(db).complete(job_id, self.worker_id)
+
+        metrics.observe("generation_job_duration_seconds", time.monotonic() - started, {**labels, "outcome": "succeeded"})
+        if outcome.generated and job.fire_at is not None:
+            # Fire time to finished news, once per job
+            metrics.observe(
+                "scheduled_generation_latency_seconds",
+                (datetime.now(timezone.utc) - job.fire_at).total_seconds(),
+                {"frequency": job.frequency.value}
+            )
+
+    async def _run(self) -> None:
+        while self.running:
+            try:
+                free = self.concurrency - len(self._jobs)
+                jobs = []
+                if free > 0:
+                    with session_scope("queue") as db:
+                        jobs = GenerationJobQueue(db).claim(self.worker_id, limit=free)
+                        db.expunge_all()  # jobs outlive the claim session
+                for job in jobs:
+                    logger.info(f"Worker {self.worker_id} claimed generation job {job.id} (attempt {job.attempts})")
+                    self._jobs[job.id] = asyncio.create_task(self._execute(job))
+                self._set_running_gauge()
+                if not jobs:
+                    await asyncio.sleep(settings.GENERATION_WORKER_POLL_INTERVAL)
+            except Exception as e:
+                logger.error(f"Error in generation worker loop: {str(e)}")
+                await asyncio.sleep(settings.GENERATION_WORKER_POLL_INTERVAL)
+
+    async def start(self) -> None:
+        self.running = True
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info(f"Generation worker {self.worker_id} started with concurrency {self.concurrency}")
+        if settings.LLM_DAILY_BATCH_MODE and not llm_service.supports_batch_jobs:
+            logger.warning(
+                "LLM_DAILY_BATCH_MODE is on but the LLM provider has no batch API "
+                "(see LLM_API_BATCHES); daily digests are generated synchronously"
+            )
+
+    async def stop(self) -> None:
+        """Stop claiming and cancel running jobs; their leases expire and they are retried."""
+        self.running = False
+        tasks = list(self._jobs.values())
+        if self._loop_task:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._jobs.clear()
+        logger.info(f"Generation worker {self.worker_id} stopped")
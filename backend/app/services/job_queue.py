@@ -0,0 +1,333 @@
+# app/services/job_queue.py
+import hashlib
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import JSON, and_, case, cast, or_
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.config.settings import get_settings
+from app.core.database import session_scope
+from app.core.metrics import metrics
+from app.models.generation_job import GenerationJob, JobStatus
+from app.models.news import UpdateFrequency
+from app.services.llm_queue import JobPriority
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def cohort_dedupe_key(frequency: UpdateFrequency, base: datetime, user_ids: List[int]) -> str:
+    """
+    Identical for every scheduler that computes the same cohort, so it is enqueued once.
+
+    `base` is the unspread schedule instant: a failover leader that planned
+    a different spread window fires the cohort at another offset, but for
+    the same base instant and members.
+    """
+    members = hashlib.sha1(",".join(str(user_id) for user_id in sorted(user_ids)).encode("utf-8")).hexdigest()
+    return f"{frequency.value}:{base.isoformat()}:{members[:16]}"
+
+
+def publish_queue_depth() -> None:
+    """Refresh the generation_jobs{state} gauges; the queue is shared by all processes, so read it at scrape time."""
+    try:
+        with session_scope() as db:
+            for state, count in GenerationJobQueue(db).depth().items():
+                metrics.set_gauge("generation_jobs", count, {"state": state})
+    except Exception as e:
+        logger.error(f"Error reading generation job queue depth: {str(e)}")
+
+
+class GenerationJobQueue:
+    """
+    Durable generation jobs in the ``generation_jobs`` table.
+
+    Workers claim due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` and
+    hold them under a lease they renew while running. A job whose lease
+    runs out (crashed or partitioned worker) becomes claimable again; a
+    failed attempt is retried with exponential backoff until max_attempts.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        frequency: UpdateFrequency,
+        user_ids: List[int],
+        fire_at: Optional[datetime] = None,
+        priority: JobPriority = JobPriority.SCHEDULED,
+        run_after: Optional[datetime] = None,
+        dedupe_key: Optional[str] = None,
+        prompt_ids: Optional[List[int]] = None,
+        window_start: Optional[datetime] = None,
+        batch_id: Optional[str] = None
+    ) -> bool:
+        """
+        Insert a pending job; returns False if a job with `dedupe_key` already exists.
+
+        Scheduled jobs name a cohort of users; catch-up jobs name their
+        prompts and the start of their content window instead. Collection
+        jobs name their prompts and the provider batch job answering them;
+        daily batch wave jobs are created by join_wave().
+        """
+        values = {
+            "frequency": frequency,
+            "user_ids": list(user_ids),
+            "prompt_ids": list(prompt_ids) if prompt_ids is not None else None,
+            "window_start": window_start,
+            "batch_id": batch_id,
+            "priority": priority.value,
+            "fire_at": fire_at,
+            "dedupe_key": dedupe_key,
+            "status": JobStatus.PENDING,
+            "attempts": 0,
+            "max_attempts": settings.GENERATION_JOB_MAX_ATTEMPTS,
+            "run_after": run_after or func.now(),
+        }
+        try:
+            result = self.db.execute(
+                insert(GenerationJob).values(**values).on_conflict_do_nothing(index_elements=["dedupe_key"])
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result.rowcount > 0
+
+    def join_wave(self, prompt_ids: List[int], wave_at: datetime) -> bool:
+        """
+        Add prompts to the daily batch wave job that runs at `wave_at`, creating it if needed.
+
+        Returns False if that wave was already claimed: its prompts are
+        fixed, so the caller joins a later wave.
+        """
+        table = GenerationJob.__table__
+        statement = insert(GenerationJob).values(
+            frequency=UpdateFrequency.DAILY,
+            user_ids=[],
+            prompt_ids=list(prompt_ids),
+            batch_wave=True,
+            priority=JobPriority.SCHEDULED.value,
+            dedupe_key=f"wave:{wave_at.isoformat()}",
+            status=JobStatus.PENDING,
+            attempts=0,
+            max_attempts=settings.GENERATION_JOB_MAX_ATTEMPTS,
+            run_after=wave_at
+        )
+        # The row lock of ON CONFLICT orders this against claim(): a wave
+        # claimed meanwhile is no longer pending and is left alone
+        statement = statement.on_conflict_do_update(
+            index_elements=["dedupe_key"],
+            set_={
+                "prompt_ids": cast(
+                    cast(table.c.prompt_ids, JSONB).op("||")(cast(statement.excluded.prompt_ids, JSONB)),
+                    JSON
+                ),
+                "updated_at": func.now(),
+            },
+            where=and_(table.c.status == JobStatus.PENDING, table.c.batch_wave.is_(True))
+        )
+        try:
+            result = self.db.execute(statement)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result.rowcount > 0
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[GenerationJob]:
+        """Lease up to `limit` due jobs to `worker_id`."""
+        now = func.now()
+        try:
+            jobs = (
+                self.db.query(GenerationJob)
+                .filter(or_(
+                    and_(GenerationJob.status == JobStatus.PENDING, GenerationJob.run_after <= now),
+                    and_(GenerationJob.status == JobStatus.RUNNING, GenerationJob.lease_expires_at < now)
+                ))
+                .order_by(GenerationJob.run_after)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+
+            claimed = []
+            for job in jobs:
+                if job.attempts >= job.max_attempts:
+                    # Lease ran out on the last attempt
+                    job.status = JobStatus.FAILED
+                    job.locked_by = None
+                    job.lease_expires_at = None
+                    job.last_error = job.last_error or "Lease expired on final attempt"
+                    continue
+                job.status = JobStatus.RUNNING
+                job.attempts += 1
+                job.locked_by = worker_id
+                job.lease_expires_at = now + timedelta(seconds=settings.GENERATION_JOB_LEASE_SECONDS)
+                claimed.append(job)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        for job in claimed:
+            self.db.refresh(job)
+        return claimed
+
+    def depth(self) -> Dict[str, int]:
+        """Unfinished jobs: pending and due, pending until a later run_after, and leased."""
+        is_due = GenerationJob.run_after <= func.now()
+        rows = (
+            self.db.query(GenerationJob.status, is_due, func.count(GenerationJob.id))
+            .filter(GenerationJob.status.in_((JobStatus.PENDING, JobStatus.RUNNING)))
+            .group_by(GenerationJob.status, is_due)
+            .all()
+        )
+        depth = {"due": 0, "waiting": 0, "running": 0}
+        for status, due, count in rows:
+            if status == JobStatus.RUNNING:
+                depth["running"] += count
+            else:
+                depth["due" if due else "waiting"] += count
+        return depth
+
+    def upcoming(self, limit: int = 50) -> List[GenerationJob]:
+        """Unfinished jobs in the order workers will pick them up."""
+        return (
+            self.db.query(GenerationJob)
+            .filter(GenerationJob.status.in_((JobStatus.PENDING, JobStatus.RUNNING)))
+            .order_by(GenerationJob.run_after)
+            .limit(limit)
+            .all()
+        )
+
+    def wave_progress(
+        self,
+        frequency: UpdateFrequency,
+        start: datetime,
+        end: datetime
+    ) -> Tuple[int, int, Optional[datetime]]:
+        """(jobs, unfinished jobs, last job update) for jobs fired in [start, end)."""
+        jobs, unfinished, last_update = (
+            self.db.query(
+                func.count(GenerationJob.id),
+                func.count(case((GenerationJob.status.in_((JobStatus.PENDING, JobStatus.RUNNING)), 1))),
+                func.max(GenerationJob.updated_at)
+            )
+            .filter(
+                GenerationJob.frequency == frequency,
+                GenerationJob.fire_at >= start,
+                GenerationJob.fire_at < end
+            )
+            .one()
+        )
+        return jobs, unfinished, last_update
+
+    def _owned(self, job_id: int, worker_id: str):
+        return self.db.query(GenerationJob).filter(
+            GenerationJob.id == job_id,
+            GenerationJob.status == JobStatus.RUNNING,
+            GenerationJob.locked_by == worker_id
+        )
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease; False means the job was reclaimed by someone else."""
+        try:
+            updated = self._owned(job_id, worker_id).update(
+                {GenerationJob.lease_expires_at: func.now() + timedelta(seconds=settings.GENERATION_JOB_LEASE_SECONDS)},
+                synchronize_session=False
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return updated > 0
+
+    def complete(self, job_id: int, worker_id: str) -> None:
+        try:
+            self._owned(job_id, worker_id).update(
+                {
+                    GenerationJob.status: JobStatus.SUCCEEDED,
+                    GenerationJob.locked_by: None,
+                    GenerationJob.lease_expires_at: None,
+                    GenerationJob.last_error: None,
+                },
+                synchronize_session=False
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def retry_delay(self, attempts: int) -> float:
+        """Full-jitter exponential backoff for the next attempt."""
+        ceiling = min(settings.GENERATION_JOB_RETRY_CAP, settings.GENERATION_JOB_RETRY_BASE * 2 ** max(0, attempts - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def defer(self, job: GenerationJob, worker_id: str, delay: float) -> None:
+        """Release a job to run again after `delay` seconds without using up an attempt."""
+        try:
+            self._owned(job.id, worker_id).update(
+                {
+                    GenerationJob.status: JobStatus.PENDING,
+                    GenerationJob.run_after: func.now() + timedelta(seconds=delay),
+                    GenerationJob.attempts: GenerationJob.attempts - 1,
+                    GenerationJob.locked_by: None,
+                    GenerationJob.lease_expires_at: None,
+                },
+                synchronize_session=False
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def fail(
+        self,
+        job: GenerationJob,
+        worker_id: str,
+        error: str,
+        prompt_ids: Optional[List[int]] = None,
+        window_start: Optional[datetime] = None
+    ) -> None:
+        """
+        Schedule a retry, or mark the job failed once its attempts are used up.
+
+        When only some prompts failed, `prompt_ids` narrows the retry to them
+        (reading articles from `window_start`), so prompts that already got
+        their news are not generated twice.
+        """
+        if job.attempts >= job.max_attempts:
+            values = {GenerationJob.status: JobStatus.FAILED}
+            logger.error(f"Generation job {job.id} failed after {job.attempts} attempts: {error}")
+        else:
+            delay = self.retry_delay(job.attempts)
+            values = {
+                GenerationJob.status: JobStatus.PENDING,
+                GenerationJob.run_after: func.now() + timedelta(seconds=delay),
+            }
+            logger.warning(f"Generation job {job.id} attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+        if prompt_ids is not None:
+            values.update({
+                GenerationJob.prompt_ids: list(prompt_ids),
+                GenerationJob.window_start: window_start,
+                GenerationJob.batch_id: None,
+                GenerationJob.batch_wave: False,
+            })
+        values.update({
+            GenerationJob.locked_by: None,
+            GenerationJob.lease_expires_at: None,
+            GenerationJob.last_error: error[:2000],
+        })
+        try:
+            self._owned(job.id, worker_id).update(values, synchronize_session=False)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
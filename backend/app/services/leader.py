@@ -0,0 +1,127 @@
+# app/services/leader.py
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for pg_advisory_lock derived from a name."""
+    return int.from_bytes(hashlib.sha1(name.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+class LeaderElector:
+    """
+    Elects one process among all replicas using a Postgres advisory lock.
+
+    The lock is session-level and held on a dedicated connection, so it is
+    released by the server as soon as the leader's process or connection
+    dies; standbys retry every `check_interval` seconds and the first to get
+    the lock takes over. The leader pings its connection on the same
+    interval and steps down (calling `on_revoked`) if it is lost.
+    Non-Postgres databases have no advisory locks: every process leads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callable[[], Awaitable[None]],
+        on_revoked: Callable[[], Awaitable[None]],
+        check_interval: float = 15.0
+    ):
+        self.name = name
+        self.key = advisory_lock_key(name)
+        self.on_elected = on_elected
+        self.on_revoked = on_revoked
+        self.check_interval = check_interval
+        self.is_leader = False
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _try_acquire(self) -> bool:
+        if engine.dialect.name != "postgresql":
+            return True
+        connection = engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if acquired:
+            self._connection = connection
+        else:
+            connection.close()
+        return bool(acquired)
+
+    def _still_held(self) -> bool:
+        if self._connection is None:
+            return engine.dialect.name != "postgresql"
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception as e:
+            logger.warning(f"Leader connection for {self.name} lost: {str(e)}")
+            return False
+
+    def _release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception:
+            pass  # closing the connection releases the lock anyway
+        finally:
+            self._connection.close()
+            self._connection = None
+
+    def _set_leader(self, is_leader: bool) -> None:
+        self.is_leader = is_leader
+        metrics.set_gauge("leader", 1 if is_leader else 0, {"name": self.name})
+
+    async def _step_down(self) -> None:
+        self._set_leader(False)
+        try:
+            await self.on_revoked()
+        finally:
+            await asyncio.to_thread(self._release)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if not self.is_leader:
+                    if await asyncio.to_thread(self._try_acquire):
+                        self._set_leader(True)
+                        logger.info(f"Elected leader for {self.name}")
+                        await self.on_elected()
+                elif not await asyncio.to_thread(self._still_held):
+                    logger.warning(f"Lost leadership for {self.name}")
+                    await self._step_down()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Leader election error for {self.name}: {str(e)}")
+                if self.is_leader:
+                    await self._step_down()
+            await asyncio.sleep(self.check_interval)
+
+    async def start(self) -> None:
+        self._set_leader(False)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            await self._step_down()
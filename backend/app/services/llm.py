@@ -1,33 +1,98 @@
 # app/services/llm.py
-import aiohttp
+import json
 import re
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from app.config.settings import get_settings
+from app.core.exceptions import DeadlineExceeded
 from app.models.news import UpdateFrequency
 from app.models.prompt import TemplateType
 import logging
-from datetime import datetime
+import asyncio
 from asyncio import sleep
-import tiktoken
+from app.services.llm_providers import (
+    CompletionResult,
+    LLMProviderError,
+    LLMRateLimitError,
+    create_llm_provider
+)
+from app.services.llm_queue import JobPriority
+from app.services.llm_routing import ModelPool, ModelRoute, ModelRouter, check_shared_models
+from app.utils.helpers import Deadline
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+TIME_WINDOWS = {
+    UpdateFrequency.HOURLY: "the last hour",
+    UpdateFrequency.DAILY: "the last 24 hours"
+}
+
+GENERAL_GUIDELINES = """General Guidelines:
+1. Focus on the most important and relevant information
+2. Maintain objectivity and journalistic standards
+3. Use professional language appropriate for news writing
+4. Organize information logically and clearly
+5. Include relevant context when necessary
+6. Follow the template structure precisely and strictly. If no news matches the content required category, do not generate the summary. mention no updates on the mentioned category.
+7. Ensure all claims are supported by the provided content
+8. Include a headline for the summary news. the headline should be catching and well written like a newspaper.
+9. Include a section about what the user can expect in the coming hours and days based on the recent developments globally. Be creative and imaginative on this"""
+
+# Marks the start of each prompt in a batched request
+BATCH_SECTION_PREFIX = "### Prompt "
+
+# Distinct (frequency, template) system prompts kept with their token counts
+SYSTEM_PROMPT_CACHE_SIZE = 1024
+
 class TemplateSyntaxError(Exception):
     """Exception raised for errors in template syntax."""
     pass
 
+class BatchResponseError(Exception):
+    """Raised when a batched completion cannot be split back into sections."""
+    pass
+
 class LLMService:
     def __init__(self):
-        self.api_key = settings.LLM_API_KEY
         self.model = settings.LLM_MODEL
-        self.api_url = "https://api.openai.com/v1/chat/completions"
-        self.requests_per_minute = 50
-        self.tokens_per_minute = 15000  # OpenAI's TPM limit
-        self.last_request_time = None
-        self.tokens_used = 0
-        self.last_token_reset = datetime.now()
-        self.encoder = tiktoken.encoding_for_model(self.model)
+        self.provider = create_llm_provider()
+        self.requests_per_minute = settings.LLM_REQUESTS_PER_MINUTE
+        self.tokens_per_minute = settings.LLM_TOKENS_PER_MINUTE
+        self.router = ModelRouter(
+            routes=[ModelRoute.from_dict(route, settings.LLM_MAX_TOKENS) for route in settings.LLM_ROUTES],
+            default=ModelRoute(name="default", model=self.model, max_tokens=settings.LLM_MAX_TOKENS)
+        )
+
+        # One admission pool per model: providers meter each model separately
+        routes = [self.router.default, *self.router.routes]
+        check_shared_models(routes, self.requests_per_minute, self.tokens_per_minute)
+        self.pools: Dict[str, ModelPool] = {}
+        for route in routes:
+            if route.model not in self.pools:
+                self.pools[route.model] = ModelPool(
+                    route,
+                    requests_per_minute=self.requests_per_minute,
+                    tokens_per_minute=self.tokens_per_minute,
+                    concurrency={
+                        "initial_limit": settings.LLM_INITIAL_CONCURRENCY,
+                        "min_limit": settings.LLM_MIN_CONCURRENCY,
+                        "max_limit": settings.LLM_MAX_CONCURRENCY
+                    },
+                    priority_offsets={
+                        JobPriority.INTERACTIVE: 0.0,
+                        JobPriority.SCHEDULED: settings.LLM_PRIORITY_OFFSET_SCHEDULED,
+                        JobPriority.BACKFILL: settings.LLM_PRIORITY_OFFSET_BACKFILL
+                    },
+                    interactive_reserve=settings.LLM_INTERACTIVE_RESERVE
+                )
+
+        # The default model's pool, also used to estimate requests before routing
+        self.default_pool = self.pools[self.model]
+        self.rate_limiter = self.default_pool.rate_limiter
+        self.concurrency = self.default_pool.concurrency
+        self.job_queue = self.default_pool.job_queue
+        self.token_counter = self.default_pool.token_counter
+        self._system_prompts: Dict[Tuple[str, UpdateFrequency, TemplateType, Optional[str]], Tuple[str, int]] = {}
 
         # Default templates for different types
         self.default_templates = {
@@ -118,35 +183,42 @@ class LLMService:
         except Exception as e:
             raise TemplateSyntaxError(f"Template formatting error: {str(e)}")
 
+    @property
+    def encoder(self):
+        return self.default_pool.encoder
+
     def count_tokens(self, text: str) -> int:
-        return len(self.encoder.encode(text))
-
-    async def _rate_limit(self, estimated_tokens: int):
-        current_time = datetime.now()
-
-        # Reset token counter if a minute has passed
-        if (current_time - self.last_token_reset).total_seconds() >= 60:
-            self.tokens_used = 0
-            self.last_token_reset = current_time
-
-        # Check if adding these tokens would exceed the limit
-        if self.tokens_used + estimated_tokens > self.tokens_per_minute:
-            # Calculate wait time needed
-            wait_time = 60 - (current_time - self.last_token_reset).total_seconds()
-            if wait_time > 0:
-                logger.info(f"TPM limit reached. Waiting {wait_time:.2f} seconds...")
-                await sleep(wait_time)
-                self.tokens_used = 0
-                self.last_token_reset = datetime.now()
-
-        # Request rate limiting
-        if self.last_request_time:
-            elapsed = (current_time - self.last_request_time).total_seconds()
-            if elapsed < 60 / self.requests_per_minute:
-                await sleep((60 / self.requests_per_minute) - elapsed)
-
-        self.last_request_time = datetime.now()
-        self.tokens_used += estimated_tokens
+        return self.token_counter.count_cached(text)
+
+    async def _rate_limit(self, estimated_tokens: int) -> float:
+        """Reserve request and token budget from the shared limiter."""
+        return await self.rate_limiter.acquire(estimated_tokens)
+
+    def _calibrate(self, pool: ModelPool, payload: Dict[str, Any], usage: Dict[str, Any]) -> None:
+        """Feed provider-reported prompt tokens back into the pool's length estimator."""
+        prompt_tokens = usage.get("prompt_tokens")
+        if prompt_tokens:
+            chars = sum(len(message["content"]) for message in payload["messages"])
+            pool.token_counter.calibrate(chars, prompt_tokens)
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Queue length, remaining budget and wait times of the default pool, plus every routed pool."""
+        return {
+            **self.default_pool.get_stats(),
+            "routes": {
+                model: pool.get_stats() for model, pool in self.pools.items() if pool is not self.default_pool
+            }
+        }
+
+    def _route(
+        self,
+        estimated_tokens: int,
+        frequency: UpdateFrequency,
+        template_types: List[TemplateType]
+    ) -> Tuple[ModelRoute, ModelPool]:
+        """Pick the route for a request and the admission pool of its model."""
+        route = self.router.select(estimated_tokens, frequency, template_types)
+        return route, self.pools[route.model]
 
     def create_system_prompt(self, frequency: UpdateFrequency, template_type: TemplateType, custom_template: Optional[str] = None) -> str:
         # Validate custom template if provided
@@ -154,10 +226,7 @@ class LLMService:
             logger.warning("Invalid custom template format provided, falling back to default template")
             custom_template = None
 
-        time_window = {
-            UpdateFrequency.HOURLY: "the last hour",
-            UpdateFrequency.DAILY: "the last 24 hours"
-        }[frequency]
+        time_window = TIME_WINDOWS[frequency]
         
         # Use custom template if provided and valid, otherwise use default template
         template = custom_template if custom_template else self.default_templates[template_type]
@@ -167,54 +236,80 @@ class LLMService:
 Template Requirements:
 {template}
 
-General Guidelines:
-1. Focus on the most important and relevant information
-2. Maintain objectivity and journalistic standards
-3. Use professional language appropriate for news writing
-4. Organize information logically and clearly
-5. Include relevant context when necessary
-6. Follow the template structure precisely and strictly. If no news matches the content required category, do not generate the summary. mention no updates on the mentioned category.
-7. Ensure all claims are supported by the provided content
-8. Include a headline for the summary news. the headline should be catching and well written like a newspaper.
-9. Include a section about what the user can expect in the coming hours and days based on the recent developments globally. Be creative and imaginative on this"""
+{GENERAL_GUIDELINES}"""
 
-    async def generate_summary(
+    def get_system_prompt(
+        self,
+        frequency: UpdateFrequency,
+        template_type: TemplateType,
+        custom_template: Optional[str] = None,
+        pool: Optional[ModelPool] = None
+    ) -> Tuple[str, int]:
+        """System prompt and its exact token count, memoized per (model, frequency, template)."""
+        pool = pool or self.default_pool
+        key = (pool.route.model, frequency, template_type, custom_template)
+        cached = self._system_prompts.get(key)
+        if cached is None:
+            system_prompt = self.create_system_prompt(
+                frequency=frequency,
+                template_type=template_type,
+                custom_template=custom_template
+            )
+            cached = (system_prompt, pool.token_counter.count_cached(system_prompt))
+            if len(self._system_prompts) >= SYSTEM_PROMPT_CACHE_SIZE:
+                self._system_prompts.clear()
+            self._system_prompts[key] = cached
+        return cached
+
+    async def _build_request(
         self,
         feed_content: str,
         prompt_content: str,
         frequency: UpdateFrequency,
         template_type: TemplateType,
-        custom_template: Optional[str] = None,
-        max_retries: int = 3
-    ) -> str:
+        custom_template: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], int, ModelPool]:
+        """Route a summary and build its chat-completions payload, token estimate and pool."""
         # Validate custom template if provided
         if custom_template and not self.validate_template_format(custom_template):
             logger.warning("Invalid custom template format provided, falling back to default template")
             custom_template = None
 
-        system_prompt = self.create_system_prompt(
+        _, default_system_tokens = self.get_system_prompt(
             frequency=frequency,
             template_type=template_type,
             custom_template=custom_template
         )
-        
-        # Estimate total tokens
+        route, pool = self._route(
+            default_system_tokens +
+            self.token_counter.estimate(prompt_content) +
+            self.token_counter.estimate(feed_content),
+            frequency,
+            [template_type]
+        )
+
+        system_prompt, system_tokens = self.get_system_prompt(
+            frequency=frequency,
+            template_type=template_type,
+            custom_template=custom_template,
+            pool=pool
+        )
+
+        # Cheap estimate first; encode exactly only when the budget is tight
         total_tokens = (
-            self.count_tokens(system_prompt) +
-            self.count_tokens(prompt_content) +
-            self.count_tokens(feed_content)
+            system_tokens +
+            pool.token_counter.estimate(prompt_content) +
+            pool.token_counter.estimate(feed_content)
         )
+        if await pool.rate_limiter.near_limit(total_tokens):
+            total_tokens = (
+                system_tokens +
+                pool.token_counter.count_cached(prompt_content) +
+                pool.token_counter.count_articles(feed_content)
+            )
 
-        # Apply rate limiting with token consideration
-        await self._rate_limit(total_tokens)
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
-            "model": self.model,
+            "model": route.model,
             "messages": [
                 {
                     "role": "system",
@@ -226,39 +321,347 @@ General Guidelines:
                 }
             ],
             "temperature": settings.LLM_TEMPERATURE,
-            "max_tokens": settings.LLM_MAX_TOKENS
+            "max_tokens": route.max_tokens
         }
-        
+        return payload, total_tokens, pool
+
+    async def _admit(self, pool: ModelPool, priority: JobPriority, tokens: int, deadline: Deadline) -> None:
+        """
+        Wait for this job's turn in `pool`, reserve budget and take a concurrency slot.
+
+        One request and `tokens` tokens are reserved. Every attempt is a request the provider meters, so retries pass 0
+        tokens but are still charged their request. If the caller gives up
+        (cancellation or deadline) before a slot is granted, the reservation
+        is returned to the limiter.
+        """
+        async def admit():
+            async with pool.job_queue.turn(priority):
+                reserved = False
+                try:
+                    await pool.rate_limiter.acquire(tokens, reserve=pool.reserve(priority))
+                    reserved = True
+                    await pool.concurrency.acquire()
+                except BaseException:
+                    if reserved:
+                        await asyncio.shield(pool.rate_limiter.release(tokens))
+                    raise
+
+        await deadline.run(admit(), "waiting for LLM capacity")
+
+    def _retry_delay(
+        self,
+        pool: ModelPool,
+        delay: Optional[float],
+        retries: int,
+        deadline: Deadline,
+        error: Exception
+    ) -> float:
+        """Backoff before the next attempt, refusing to sleep past the deadline."""
+        if delay is None:
+            delay = pool.concurrency.backoff_delay(retries)
+        remaining = deadline.remaining()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded("LLM retry backoff would exceed the deadline") from error
+        return delay
+
+    async def _complete(
+        self,
+        pool: ModelPool,
+        payload: Dict[str, Any],
+        total_tokens: int,
+        priority: JobPriority,
+        deadline: Deadline,
+        max_retries: int
+    ) -> CompletionResult:
+        """Run one chat completion through admission control, retrying on failures."""
         retries = 0
-        while retries < max_retries:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        self.api_url,
-                        headers=headers,
-                        json=payload
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            return data['choices'][0]['message']['content']
-                        else:
-                            error_text = await response.text()
-                            error_data = await response.json()
-                            
-                            if 'error' in error_data and error_data['error'].get('code') == 'rate_limit_exceeded':
-                                retry_after = float(error_data['error']['message'].split('try again in ')[1].split('s')[0])
-                                logger.info(f"Rate limit hit. Waiting {retry_after} seconds...")
-                                await sleep(retry_after + 1)  # Add 1 second buffer
-                                retries += 1
-                                continue
-                                
-                            logger.error(f"LLM API Error: {error_text}")
-                            raise Exception(f"LLM API Error: {error_text}")
-            except Exception as e:
-                if retries == max_retries - 1:
-                    logger.error(f"Error in LLM service after {max_retries} retries: {str(e)}")
+        # True while the reservation has not been spent on a request the provider accepted
+        unspent = False
+        try:
+            while True:
+                # Tokens are reserved once; retries are charged only their request
+                await self._admit(pool, priority, total_tokens if retries == 0 else 0, deadline)
+                delay = None
+                unspent = False
+                try:
+                    result = await deadline.run(
+                        self.provider.complete(payload, timeout=deadline.remaining()),
+                        "LLM request"
+                    )
+                except LLMRateLimitError as e:
+                    unspent = True
+                    error = e
+                    delay = pool.concurrency.on_rate_limited(e.retry_after, e.headers)
+                    logger.info(f"Rate limit hit. Waiting {delay:.2f} seconds...")
+                except DeadlineExceeded:
                     raise
+                except Exception as e:
+                    error = e
+                else:
+                    pool.concurrency.on_success(result.headers)
+                    self._calibrate(pool, payload, result.usage)
+                    return result
+                finally:
+                    await pool.concurrency.release()
+
                 retries += 1
-                await sleep(2 ** retries)  # Exponential backoff
+                if retries >= max_retries:
+                    logger.error(f"Error in LLM service after {max_retries} retries: {str(error)}")
+                    raise error
+                await sleep(self._retry_delay(pool, delay, retries, deadline, error))
+        except BaseException:
+            if unspent:
+                await asyncio.shield(pool.rate_limiter.release(total_tokens))
+            raise
+
+    async def generate_summary(
+        self,
+        feed_content: str,
+        prompt_content: str,
+        frequency: UpdateFrequency,
+        template_type: TemplateType,
+        custom_template: Optional[str] = None,
+        max_retries: int = 3,
+        priority: JobPriority = JobPriority.SCHEDULED,
+        deadline: Optional[Deadline] = None
+    ) -> str:
+        payload, total_tokens, pool = await self._build_request(
+            feed_content=feed_content,
+            prompt_content=prompt_content,
+            frequency=frequency,
+            template_type=template_type,
+            custom_template=custom_template
+        )
+        result = await self._complete(pool, payload, total_tokens, priority, deadline or Deadline(), max_retries)
+        return result.content
+
+    def _build_batch_request(
+        self,
+        feed_content: str,
+        frequency: UpdateFrequency,
+        prompts: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], int, ModelPool]:
+        """Route and build one chat request answering several prompts over the same content."""
+        sections = []
+        for item in prompts:
+            custom_template = item.get("custom_template")
+            if custom_template and not self.validate_template_format(custom_template):
+                custom_template = None
+            template = custom_template or self.default_templates[item["template_type"]]
+            sections.append(
+                f"{BATCH_SECTION_PREFIX}{item['id']}\n"
+                f"Template Requirements:\n{template}\n\n"
+                f"Prompt: {item['content']}"
+            )
+
+        ids = ", ".join(f'"{item["id"]}"' for item in prompts)
+        system_prompt = f"""You are a professional news curator and writer. Analyze the news from {TIME_WINDOWS[frequency]} and write one separate digest for each of the user's prompts. Each prompt comes with its own template requirements; write every digest as if it were the only one.
+
+{GENERAL_GUIDELINES}
+
+Output Format:
+Respond with a single JSON object of the form {{"sections": [{{"id": "<prompt id>", "content": "<digest>"}}]}} containing exactly one section for each of these prompt ids: {ids}. Do not add any text outside the JSON object."""
+
+        user_content = f"Content to analyze:\n{feed_content}\n\nPrompts:\n\n" + "\n\n".join(sections)
+        route, pool = self._route(
+            self.token_counter.estimate(system_prompt) + self.token_counter.estimate(user_content),
+            frequency,
+            [item["template_type"] for item in prompts]
+        )
+        total_tokens = (
+            pool.token_counter.count_cached(system_prompt) +
+            pool.token_counter.estimate("\n\n".join(sections)) +
+            pool.token_counter.count_articles(feed_content)
+        )
+        payload = {
+            "model": route.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
+            ],
+            "temperature": settings.LLM_TEMPERATURE,
+            "max_tokens": min(route.max_tokens * len(prompts), settings.LLM_BATCH_MAX_OUTPUT_TOKENS),
+            "response_format": {"type": "json_object"}
+        }
+        return payload, total_tokens, pool
+
+    @staticmethod
+    def _parse_batch_response(content: str, expected_ids: List[str]) -> Dict[str, str]:
+        """Split a batched JSON response into ``{prompt id: digest}``."""
+        text = content.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            text = text[text.find("{"):]
+        try:
+            sections = json.loads(text)["sections"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise BatchResponseError(f"Batched response is not valid JSON: {str(e)}") from e
+
+        results = {}
+        for section in sections if isinstance(sections, list) else []:
+            if not isinstance(section, dict):
+                continue
+            section_id = str(section.get("id", ""))
+            section_content = section.get("content")
+            if section_id in expected_ids and isinstance(section_content, str) and section_content.strip():
+                results[section_id] = section_content.strip()
+        if not results:
+            raise BatchResponseError("Batched response contained no usable sections")
+        return results
+
+    async def generate_batch_summary(
+        self,
+        feed_content: str,
+        frequency: UpdateFrequency,
+        prompts: List[Dict[str, Any]],
+        max_retries: int = 3,
+        priority: JobPriority = JobPriority.SCHEDULED,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, str]:
+        """
+        Answer several prompts sharing one article window with a single request.
+
+        `prompts` items carry ``id``, ``content``, ``template_type`` and
+        ``custom_template``. Returns the digests keyed by ``str(id)``; prompts
+        missing from the response are simply absent, and a response that
+        cannot be parsed at all raises BatchResponseError.
+        """
+        payload, total_tokens, pool = self._build_batch_request(feed_content, frequency, prompts)
+        result = await self._complete(pool, payload, total_tokens, priority, deadline or Deadline(), max_retries)
+        return self._parse_batch_response(result.content, [str(item["id"]) for item in prompts])
+
+    async def stream_summary(
+        self,
+        feed_content: str,
+        prompt_content: str,
+        frequency: UpdateFrequency,
+        template_type: TemplateType,
+        custom_template: Optional[str] = None,
+        max_retries: int = 3,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a summary with `stream: true`, yielding content deltas as they arrive.
+
+        Failed attempts are retried only while nothing has been yielded yet;
+        once tokens have been relayed to the caller an error is raised as is.
+        """
+        deadline = deadline or Deadline()
+        payload, total_tokens, pool = await self._build_request(
+            feed_content=feed_content,
+            prompt_content=prompt_content,
+            frequency=frequency,
+            template_type=template_type,
+            custom_template=custom_template
+        )
+
+        retries = 0
+        unspent = False
+        try:
+            while True:
+                await self._admit(pool, priority, total_tokens if retries == 0 else 0, deadline)
+                emitted = False
+                delay = None
+                unspent = False
+                try:
+                    async for delta in self.provider.stream(payload, timeout=deadline.remaining()):
+                        deadline.check("the LLM stream finished")
+                        emitted = True
+                        yield delta
+                except LLMRateLimitError as e:
+                    error = e
+                    if not emitted:
+                        unspent = True
+                        delay = pool.concurrency.on_rate_limited(e.retry_after, e.headers)
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    error = e
+                else:
+                    pool.concurrency.on_success()
+                    return
+                finally:
+                    await pool.concurrency.release()
+
+                retries += 1
+                if emitted or retries >= max_retries:
+                    logger.error(f"Error streaming from LLM service: {str(error)}")
+                    raise error
+                await sleep(self._retry_delay(pool, delay, retries, deadline, error))
+        except BaseException:
+            if unspent:
+                await asyncio.shield(pool.rate_limiter.release(total_tokens))
+            raise
+
+    @property
+    def supports_batch_jobs(self) -> bool:
+        return self.provider.supports_batches
+
+    async def build_batch_job_line(
+        self,
+        custom_id: str,
+        feed_content: str,
+        prompt_content: str,
+        frequency: UpdateFrequency,
+        template_type: TemplateType,
+        custom_template: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One line of an offline batch job: the same request generate_summary would send."""
+        payload, _, _ = await self._build_request(
+            feed_content=feed_content,
+            prompt_content=prompt_content,
+            frequency=frequency,
+            template_type=template_type,
+            custom_template=custom_template
+        )
+        return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": payload}
+
+    async def submit_batch_job(self, jsonl: str) -> str:
+        """
+        Submit a JSONL batch job to the provider and return its id.
+
+        Batch jobs bypass the per-minute limiter and the job queue: the
+        provider runs them against a separate budget.
+        """
+        if not self.provider.supports_batches:
+            raise LLMProviderError(f"Provider {self.provider.name} does not support batch jobs")
+        return await self.provider.submit_batch(jsonl)
+
+    async def wait_for_batch_job(
+        self,
+        batch_id: str,
+        poll_interval: float,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, str]:
+        """
+        Poll a batch job until it finishes and return its completions by custom_id.
+
+        A job that ends in any state other than "completed" yields whatever
+        partial output it produced; raises DeadlineExceeded if still running
+        at `deadline`.
+        """
+        deadline = deadline or Deadline()
+        while True:
+            summaries = await self.poll_batch_job(batch_id)
+            if summaries is not None:
+                return summaries
+            deadline.check(f"batch job {batch_id} completed")
+            await sleep(deadline.clamp(poll_interval))
+
+    async def poll_batch_job(self, batch_id: str) -> Optional[Dict[str, str]]:
+        """Completions of a finished batch job by custom_id, or None while it is still running."""
+        batch = await self.provider.get_batch(batch_id)
+        if not batch.done:
+            return None
+        if batch.status != "completed":
+            logger.warning(f"Batch job {batch_id} ended with status {batch.status}")
+        results = await self.provider.get_batch_results(batch)
+        return {custom_id: result.content for custom_id, result in results.items()}
+
+# Process-wide client: every caller shares one limiter and one encoder
+llm_service = LLMService()
 
-llm_service = LLMService()
\ No newline at end of file
+def get_llm_service() -> LLMService:
+    """Return the shared LLM client."""
+    return llm_service
\ No newline at end of file
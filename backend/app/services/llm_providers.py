@@ -0,0 +1,506 @@
+# app/services/llm_providers.py
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Any, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProviderError(Exception):
+    """Error returned by an LLM provider."""
+
+    def __init__(self, message: str, status: Optional[int] = None, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class LLMRateLimitError(LLMProviderError):
+    """The provider rejected the request because a rate limit was exceeded."""
+
+    def __init__(
+        self,
+        message: str,
+        retry_after: Optional[float] = None,
+        status: Optional[int] = 429,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        super().__init__(message, status=status, headers=headers)
+        self.retry_after = retry_after
+
+
+@dataclass
+class CompletionResult:
+    """Text of a completion plus the response metadata providers report."""
+    content: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    usage: Dict[str, Any] = field(default_factory=dict)
+
+
+# Batch states after which a job will not change anymore
+BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class BatchStatus:
+    """Progress of an offline batch job as reported by the provider."""
+    id: str
+    status: str
+    output_file_id: Optional[str] = None
+    request_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def done(self) -> bool:
+        return self.status in BATCH_TERMINAL_STATES
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> "BatchStatus":
+        return cls(
+            id=data["id"],
+            status=data.get("status", "unknown"),
+            output_file_id=data.get("output_file_id"),
+            request_counts=data.get("request_counts") or {}
+        )
+
+
+def parse_batch_output(text: str) -> Dict[str, CompletionResult]:
+    """
+    Parse a batch output file into ``{custom_id: result}``.
+
+    Each line holds one request's outcome; failed requests are logged and
+    left out so the caller can retry them individually.
+    """
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                logger.warning(f"Batch request {item.get('custom_id')} failed: {item.get('error') or response}")
+                continue
+            body = response["body"]
+            results[item["custom_id"]] = CompletionResult(
+                content=body["choices"][0]["message"]["content"],
+                usage=body.get("usage") or {}
+            )
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.warning(f"Skipping malformed batch output line: {str(e)}")
+    return results
+
+
+class LLMProvider:
+    """
+    Interface for chat-completion backends.
+
+    `payload` is an OpenAI-style chat-completions request body; providers
+    translate it to their own wire format if needed. `timeout` caps the
+    whole call in seconds, on top of the provider's own connect/read limits.
+    """
+
+    name = "base"
+
+    async def complete(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> CompletionResult:
+        raise NotImplementedError
+
+    def stream(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    # Offline batch jobs: `jsonl` holds one chat-completions request per line
+    # as ``{"custom_id", "method", "url", "body"}``
+    supports_batches = False
+
+    async def submit_batch(self, jsonl: str) -> str:
+        """Submit a batch job and return its id."""
+        raise NotImplementedError
+
+    async def get_batch(self, batch_id: str) -> BatchStatus:
+        raise NotImplementedError
+
+    async def get_batch_results(self, batch: BatchStatus) -> Dict[str, CompletionResult]:
+        """Results of a completed job keyed by custom_id."""
+        raise NotImplementedError
+
+
+def _parse_retry_after(message: str) -> Optional[float]:
+    """Extract the delay from messages like "Please try again in 1.5s" / "in 600ms"."""
+    match = re.search(r"try again in (\d+(?:\.\d+)?)(ms|s)", message)
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value / 1000 if match.group(2) == "ms" else value
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Provider for any server speaking the OpenAI chat-completions protocol.
+
+    Works against api.openai.com as well as local llama.cpp / vLLM style
+    servers and the bundled mock server, selected by LLM_API_BASE. Only
+    some of those expose the /files and /batches endpoints: batch support
+    is assumed for api.openai.com and must be enabled for other servers.
+    """
+
+    name = "openai"
+    supports_batches = False  # set per instance from `batches`
+
+    def __init__(
+        self,
+        api_base: str,
+        api_key: Optional[str] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        total_timeout: Optional[float] = None,
+        batches: Optional[bool] = None
+    ):
+        self.api_base = api_base.rstrip("/")
+        if batches is None:
+            batches = urlparse(self.api_base).hostname == "api.openai.com"
+        self.supports_batches = batches
+        self.api_key = api_key
+        self.chat_url = f"{self.api_base}/chat/completions"
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+
+    def _timeout(self, timeout: Optional[float], streaming: bool = False) -> aiohttp.ClientTimeout:
+        # A stream may legitimately outlast total_timeout; it is bounded by
+        # the per-read timeout and the caller's deadline instead
+        total = None if streaming else self.total_timeout
+        if timeout is not None:
+            total = timeout if total is None else min(total, timeout)
+        return aiohttp.ClientTimeout(total=total, connect=self.connect_timeout, sock_read=self.read_timeout)
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    async def _raise_for_error(self, response: aiohttp.ClientResponse) -> None:
+        error_text = await response.text()
+        headers = dict(response.headers)
+        try:
+            error = json.loads(error_text).get("error") or {}
+        except (ValueError, AttributeError):
+            error = {}
+        message = error.get("message") or error_text
+
+        if response.status == 429 or error.get("code") == "rate_limit_exceeded":
+            retry_after = None
+            if response.headers.get("retry-after"):
+                try:
+                    retry_after = float(response.headers["retry-after"])
+                except ValueError:
+                    retry_after = None
+            if retry_after is None:
+                retry_after = _parse_retry_after(message)
+            raise LLMRateLimitError(message, retry_after=retry_after, status=response.status, headers=headers)
+
+        raise LLMProviderError(f"LLM API Error: {error_text}", status=response.status, headers=headers)
+
+    async def complete(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> CompletionResult:
+        async with aiohttp.ClientSession(timeout=self._timeout(timeout)) as session:
+            async with session.post(self.chat_url, headers=self._headers(), json=payload) as response:
+                if response.status != 200:
+                    await self._raise_for_error(response)
+                data = await response.json()
+                return CompletionResult(
+                    content=data['choices'][0]['message']['content'],
+                    headers=dict(response.headers),
+                    usage=data.get('usage') or {}
+                )
+
+    async def stream(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> AsyncIterator[str]:
+        payload = {**payload, "stream": True}
+        async with aiohttp.ClientSession(timeout=self._timeout(timeout, streaming=True)) as session:
+            async with session.post(self.chat_url, headers=self._headers(), json=payload) as response:
+                if response.status != 200:
+                    await self._raise_for_error(response)
+
+                # Server-sent events: one "data: {...}" line per chunk
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+                    choices = json.loads(data).get("choices") or []
+                    if not choices:
+                        continue
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+
+    def _auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    async def submit_batch(self, jsonl: str) -> str:
+        async with aiohttp.ClientSession(timeout=self._timeout(None)) as session:
+            form = aiohttp.FormData()
+            form.add_field("purpose", "batch")
+            form.add_field("file", jsonl.encode("utf-8"), filename="batch.jsonl", content_type="application/jsonl")
+            async with session.post(f"{self.api_base}/files", headers=self._auth_headers(), data=form) as response:
+                if response.status != 200:
+                    await self._raise_for_error(response)
+                input_file_id = (await response.json())["id"]
+
+            body = {
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h"
+            }
+            async with session.post(f"{self.api_base}/batches", headers=self._headers(), json=body) as response:
+                if response.status != 200:
+                    await self._raise_for_error(response)
+                return (await response.json())["id"]
+
+    async def get_batch(self, batch_id: str) -> BatchStatus:
+        async with aiohttp.ClientSession(timeout=self._timeout(None)) as session:
+            async with session.get(f"{self.api_base}/batches/{batch_id}", headers=self._auth_headers()) as response:
+                if response.status != 200:
+                    await self._raise_for_error(response)
+                return BatchStatus.from_response(await response.json())
+
+    async def get_batch_results(self, batch: BatchStatus) -> Dict[str, CompletionResult]:
+        if not batch.output_file_id:
+            return {}
+        url = f"{self.api_base}/files/{batch.output_file_id}/content"
+        async with aiohttp.ClientSession(timeout=self._timeout(None)) as session:
+            async with session.get(url, headers=self._auth_headers()) as response:
+                if response.status != 200:
+                    await self._raise_for_error(response)
+                return parse_batch_output(await response.text())
+
+
+class MockProvider(LLMProvider):
+    """
+    Deterministic in-process provider for offline benchmarks and load tests.
+
+    The same request always produces the same text. Latency is
+    `latency + output_tokens / tokens_per_second`; rate limiting can be
+    simulated with a requests-per-minute ceiling and/or by rejecting every
+    Nth request with a 429. Batch jobs are kept in memory and complete
+    `batch_latency` seconds after submission.
+    """
+
+    name = "mock"
+    supports_batches = True
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        tokens_per_second: float = 50.0,
+        requests_per_minute: int = 0,
+        rate_limit_every: int = 0,
+        output_tokens: int = 200,
+        batch_latency: float = 5.0
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.requests_per_minute = requests_per_minute
+        self.rate_limit_every = rate_limit_every
+        self.output_tokens = output_tokens
+        self.batch_latency = batch_latency
+        self._request_count = 0
+        self._recent: Deque[float] = deque()
+        self._files: Dict[str, str] = {}
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    _WORDS = (
+        "markets", "officials", "announced", "report", "growth", "policy", "analysts",
+        "expected", "global", "technology", "election", "climate", "science", "talks",
+        "record", "investors", "security", "launch", "agreement", "update",
+    )
+
+    def _admit(self) -> None:
+        """Apply the simulated rate limits, raising LLMRateLimitError on rejection."""
+        self._request_count += 1
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 60:
+            self._recent.popleft()
+
+        if self.rate_limit_every and self._request_count % self.rate_limit_every == 0:
+            raise LLMRateLimitError(
+                "Rate limit reached. Please try again in 1s.",
+                retry_after=1.0,
+                headers={"retry-after": "1"}
+            )
+
+        if self.requests_per_minute:
+            if len(self._recent) >= self.requests_per_minute:
+                retry_after = max(0.0, 60 - (now - self._recent[0]))
+                raise LLMRateLimitError(
+                    f"Rate limit reached. Please try again in {retry_after:.3f}s.",
+                    retry_after=retry_after,
+                    headers={
+                        "retry-after": f"{retry_after:.3f}",
+                        "x-ratelimit-limit-requests": str(self.requests_per_minute),
+                        "x-ratelimit-remaining-requests": "0",
+                    }
+                )
+        self._recent.append(now)
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        if not self.requests_per_minute:
+            return {}
+        return {
+            "x-ratelimit-limit-requests": str(self.requests_per_minute),
+            "x-ratelimit-remaining-requests": str(max(0, self.requests_per_minute - len(self._recent))),
+        }
+
+    def _generate_words(self, payload: Dict[str, Any]) -> list:
+        digest = hashlib.sha256(
+            json.dumps(payload.get("messages", []), sort_keys=True).encode("utf-8")
+        ).digest()
+        count = min(self.output_tokens, payload.get("max_tokens") or self.output_tokens)
+        return [self._WORDS[digest[i % len(digest)] % len(self._WORDS)] for i in range(count)]
+
+    def _render(self, payload: Dict[str, Any], words: list) -> str:
+        """Plain text, or one JSON section per "### Prompt <id>" for batched requests."""
+        if (payload.get("response_format") or {}).get("type") != "json_object":
+            return "Mock Headline\n\n" + " ".join(words)
+        user_content = payload["messages"][-1]["content"]
+        ids = re.findall(r"^### Prompt (\S+)$", user_content, flags=re.MULTILINE)
+        return json.dumps({
+            "sections": [{"id": prompt_id, "content": f"Mock Headline {prompt_id}\n\n" + " ".join(words)} for prompt_id in ids]
+        })
+
+    async def complete(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> CompletionResult:
+        self._admit()
+        words = self._generate_words(payload)
+        delay = self.latency
+        if self.tokens_per_second:
+            delay += len(words) / self.tokens_per_second
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(delay)
+        return CompletionResult(
+            content=self._render(payload, words),
+            headers=self._rate_limit_headers(),
+            usage={"completion_tokens": len(words)}
+        )
+
+    async def stream(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> AsyncIterator[str]:
+        self._admit()
+        await asyncio.sleep(self.latency)
+        yield "Mock Headline\n\n"
+        interval = 1 / self.tokens_per_second if self.tokens_per_second else 0
+        for index, word in enumerate(self._generate_words(payload)):
+            if interval:
+                await asyncio.sleep(interval)
+            yield word if index == 0 else f" {word}"
+
+    # Files/batches store, shared with the mock server's batch endpoints
+
+    def upload_file(self, content: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex}"
+        self._files[file_id] = content
+        return file_id
+
+    def file_content(self, file_id: str) -> Optional[str]:
+        return self._files.get(file_id)
+
+    def create_batch(self, input_file_id: str) -> Dict[str, Any]:
+        if input_file_id not in self._files:
+            raise LLMProviderError(f"No such file: {input_file_id}", status=404)
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        self._batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": input_file_id,
+            "completion_window": "24h",
+            "status": "in_progress",
+            "output_file_id": None,
+            "created_at": int(time.time()),
+            "_ready_at": time.monotonic() + self.batch_latency,
+        }
+        return self.retrieve_batch(batch_id)
+
+    def retrieve_batch(self, batch_id: str) -> Dict[str, Any]:
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            raise LLMProviderError(f"No such batch: {batch_id}", status=404)
+        if batch["status"] == "in_progress" and time.monotonic() >= batch["_ready_at"]:
+            self._finish_batch(batch)
+        return {k: v for k, v in batch.items() if not k.startswith("_")}
+
+    def _finish_batch(self, batch: Dict[str, Any]) -> None:
+        output = []
+        for line in self._files[batch["input_file_id"]].splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request["body"]
+            words = self._generate_words(body)
+            output.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "object": "chat.completion",
+                        "model": body.get("model", "mock"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": self._render(body, words)},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {"completion_tokens": len(words)},
+                    },
+                },
+                "error": None,
+            }))
+        batch["status"] = "completed"
+        batch["output_file_id"] = self.upload_file("\n".join(output) + "\n")
+        batch["request_counts"] = {"total": len(output), "completed": len(output), "failed": 0}
+
+    async def submit_batch(self, jsonl: str) -> str:
+        return self.create_batch(self.upload_file(jsonl))["id"]
+
+    async def get_batch(self, batch_id: str) -> BatchStatus:
+        return BatchStatus.from_response(self.retrieve_batch(batch_id))
+
+    async def get_batch_results(self, batch: BatchStatus) -> Dict[str, CompletionResult]:
+        if not batch.output_file_id:
+            return {}
+        return parse_batch_output(self.file_content(batch.output_file_id) or "")
+
+
+def create_llm_provider() -> LLMProvider:
+    """Build the provider selected by LLM_PROVIDER."""
+    settings = get_settings()
+    if settings.LLM_PROVIDER == "mock":
+        return MockProvider(
+            latency=settings.LLM_MOCK_LATENCY,
+            tokens_per_second=settings.LLM_MOCK_TOKENS_PER_SECOND,
+            requests_per_minute=settings.LLM_MOCK_REQUESTS_PER_MINUTE,
+            rate_limit_every=settings.LLM_MOCK_RATE_LIMIT_EVERY,
+            batch_latency=settings.LLM_MOCK_BATCH_LATENCY
+        )
+    if settings.LLM_PROVIDER == "openai":
+        return OpenAICompatibleProvider(
+            settings.LLM_API_BASE,
+            settings.LLM_API_KEY,
+            connect_timeout=settings.LLM_CONNECT_TIMEOUT,
+            read_timeout=settings.LLM_READ_TIMEOUT,
+            total_timeout=settings.LLM_TOTAL_TIMEOUT,
+            batches=settings.LLM_API_BATCHES
+        )
+    raise ValueError(f"Unknown LLM provider: {settings.LLM_PROVIDER}")
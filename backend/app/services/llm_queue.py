@@ -0,0 +1,110 @@
+# app/services/llm_queue.py
+import asyncio
+import enum
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Any, List, Optional, Tuple
+
+from app.core.metrics import metrics
+
+
+class JobPriority(str, enum.Enum):
+    INTERACTIVE = "interactive"  # user clicked "generate"
+    SCHEDULED = "scheduled"  # regular hourly/daily runs
+    BACKFILL = "backfill"  # catch-up and bulk work
+
+
+class LLMJobQueue:
+    """
+    Orders access to the LLM client by priority class.
+
+    Only one job at a time holds the "turn": it reserves rate-limit budget
+    and a concurrency slot, then hands the turn to the next job. Waiters are
+    ranked by ``enqueued_at + offset[priority]``, so an interactive request
+    overtakes scheduled work that arrived less than the scheduled offset
+    earlier, while a job that has waited longer than its offset can no
+    longer be overtaken. This bounds starvation of the lower classes.
+    """
+
+    def __init__(self, offsets: Optional[Dict[JobPriority, float]] = None):
+        self.offsets = offsets or {
+            JobPriority.INTERACTIVE: 0.0,
+            JobPriority.SCHEDULED: 60.0,
+            JobPriority.BACKFILL: 300.0,
+        }
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._busy = False
+        self._depth: Dict[JobPriority, int] = {priority: 0 for priority in JobPriority}
+        self._admitted: Dict[JobPriority, int] = {priority: 0 for priority in JobPriority}
+        self._total_wait: Dict[JobPriority, float] = {priority: 0.0 for priority in JobPriority}
+        self._max_wait: Dict[JobPriority, float] = {priority: 0.0 for priority in JobPriority}
+        self._recent_waits: Dict[JobPriority, Deque[float]] = {
+            priority: deque(maxlen=100) for priority in JobPriority
+        }
+
+    def _set_depth(self, priority: JobPriority, delta: int) -> None:
+        self._depth[priority] += delta
+        metrics.set_gauge("llm_queue_depth", self._depth[priority], {"priority": priority.value})
+
+    def _record_wait(self, priority: JobPriority, waited: float) -> None:
+        self._admitted[priority] += 1
+        self._total_wait[priority] += waited
+        self._max_wait[priority] = max(self._max_wait[priority], waited)
+        self._recent_waits[priority].append(waited)
+        metrics.observe("llm_queue_wait_seconds", waited, {"priority": priority.value})
+
+    async def _acquire_turn(self, priority: JobPriority) -> None:
+        start = time.monotonic()
+        if not self._busy and not self._heap:
+            self._busy = True
+            self._record_wait(priority, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (start + self.offsets[priority], next(self._seq), future))
+        self._set_depth(priority, 1)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted the turn just as we were cancelled: pass it on
+            if future.done() and not future.cancelled():
+                self._release_turn()
+            raise
+        finally:
+            self._set_depth(priority, -1)
+        self._record_wait(priority, time.monotonic() - start)
+
+    def _release_turn(self) -> None:
+        while self._heap:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._busy = False
+
+    @asynccontextmanager
+    async def turn(self, priority: JobPriority) -> AsyncIterator[None]:
+        """Hold the head-of-line position for `priority` until the block exits."""
+        await self._acquire_turn(priority)
+        try:
+            yield
+        finally:
+            self._release_turn()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for priority in JobPriority:
+            recent = self._recent_waits[priority]
+            admitted = self._admitted[priority]
+            stats[priority.value] = {
+                "depth": self._depth[priority],
+                "admitted": admitted,
+                "average_wait": self._total_wait[priority] / admitted if admitted else 0.0,
+                "recent_average_wait": sum(recent) / len(recent) if recent else 0.0,
+                "max_wait": self._max_wait[priority],
+            }
+        return stats
@@ -0,0 +1,191 @@
+# app/services/llm_routing.py
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional
+
+import tiktoken
+
+from app.core.metrics import metrics
+from app.models.news import UpdateFrequency
+from app.models.prompt import TemplateType
+from app.services.concurrency import AdaptiveConcurrencyLimiter
+from app.services.llm_queue import JobPriority, LLMJobQueue
+from app.services.rate_limiter import AsyncRateLimiter, create_rate_limit_backend
+from app.services.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# Used for models tiktoken does not know, e.g. local llama.cpp / vLLM models
+FALLBACK_ENCODING = "cl100k_base"
+
+
+@lru_cache()
+def get_encoder(model: str, encoding: Optional[str] = None) -> tiktoken.Encoding:
+    """Load the tiktoken encoder for a model once per process."""
+    if encoding:
+        return tiktoken.get_encoding(encoding)
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.warning(f"No tiktoken encoding known for {model}, using {FALLBACK_ENCODING}")
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """
+    Model and output budget for one class of requests.
+
+    A route matches a request when the input fits `max_input_tokens` and
+    the frequency and every template type involved are allowed; criteria
+    left as None match anything. Rate limits default to the global ones.
+    """
+    name: str
+    model: str
+    max_tokens: int
+    max_input_tokens: Optional[int] = None
+    frequencies: Optional[FrozenSet[UpdateFrequency]] = None
+    template_types: Optional[FrozenSet[TemplateType]] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    encoding: Optional[str] = None
+
+    def matches(self, tokens: int, frequency: UpdateFrequency, template_types: Iterable[TemplateType]) -> bool:
+        if self.max_input_tokens is not None and tokens > self.max_input_tokens:
+            return False
+        if self.frequencies is not None and frequency not in self.frequencies:
+            return False
+        if self.template_types is not None and not set(template_types) <= self.template_types:
+            return False
+        return True
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_max_tokens: int) -> "ModelRoute":
+        """Build a route from LLM_ROUTES config; enum criteria are given by value."""
+        frequencies = data.get("frequencies")
+        template_types = data.get("template_types")
+        return cls(
+            name=data.get("name") or data["model"],
+            model=data["model"],
+            max_tokens=data.get("max_tokens") or default_max_tokens,
+            max_input_tokens=data.get("max_input_tokens"),
+            frequencies=frozenset(UpdateFrequency(f) for f in frequencies) if frequencies is not None else None,
+            template_types=(
+                frozenset(TemplateType(t) for t in template_types) if template_types is not None else None
+            ),
+            requests_per_minute=data.get("requests_per_minute"),
+            tokens_per_minute=data.get("tokens_per_minute"),
+            encoding=data.get("encoding")
+        )
+
+
+def check_shared_models(routes: Iterable[ModelRoute], requests_per_minute: int, tokens_per_minute: int) -> None:
+    """
+    Reject routes that share a model but not its limits or encoding.
+
+    Providers meter each model once, so routes on the same model share one
+    ModelPool. A second route's own limits would otherwise be ignored in
+    favour of the first's; `requests_per_minute`/`tokens_per_minute` are the
+    global limits a route without its own falls back to.
+    """
+    seen: Dict[str, ModelRoute] = {}
+    for route in routes:
+        first = seen.setdefault(route.model, route)
+        mismatched = [
+            name for name, a, b in (
+                ("requests_per_minute", first.requests_per_minute or requests_per_minute,
+                 route.requests_per_minute or requests_per_minute),
+                ("tokens_per_minute", first.tokens_per_minute or tokens_per_minute,
+                 route.tokens_per_minute or tokens_per_minute),
+                ("encoding", first.encoding, route.encoding),
+            )
+            if a != b
+        ]
+        if mismatched:
+            raise ValueError(
+                f"Routes {first.name!r} and {route.name!r} share model {route.model!r} "
+                f"but set different {', '.join(mismatched)}; a model has one rate limit pool"
+            )
+
+
+class ModelPool:
+    """
+    Admission state of one route: its own limiter, concurrency window,
+    priority queue and token counter, since providers meter every model
+    separately.
+    """
+
+    def __init__(
+        self,
+        route: ModelRoute,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        concurrency: Dict[str, int],
+        priority_offsets: Dict[JobPriority, float],
+        interactive_reserve: float = 0.0
+    ):
+        self.route = route
+        self.requests_per_minute = route.requests_per_minute or requests_per_minute
+        self.tokens_per_minute = route.tokens_per_minute or tokens_per_minute
+        self.rate_limiter = AsyncRateLimiter(
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            name=route.model,
+            backend=create_rate_limit_backend(
+                name=route.model,
+                requests_per_minute=self.requests_per_minute,
+                tokens_per_minute=self.tokens_per_minute
+            )
+        )
+        # Each bucket must still hold one request at the reserve
+        self.interactive_reserve = max(0.0, min(interactive_reserve, 1 - 1 / self.requests_per_minute))
+        self.concurrency = AdaptiveConcurrencyLimiter(name=route.model, **concurrency)
+        self.job_queue = LLMJobQueue(priority_offsets)
+        self.token_counter = TokenCounter(lambda: get_encoder(route.model, route.encoding))
+
+    @property
+    def encoder(self) -> tiktoken.Encoding:
+        return self.token_counter.encoder
+
+    def reserve(self, priority: JobPriority) -> float:
+        """
+        Share of the shared budget a job of `priority` must leave unspent.
+
+        The priority queue only orders the jobs of this process; the reserve
+        keeps scheduled and backfill work of every process sharing the
+        limiter backend from using the headroom of interactive requests.
+        """
+        return 0.0 if priority == JobPriority.INTERACTIVE else self.interactive_reserve
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.route.model,
+            "interactive_reserve": self.interactive_reserve,
+            **self.rate_limiter.get_stats(),
+            "concurrency": self.concurrency.get_stats(),
+            "queue": self.job_queue.get_stats(),
+            "token_counter": self.token_counter.get_stats()
+        }
+
+
+class ModelRouter:
+    """Picks the first configured route matching a request, or the default route."""
+
+    def __init__(self, routes: List[ModelRoute], default: ModelRoute):
+        self.routes = routes
+        self.default = default
+
+    def select(
+        self,
+        tokens: int,
+        frequency: UpdateFrequency,
+        template_types: Iterable[TemplateType]
+    ) -> ModelRoute:
+        template_types = list(template_types)
+        route = next(
+            (route for route in self.routes if route.matches(tokens, frequency, template_types)),
+            self.default
+        )
+        metrics.inc("llm_route_selected", labels={"route": route.name})
+        return route
@@ -0,0 +1,147 @@
+# app/services/mock_llm_server.py
+"""
+Local OpenAI-compatible server backed by MockProvider.
+
+Run with ``python -m app.services.mock_llm_server --port 8001`` and point the
+API at it with ``LLM_API_BASE=http://localhost:8001/v1`` to benchmark the
+generation pipeline without network access or API spend. The files and
+batches endpoints emulate the offline Batch API used for daily digests.
+"""
+import argparse
+import json
+import logging
+import time
+import uuid
+
+from aiohttp import web
+
+from app.services.llm_providers import LLMProviderError, LLMRateLimitError, MockProvider
+
+logger = logging.getLogger(__name__)
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> bytes:
+    body = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(body)}\n\n".encode("utf-8")
+
+
+def create_app(provider: MockProvider) -> web.Application:
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        model = payload.get("model", "mock")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        try:
+            if not payload.get("stream"):
+                result = await provider.complete(payload)
+                return web.json_response(
+                    {
+                        "id": completion_id,
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": result.content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": result.usage,
+                    },
+                    headers=result.headers
+                )
+
+            stream = provider.stream(payload)
+            first = await stream.__anext__()
+        except LLMRateLimitError as e:
+            return web.json_response(
+                {"error": {"message": str(e), "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429,
+                headers=e.headers
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(_chunk(completion_id, model, {"role": "assistant", "content": first}))
+        async for delta in stream:
+            await response.write(_chunk(completion_id, model, {"content": delta}))
+        await response.write(_chunk(completion_id, model, {}, finish_reason="stop"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def not_found(message: str) -> web.Response:
+        return web.json_response({"error": {"message": message, "type": "invalid_request_error"}}, status=404)
+
+    async def upload_file(request: web.Request) -> web.Response:
+        form = await request.post()
+        upload = form.get("file")
+        if upload is None:
+            return web.json_response({"error": {"message": "Missing file", "type": "invalid_request_error"}}, status=400)
+        content = upload.file.read().decode("utf-8")
+        return web.json_response({
+            "id": provider.upload_file(content),
+            "object": "file",
+            "bytes": len(content),
+            "purpose": form.get("purpose", "batch"),
+        })
+
+    async def file_content(request: web.Request) -> web.Response:
+        content = provider.file_content(request.match_info["file_id"])
+        if content is None:
+            return not_found("No such file")
+        return web.Response(text=content, content_type="application/jsonl")
+
+    async def create_batch(request: web.Request) -> web.Response:
+        body = await request.json()
+        try:
+            return web.json_response(provider.create_batch(body.get("input_file_id", "")))
+        except LLMProviderError as e:
+            return not_found(str(e))
+
+    async def retrieve_batch(request: web.Request) -> web.Response:
+        try:
+            return web.json_response(provider.retrieve_batch(request.match_info["batch_id"]))
+        except LLMProviderError as e:
+            return not_found(str(e))
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/v1/files", upload_file)
+    app.router.add_get("/v1/files/{file_id}/content", file_content)
+    app.router.add_post("/v1/batches", create_batch)
+    app.router.add_get("/v1/batches/{batch_id}", retrieve_batch)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a mock OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Simulated output throughput")
+    parser.add_argument("--requests-per-minute", type=int, default=0, help="Return 429 above this rate (0 = off)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Return 429 for every Nth request (0 = off)")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Words generated per completion")
+    parser.add_argument("--batch-latency", type=float, default=5.0, help="Seconds until a batch job completes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    provider = MockProvider(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        requests_per_minute=args.requests_per_minute,
+        rate_limit_every=args.rate_limit_every,
+        output_tokens=args.output_tokens,
+        batch_latency=args.batch_latency
+    )
+    web.run_app(create_app(provider), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,56 @@
 # app/services/news.py
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 import logging
-from typing import List, Dict, Any, Optional, Union
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple, Union
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import desc, func
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import HTTPException
 import dateutil.parser
 from dateutil.tz import gettz
 
+from app.config.settings import get_settings
+from app.core.database import session_scope
 from app.models.news import News, UpdateFrequency
 from app.models.prompt import Prompt, VisibilityType, TemplateType
+from app.models.prompt_run import PromptRun
+from app.models.news_count import NewsCount
 from app.models.user import User
-from app.services.llm import LLMService
-from app.schemas.news import NewsListResponse, PublicNewsResponse
+from app.services.llm import BatchResponseError, llm_service
+from app.services.llm_queue import JobPriority
+from app.services.news_counts import CountMode, NewsCountService
+from app.utils.helpers import Deadline
+from app.utils.pagination import paginate
+from app.schemas.news import NewsListResponse, NewsResponse, PublicNewsResponse
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class GenerationTarget:
+    """The prompt and owner fields generation needs, read once up front."""
+    prompt_id: int
+    content: str
+    template_type: TemplateType
+    custom_template: Optional[str]
+    timezone: str
+
+
+@dataclass
+class GenerationOutcome:
+    """What a batch generation did for each prompt it was given."""
+    generated: List[int] = field(default_factory=list)  # news stored
+    empty: List[int] = field(default_factory=list)  # no new content; the run is recorded
+    failed: List[int] = field(default_factory=list)  # no news stored; safe to retry
+
 
 class NewsService:
     def __init__(self, db: Session):
         self.db = db
-        self.llm_service = LLMService()
+        self.llm_service = llm_service
 
     def verify_prompt_access(self, prompt_id: int, user: Optional[User] = None) -> Prompt:
         """Verify prompt access based on visibility and user."""
@@ -44,17 +75,20 @@ class NewsService:
 
         return prompt
 
+    @staticmethod
     def _filter_content_by_time(
-        self,
         feeds: List[Dict[str, Any]],
         frequency: UpdateFrequency,
-        user_timezone: str
+        user_timezone: str,
+        since: Optional[datetime] = None
     ) -> str:
-        """Filter feed content based on frequency and timezone."""
+        """Filter feed content based on frequency (or an explicit `since`) and timezone."""
         user_tz = gettz(user_timezone)
         now = datetime.now(user_tz)
         
-        if frequency == UpdateFrequency.HOURLY:
+        if since is not None:
+            cutoff = max(since, now - timedelta(days=1))
+        elif frequency == UpdateFrequency.HOURLY:
             cutoff = now - timedelta(hours=1)
         else:  # DAILY
             cutoff = now - timedelta(days=1)
@@ -84,55 +118,121 @@ class NewsService:
         
         return "\n\n".join(filtered_content)
 
-    async def generate_news(
+    def _prepare_generation(
         self,
         prompt_id: int,
         frequency: UpdateFrequency,
         feeds: List[Dict[str, Any]]
-    ) -> Optional[News]:
-        """Generate news content based on prompt and feeds."""
-        try:
-            prompt = self.db.query(Prompt).filter(Prompt.id == prompt_id).first()
-            if not prompt:
-                logger.error(f"Prompt {prompt_id} not found")
-                return None
+    ) -> Optional[Tuple[GenerationTarget, str]]:
+        """
+        Load prompt and owner and filter feed content; None if there is nothing to generate.
 
-            user = self.db.query(User).filter(User.id == prompt.user_id).first()
-            if not user:
-                logger.error(f"User not found for prompt {prompt_id}")
-                return None
+        Ends its transaction, so the caller holds no connection while the LLM works.
+        """
+        prompt = self.db.query(Prompt).filter(Prompt.id == prompt_id).first()
+        if not prompt:
+            logger.error(f"Prompt {prompt_id} not found")
+            self.db.commit()
+            return None
 
-            filtered_content = self._filter_content_by_time(
-                feeds=feeds,
-                frequency=frequency,
-                user_timezone=user.timezone
-            )
+        user = self.db.query(User).filter(User.id == prompt.user_id).first()
+        if not user:
+            logger.error(f"User not found for prompt {prompt_id}")
+            self.db.commit()
+            return None
+
+        target = GenerationTarget(
+            prompt_id=prompt.id,
+            content=prompt.content,
+            template_type=prompt.template_type,
+            custom_template=prompt.custom_template,
+            timezone=user.timezone
+        )
+        filtered_content = self._filter_content_by_time(
+            feeds=feeds,
+            frequency=frequency,
+            user_timezone=target.timezone
+        )
 
-            if not filtered_content:
-                logger.info(f"No new content for prompt {prompt_id}")
+        if not filtered_content:
+            logger.info(f"No new content for prompt {prompt_id}")
+            self._record_runs([prompt_id], frequency)
+        self.db.commit()
+        return (target, filtered_content) if filtered_content else None
+
+    def _store_news(
+        self,
+        prompt_id: int,
+        frequency: UpdateFrequency,
+        summary: str,
+        user_timezone: str,
+        generated_at: Optional[datetime] = None
+    ) -> News:
+        """
+        Persist a generated summary as a News row, titled with its generation time in `user_timezone`.
+
+        The row comes back expired by the commit: reading it starts a new
+        transaction, so callers that go on to wait on the LLM must not.
+        """
+        user_tz = gettz(user_timezone)
+        local_time = generated_at.astimezone(user_tz) if generated_at else datetime.now(user_tz)
+        
+        news = News(
+            title=f"{frequency.value} Update - {local_time.strftime('%Y-%m-%d %H:%M %Z')}",
+            content=summary,
+            frequency=frequency,
+            prompt_id=prompt_id
+        )
+        
+        self.db.add(news)
+        self._record_runs([prompt_id], frequency)
+        self.db.commit()
+        return news
+
+    def _record_runs(self, prompt_ids: List[int], frequency: UpdateFrequency) -> None:
+        """
+        Remember the latest completed run of (prompt, frequency) for missed-run detection.
+
+        Runs that found no new content count too; only failed runs are left
+        for the job retries and the scheduler's catch-up.
+        """
+        if not prompt_ids:
+            return
+        statement = insert(PromptRun).values([
+            {"prompt_id": prompt_id, "frequency": frequency, "last_run_at": func.now()}
+            for prompt_id in prompt_ids
+        ])
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[PromptRun.prompt_id, PromptRun.frequency],
+            set_={"last_run_at": statement.excluded.last_run_at}
+        ))
+
+    async def generate_news(
+        self,
+        prompt_id: int,
+        frequency: UpdateFrequency,
+        feeds: List[Dict[str, Any]],
+        priority: JobPriority = JobPriority.SCHEDULED,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[News]:
+        """Generate news content based on prompt and feeds, giving up at `deadline`."""
+        try:
+            prepared = self._prepare_generation(prompt_id, frequency, feeds)
+            if not prepared:
                 return None
+            target, filtered_content = prepared
 
             summary = await self.llm_service.generate_summary(
                 feed_content=filtered_content,
-                prompt_content=prompt.content,
+                prompt_content=target.content,
                 frequency=frequency,
-                template_type=prompt.template_type,
-                custom_template=prompt.custom_template
+                template_type=target.template_type,
+                custom_template=target.custom_template,
+                priority=priority,
+                deadline=deadline
             )
 
-            user_tz = gettz(user.timezone)
-            local_time = datetime.now(user_tz)
-            
-            news = News(
-                title=f"{frequency.value} Update - {local_time.strftime('%Y-%m-%d %H:%M %Z')}",
-                content=summary,
-                frequency=frequency,
-                prompt_id=prompt_id
-            )
-            
-            self.db.add(news)
-            self.db.commit()
-            self.db.refresh(news)
+            news = self._store_news(prompt_id, frequency, summary, target.timezone)
             
             logger.info(f"Generated {frequency.value} news for prompt {prompt_id}")
             return news
@@ -142,26 +242,227 @@ class NewsService:
             logger.error(f"Error generating news: {str(e)}")
             raise
 
+    async def generate_news_batch(
+        self,
+        prompt_ids: List[int],
+        frequency: UpdateFrequency,
+        feeds: List[Dict[str, Any]],
+        priority: JobPriority = JobPriority.SCHEDULED,
+        deadline: Optional[Deadline] = None,
+        since: Optional[datetime] = None
+    ) -> GenerationOutcome:
+        """
+        Generate news for several prompts, combining them into batched LLM requests.
+
+        Prompts whose owners share a timezone see the same article window, so
+        up to LLM_BATCH_MAX_PROMPTS of them are answered by one request. Any
+        prompt the batched response does not cover (or a batched request that
+        fails for any reason) falls back to an individual call, and a failing
+        prompt does not affect the others. With LLM_BATCH_PROMPTS
+        off every prompt gets its own request. `since` widens the article
+        window for catch-up runs (capped at one day). The outcome lists the
+        prompts that failed, so a retry can cover just those.
+        """
+        rows = (
+            self.db.query(Prompt, User)
+            .join(User, Prompt.user_id == User.id)
+            .filter(Prompt.id.in_(prompt_ids))
+            .all()
+        )
+        # Commits below expire every loaded object, so read what the LLM calls
+        # need now rather than re-loading each prompt after each stored item
+        targets = [
+            GenerationTarget(
+                prompt_id=prompt.id,
+                content=prompt.content,
+                template_type=prompt.template_type,
+                custom_template=prompt.custom_template,
+                timezone=user.timezone
+            )
+            for prompt, user in rows
+        ]
+        # End the read transaction: no connection is held while the LLM works
+        self.db.commit()
+
+        # Group by article window: same frequency (fixed here) and timezone
+        windows: Dict[str, List[GenerationTarget]] = {}
+        for target in targets:
+            windows.setdefault(target.timezone, []).append(target)
+
+        outcome = GenerationOutcome()
+        settled: Set[int] = set()  # prompts stored or failed by their chunk
+
+        async def generate_chunk(chunk: List[GenerationTarget], filtered_content: str) -> None:
+            summaries: Dict[str, str] = {}
+            if len(chunk) > 1:
+                try:
+                    summaries = await self.llm_service.generate_batch_summary(
+                        feed_content=filtered_content,
+                        frequency=frequency,
+                        prompts=[
+                            {
+                                "id": target.prompt_id,
+                                "content": target.content,
+                                "template_type": target.template_type,
+                                "custom_template": target.custom_template
+                            }
+                            for target in chunk
+                        ],
+                        priority=priority,
+                        deadline=deadline
+                    )
+                except BatchResponseError as e:
+                    logger.warning(f"Batched generation unusable, falling back to individual calls: {str(e)}")
+                except Exception as e:
+                    # Provider errors after retries, timeouts, an expired deadline:
+                    # each prompt then succeeds or fails on its own call
+                    logger.warning(f"Batched generation failed, falling back to individual calls: {str(e)}")
+
+            for target in chunk:
+                try:
+                    summary = summaries.get(str(target.prompt_id))
+                    if summary is None:
+                        summary = await self.llm_service.generate_summary(
+                            feed_content=filtered_content,
+                            prompt_content=target.content,
+                            frequency=frequency,
+                            template_type=target.template_type,
+                            custom_template=target.custom_template,
+                            priority=priority,
+                            deadline=deadline
+                        )
+                    self._store_news(target.prompt_id, frequency, summary, target.timezone)
+                    outcome.generated.append(target.prompt_id)
+                    logger.info(f"Generated {frequency.value} news for prompt {target.prompt_id}")
+                except Exception as e:
+                    self.db.rollback()
+                    outcome.failed.append(target.prompt_id)
+                    logger.error(f"Error generating news for prompt {target.prompt_id}: {str(e)}")
+                settled.add(target.prompt_id)
+
+        # Chunks run concurrently; the LLM client's admission control bounds the load
+        jobs = []
+        chunks: List[List[GenerationTarget]] = []
+        batch_size = max(1, settings.LLM_BATCH_MAX_PROMPTS) if settings.LLM_BATCH_PROMPTS else 1
+        for user_timezone, members in windows.items():
+            filtered_content = self._filter_content_by_time(
+                feeds=feeds,
+                frequency=frequency,
+                user_timezone=user_timezone,
+                since=since
+            )
+            if not filtered_content:
+                logger.info(f"No new content for {len(members)} prompts in {user_timezone}")
+                empty = [target.prompt_id for target in members]
+                self._record_runs(empty, frequency)
+                self.db.commit()
+                outcome.empty.extend(empty)
+                continue
+
+            for start in range(0, len(members), batch_size):
+                chunks.append(members[start:start + batch_size])
+                jobs.append(generate_chunk(chunks[-1], filtered_content))
+
+        # Wait for every chunk even if one fails, so none is still writing
+        # through this session after the caller has moved on (or closed it)
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error generating a {frequency.value} news chunk: {str(result)}")
+                outcome.failed.extend(target.prompt_id for target in chunk if target.prompt_id not in settled)
+        return outcome
+
+    async def stream_news(
+        self,
+        prompt_id: int,
+        frequency: UpdateFrequency,
+        feeds: List[Dict[str, Any]],
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate news while relaying LLM tokens as they arrive.
+
+        Yields ``{"event": ..., "data": ...}`` dicts: a ``token`` event per
+        content delta, then ``done`` with the stored news item, or ``empty``
+        when there is no new content. This service's session is only used,
+        and committed, before the first token.
+        """
+        try:
+            prepared = self._prepare_generation(prompt_id, frequency, feeds)
+            if not prepared:
+                yield {"event": "empty", "data": {"prompt_id": prompt_id}}
+                return
+            target, filtered_content = prepared
+
+            parts: List[str] = []
+            async for delta in self.llm_service.stream_summary(
+                feed_content=filtered_content,
+                prompt_content=target.content,
+                frequency=frequency,
+                template_type=target.template_type,
+                custom_template=target.custom_template,
+                deadline=deadline
+            ):
+                parts.append(delta)
+                yield {"event": "token", "data": delta}
+
+            # Stored in a short session of its own, which is closed before the event is sent
+            with session_scope("request") as db:
+                news = NewsService(db)._store_news(prompt_id, frequency, "".join(parts), target.timezone)
+                stored = NewsResponse.model_validate(news).model_dump(mode="json")
+            logger.info(f"Streamed {frequency.value} news for prompt {prompt_id}")
+            yield {"event": "done", "data": stored}
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error streaming news: {str(e)}")
+            raise
+
+    def _page(
+        self,
+        query,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        include_total: bool,
+        count_mode: CountMode,
+        count_key: tuple,
+        count_conditions: List[Any]
+    ) -> NewsListResponse:
+        """One page of a news listing; its total is optional and by default read from news_counts."""
+        total = None
+        if include_total:
+            total = NewsCountService(self.db).total(count_mode, query, count_key, count_conditions)
+        items, next_cursor = paginate(query, News, limit, cursor=cursor, skip=skip)
+        return NewsListResponse(total=total, items=items, next_cursor=next_cursor)
+
     def get_public_news(
         self,
         skip: int = 0,
         limit: int = 100,
         prompt_id: Optional[int] = None,
-        frequency: Optional[UpdateFrequency] = None
+        frequency: Optional[UpdateFrequency] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.CACHED
     ) -> NewsListResponse:
         """Get news from public prompts."""
-        query = self.db.query(News).join(Prompt)
+        # The joined prompt populates news.prompt, which `visibility` reads
+        query = self.db.query(News).join(Prompt).options(contains_eager(News.prompt))
         query = query.filter(Prompt.visibility == VisibilityType.PUBLIC)
+        count_conditions = [Prompt.visibility == VisibilityType.PUBLIC]
 
         if prompt_id:
             query = query.filter(News.prompt_id == prompt_id)
+            count_conditions.append(NewsCount.prompt_id == prompt_id)
         if frequency:
             query = query.filter(News.frequency == frequency)
+            count_conditions.append(NewsCount.frequency == frequency)
 
-        total = query.count()
-        items = query.order_by(desc(News.created_at)).offset(skip).limit(limit).all()
-        
-        return NewsListResponse(total=total, items=items)
+        return self._page(
+            query, skip, limit, cursor, include_total,
+            count_mode, ("public", prompt_id, frequency), count_conditions
+        )
 
     def get_news_by_prompt_path(
         self,
@@ -170,16 +471,12 @@ class NewsService:
         current_user: Optional[User],
         skip: int = 0,
         limit: int = 100,
-        frequency: Optional[UpdateFrequency] = None
+        frequency: Optional[UpdateFrequency] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.CACHED
     ) -> NewsListResponse:
         """Get news by prompt path respecting visibility rules."""
-        query = (
-            self.db.query(News)
-            .join(Prompt)
-            .join(User)
-            .filter(User.username == username, Prompt.slug == prompt_slug)
-        )
-
         prompt = (
             self.db.query(Prompt)
             .join(User)
@@ -198,13 +495,17 @@ class NewsService:
             if not current_user:
                 raise HTTPException(status_code=401, detail="Authentication required for this prompt")
 
+        # news.prompt resolves from the identity map: no query per row
+        query = self.db.query(News).filter(News.prompt_id == prompt.id)
+        count_conditions = [NewsCount.prompt_id == prompt.id]
         if frequency:
             query = query.filter(News.frequency == frequency)
+            count_conditions.append(NewsCount.frequency == frequency)
 
-        total = query.count()
-        items = query.order_by(desc(News.created_at)).offset(skip).limit(limit).all()
-        
-        return NewsListResponse(total=total, items=items)
+        return self._page(
+            query, skip, limit, cursor, include_total,
+            count_mode, ("prompt", prompt.id, frequency), count_conditions
+        )
 
     def get_latest_public_news(
         self,
@@ -212,25 +513,30 @@ class NewsService:
         frequency: Optional[UpdateFrequency] = None
     ) -> List[PublicNewsResponse]:
         """Get latest news from public prompts."""
+        # Exactly the response's columns, prompt and owner included, in one query
         query = (
-            self.db.query(News)
-            .join(Prompt)
-            .join(User)
+            self.db.query(
+                News.id,
+                News.title,
+                News.content,
+                News.frequency,
+                News.prompt_id,
+                News.created_at,
+                News.updated_at,
+                Prompt.visibility,
+                Prompt.name.label("prompt_name"),
+                User.username.label("prompt_owner")
+            )
+            .join(Prompt, News.prompt_id == Prompt.id)
+            .join(User, Prompt.user_id == User.id)
             .filter(Prompt.visibility == VisibilityType.PUBLIC)
         )
 
         if frequency:
             query = query.filter(News.frequency == frequency)
 
-        latest_news = query.order_by(desc(News.created_at)).limit(limit).all()
-
-        return [
-            PublicNewsResponse(
-                **news.__dict__,
-                prompt_name=news.prompt.name,
-                prompt_owner=news.prompt.user.username
-            ) for news in latest_news
-        ]
+        rows = query.order_by(desc(News.created_at), desc(News.id)).limit(limit).all()
+        return [PublicNewsResponse(**row._mapping) for row in rows]
 
     def get_user_news(
         self,
@@ -238,34 +544,37 @@ class NewsService:
         prompt_id: Optional[int] = None,
         frequency: Optional[UpdateFrequency] = None,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        count_mode: CountMode = CountMode.CACHED
     ) -> NewsListResponse:
         """Get news items visible to a specific user."""
-        query = (
-            self.db.query(News)
-            .join(Prompt)
-            .filter(
-                # User's own prompts
-                ((Prompt.user_id == user.id)) |
-                # Internal prompts
-                ((Prompt.visibility == VisibilityType.INTERNAL)) |
-                # Public prompts
-                ((Prompt.visibility == VisibilityType.PUBLIC))
-            )
+        visible = (
+            # User's own prompts
+            ((Prompt.user_id == user.id)) |
+            # Internal prompts
+            ((Prompt.visibility == VisibilityType.INTERNAL)) |
+            # Public prompts
+            ((Prompt.visibility == VisibilityType.PUBLIC))
         )
+        query = self.db.query(News).join(Prompt).options(contains_eager(News.prompt)).filter(visible)
+        count_conditions = [visible]
 
         if prompt_id:
             # If specific prompt requested, verify access
             prompt = self.verify_prompt_access(prompt_id, user)
             query = query.filter(News.prompt_id == prompt_id)
+            count_conditions.append(NewsCount.prompt_id == prompt_id)
 
         if frequency:
             query = query.filter(News.frequency == frequency)
+            count_conditions.append(NewsCount.frequency == frequency)
 
-        total = query.count()
-        items = query.order_by(desc(News.created_at)).offset(skip).limit(limit).all()
-        
-        return NewsListResponse(total=total, items=items)
+        return self._page(
+            query, skip, limit, cursor, include_total,
+            count_mode, ("user", user.id, prompt_id, frequency), count_conditions
+        )
 
     def get_news_by_id(
         self,
@@ -0,0 +1,92 @@
+# app/services/news_counts.py
+import enum
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.config.settings import get_settings
+from app.models.news_count import NewsCount
+from app.models.prompt import Prompt
+from app.utils.query_plan import estimate_rows
+
+settings = get_settings()
+
+
+class CountMode(str, enum.Enum):
+    EXACT = "exact"  # COUNT(*) over the listing query
+    CACHED = "cached"  # sum of news_counts, at most NEWS_COUNT_CACHE_TTL old
+    ESTIMATED = "estimated"  # planner row estimate, no rows read
+
+
+class TTLCache:
+    """Small thread-safe LRU whose entries expire `ttl` seconds after being set."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_totals = TTLCache(settings.NEWS_COUNT_CACHE_TTL, settings.NEWS_COUNT_CACHE_SIZE)
+
+
+class NewsCountService:
+    """Totals for news listings without counting every matching row."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def total(
+        self,
+        mode: CountMode,
+        query: Query,
+        cache_key: Hashable,
+        conditions: List[Any]
+    ) -> int:
+        """
+        Total for a listing `query` in the requested mode.
+
+        `conditions` restate the listing's filters on NewsCount and Prompt
+        columns; `cache_key` identifies them (including the user, where
+        visibility depends on it) for the cached mode.
+        """
+        if mode == CountMode.EXACT:
+            return query.count()
+        if mode == CountMode.ESTIMATED:
+            return estimate_rows(self.db, query)
+
+        total = _totals.get(cache_key)
+        if total is None:
+            total = (
+                self.db.query(func.coalesce(func.sum(NewsCount.total), 0))
+                .select_from(NewsCount)
+                .join(Prompt, Prompt.id == NewsCount.prompt_id)
+                .filter(*conditions)
+                .scalar()
+            )
+            _totals.set(cache_key, int(total))
+        return int(total)
@@ -1,15 +1,17 @@
 # app/services/prompt.py
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy import or_
+from sqlalchemy import func, or_
 from fastapi import HTTPException, status
 from slugify import slugify
 
+from app.models.news import News
 from app.models.prompt import Prompt, TemplateType, VisibilityType
 from app.models.user import User
 from app.schemas.prompt import PromptCreate, PromptUpdate
 from app.services.llm import llm_service
+from app.utils.pagination import paginate
 
 class PromptService:
     def __init__(self, db: Session):
@@ -91,12 +93,7 @@ class PromptService:
             if prompt.visibility == VisibilityType.PUBLIC:
                 result = {
                     "prompt": prompt,
-                    "news_count": {
-                        "total": len(prompt.news_items),
-                        "hourly": sum(1 for n in prompt.news_items if n.frequency == "hourly"),
-                        "daily": sum(1 for n in prompt.news_items if n.frequency == "daily"),
-                        "last_update": max((n.updated_at for n in prompt.news_items), default=None) if prompt.news_items else None
-                    }
+                    "news_count": self.get_news_stats([prompt.id])[prompt.id]
                 }
                 return result
 
@@ -115,12 +112,7 @@ class PromptService:
 
             return {
                 "prompt": prompt,
-                "news_count": {
-                    "total": len(prompt.news_items),
-                    "hourly": sum(1 for n in prompt.news_items if n.frequency == "hourly"),
-                    "daily": sum(1 for n in prompt.news_items if n.frequency == "daily"),
-                    "last_update": max((n.updated_at for n in prompt.news_items), default=None) if prompt.news_items else None
-                }
+                "news_count": self.get_news_stats([prompt.id])[prompt.id]
             }
 
         except HTTPException:
@@ -139,9 +131,10 @@ class PromptService:
         limit: int = 100,
         search: Optional[str] = None,
         include_internal: bool = True,
-        include_public: bool = True
-    ) -> List[Prompt]:
-        """Get list of prompts with optional filtering."""
+        include_public: bool = True,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Prompt], Optional[str]]:
+        """Get a page of prompts with optional filtering, and the cursor of the next page."""
         try:
             # Start with base query
             query = self.db.query(Prompt)
@@ -176,8 +169,7 @@ class PromptService:
                     )
                 )
 
-            prompts = query.order_by(Prompt.created_at.desc()).offset(skip).limit(limit).all()
-            return prompts
+            return paginate(query, Prompt, limit, cursor=cursor, skip=skip)
         except SQLAlchemyError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -192,9 +184,10 @@ class PromptService:
         self,
         skip: int = 0,
         limit: int = 100,
-        search: Optional[str] = None
-    ) -> List[Prompt]:
-        """Get list of public prompts without auth check."""
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Prompt], Optional[str]]:
+        """Get a page of public prompts without auth check, and the cursor of the next page."""
         try:
             # Don't use with statement to avoid session issues
             query = self.db.query(Prompt).filter(Prompt.visibility == 'PUBLIC')
@@ -209,12 +202,12 @@ class PromptService:
                     )
                 )
 
-            prompts = query.order_by(Prompt.created_at.desc()).offset(skip).limit(limit).all()
+            page = paginate(query, Prompt, limit, cursor=cursor, skip=skip)
             
             # Ensure the session is closed properly
             self.db.close()
             
-            return prompts
+            return page
         except Exception as e:
             self.db.rollback()
             raise e
@@ -224,9 +217,10 @@ class PromptService:
         user: User,
         skip: int = 0,
         limit: int = 100,
-        search: Optional[str] = None
-    ) -> List[Prompt]:
-        """Get list of internal prompts."""
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Prompt], Optional[str]]:
+        """Get a page of internal prompts, and the cursor of the next page."""
         try:
             query = self.db.query(Prompt).filter(
                 Prompt.visibility == VisibilityType.INTERNAL,
@@ -243,8 +237,7 @@ class PromptService:
                     )
                 )
 
-            prompts = query.order_by(Prompt.created_at.desc()).offset(skip).limit(limit).all()
-            return prompts
+            return paginate(query, Prompt, limit, cursor=cursor, skip=skip)
         except SQLAlchemyError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -370,6 +363,34 @@ class PromptService:
         """Count total prompts for a user."""
         return self.db.query(Prompt).filter(Prompt.user_id == user.id).count()
 
+    def get_news_stats(self, prompt_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """News statistics for each prompt, from one grouped aggregate query."""
+        stats = {
+            prompt_id: {"total": 0, "hourly": 0, "daily": 0, "last_update": None}
+            for prompt_id in prompt_ids
+        }
+        if not prompt_ids:
+            return stats
+
+        rows = (
+            self.db.query(News.prompt_id, News.frequency, func.count(News.id), func.max(News.updated_at))
+            .filter(News.prompt_id.in_(prompt_ids))
+            .group_by(News.prompt_id, News.frequency)
+            .all()
+        )
+        for prompt_id, frequency, count, last_update in rows:
+            entry = stats[prompt_id]
+            entry[frequency.value] = count
+            entry["total"] += count
+            if entry["last_update"] is None or last_update > entry["last_update"]:
+                entry["last_update"] = last_update
+        return stats
+
+    def with_news_stats(self, prompts: List[Prompt]) -> List[Dict[str, Any]]:
+        """Attach news statistics to many prompts at once (one aggregate query)."""
+        stats = self.get_news_stats([prompt.id for prompt in prompts])
+        return [{"prompt": prompt, "news_count": stats[prompt.id]} for prompt in prompts]
+
     def get_prompt_with_news_count(
         self,
         prompt_id: int,
@@ -379,10 +400,5 @@ class PromptService:
         prompt = self.get_prompt_by_id(prompt_id, user)
         return {
             "prompt": prompt,
-            "news_count": {
-                "total": len(prompt.news_items),
-                "hourly": sum(1 for n in prompt.news_items if n.frequency == "hourly"),
-                "daily": sum(1 for n in prompt.news_items if n.frequency == "daily"),
-                "last_update": max((n.updated_at for n in prompt.news_items), default=None) if prompt.news_items else None
-            }
+            "news_count": self.get_news_stats([prompt.id])[prompt.id]
         }
\ No newline at end of file
@@ -0,0 +1,411 @@
+# app/services/rate_limiter.py
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Optional, Tuple
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Continuously refilling token bucket."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    def available(self, now: Optional[float] = None) -> float:
+        self._refill(now if now is not None else time.monotonic())
+        return self.tokens
+
+    def time_until(self, amount: float, now: Optional[float] = None) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        available = self.available(now)
+        if available >= amount:
+            return 0.0
+        return (amount - available) / self.refill_per_second
+
+    def consume(self, amount: float, now: Optional[float] = None) -> None:
+        self._refill(now if now is not None else time.monotonic())
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        self._refill(time.monotonic())
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimitBackend:
+    """
+    Storage for the request and token buckets of a limiter.
+
+    `try_acquire` either reserves the budget and returns 0, or reserves
+    nothing and returns the number of seconds to wait before retrying.
+    A `reserve` (a share of each bucket's capacity) must be left over after
+    the reservation: lower-priority callers pass one so they never drain the
+    headroom kept for interactive requests. The check is made where the
+    budget lives, so it holds across every process sharing the backend.
+    """
+
+    async def try_acquire(self, requests: int, tokens: int, reserve: float = 0.0) -> float:
+        raise NotImplementedError
+
+    async def refund(self, requests: int, tokens: int) -> None:
+        raise NotImplementedError
+
+    async def available_tokens(self) -> float:
+        """Tokens that could be reserved right now."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """Buckets held in process memory; only coordinates coroutines of one process."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+
+    async def try_acquire(self, requests: int, tokens: int, reserve: float = 0.0) -> float:
+        now = time.monotonic()
+        wait_time = max(
+            self._requests.time_until(requests + reserve * self._requests.capacity, now),
+            self._tokens.time_until(tokens + reserve * self._tokens.capacity, now)
+        )
+        if wait_time <= 0:
+            self._requests.consume(requests, now)
+            self._tokens.consume(tokens, now)
+            return 0.0
+        return wait_time
+
+    async def refund(self, requests: int, tokens: int) -> None:
+        self._requests.refund(requests)
+        self._tokens.refund(tokens)
+
+    async def available_tokens(self) -> float:
+        return self._tokens.available()
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Buckets stored in a SQLite ledger on local disk.
+
+    Every process on the host that points at the same file shares one budget;
+    `BEGIN IMMEDIATE` serialises the read-refill-write of each reservation;
+    reading the level (health checks, near_limit) is a plain read.
+    """
+
+    def __init__(self, path: str, name: str, requests_per_minute: int, tokens_per_minute: int):
+        self.path = path
+        self.name = name
+        self._capacity = {"requests": float(requests_per_minute), "tokens": float(tokens_per_minute)}
+        self._conn_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._conn_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _keys(self) -> Dict[str, str]:
+        return {kind: f"{self.name}:{kind}" for kind in self._capacity}
+
+    def _level(self, kind: str, key: str, now: float) -> float:
+        """A bucket's level at `now`, refilled since it was last written."""
+        capacity = self._capacity[kind]
+        row = self._conn.execute(
+            "SELECT tokens, updated_at FROM rate_limit_buckets WHERE name = ?", (key,)
+        ).fetchone()
+        level, updated_at = row if row else (capacity, now)
+        return min(capacity, level + max(0.0, now - updated_at) * capacity / 60)
+
+    def _apply(self, requests: int, tokens: int, refund: bool, reserve: float = 0.0) -> Tuple[float, float]:
+        needed = {"requests": requests, "tokens": tokens}
+        keys = self._keys()
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                levels = {kind: self._level(kind, key, now) for kind, key in keys.items()}
+
+                wait_time = 0.0
+                if refund:
+                    for kind in levels:
+                        levels[kind] = min(self._capacity[kind], levels[kind] + needed[kind])
+                else:
+                    wait_time = max(
+                        max(0.0, needed[kind] + reserve * self._capacity[kind] - levels[kind])
+                        / (self._capacity[kind] / 60)
+                        for kind in levels
+                    )
+                    if wait_time <= 0:
+                        for kind in levels:
+                            levels[kind] -= needed[kind]
+
+                for kind, key in keys.items():
+                    self._conn.execute(
+                        "INSERT INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                        (key, levels[kind], now)
+                    )
+                self._conn.execute("COMMIT")
+                return wait_time, levels["tokens"]
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def try_acquire(self, requests: int, tokens: int, reserve: float = 0.0) -> float:
+        wait_time, _ = await asyncio.to_thread(self._apply, requests, tokens, False, reserve)
+        return wait_time
+
+    async def refund(self, requests: int, tokens: int) -> None:
+        await asyncio.to_thread(self._apply, requests, tokens, True)
+
+    def _read_tokens(self) -> float:
+        # A single autocommit SELECT: under WAL it takes no write lock and
+        # never waits on reservations
+        with self._conn_lock:
+            return self._level("tokens", self._keys()["tokens"], time.time())
+
+    async def available_tokens(self) -> float:
+        return await asyncio.to_thread(self._read_tokens)
+
+    async def close(self) -> None:
+        with self._conn_lock:
+            self._conn.close()
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets stored in Redis, shared by every process and host using the same server."""
+
+    # Refill both buckets from the server clock and reserve atomically.
+    # ARGV: requests capacity, tokens capacity, requests, tokens, refund flag, reserve
+    _SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local caps = {tonumber(ARGV[1]), tonumber(ARGV[2])}
+local needed = {tonumber(ARGV[3]), tonumber(ARGV[4])}
+local refund = ARGV[5] == '1'
+local reserve = tonumber(ARGV[6]) or 0
+local levels = {}
+for i = 1, 2 do
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'updated_at')
+    local level = tonumber(state[1]) or caps[i]
+    local updated_at = tonumber(state[2]) or now
+    levels[i] = math.min(caps[i], level + math.max(0, now - updated_at) * caps[i] / 60)
+end
+local wait = 0
+if refund then
+    for i = 1, 2 do levels[i] = math.min(caps[i], levels[i] + needed[i]) end
+else
+    for i = 1, 2 do
+        wait = math.max(wait, math.max(0, needed[i] + reserve * caps[i] - levels[i]) / (caps[i] / 60))
+    end
+    if wait <= 0 then
+        for i = 1, 2 do levels[i] = levels[i] - needed[i] end
+    end
+end
+for i = 1, 2 do
+    redis.call('HSET', KEYS[i], 'tokens', tostring(levels[i]), 'updated_at', tostring(now))
+    redis.call('EXPIRE', KEYS[i], 120)
+end
+return {tostring(wait), tostring(levels[2])}
+"""
+
+    def __init__(self, url: str, name: str, requests_per_minute: int, tokens_per_minute: int):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("The redis package is required for the Redis rate limit backend") from e
+
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(self._SCRIPT)
+        self._keys = [f"whatsnews:ratelimit:{name}:requests", f"whatsnews:ratelimit:{name}:tokens"]
+
+    async def _apply(self, requests: int, tokens: int, refund: bool, reserve: float = 0.0) -> Tuple[float, float]:
+        wait_time, level = await self._script(
+            keys=self._keys,
+            args=[self.requests_per_minute, self.tokens_per_minute, requests, tokens, 1 if refund else 0, reserve]
+        )
+        return float(wait_time), float(level)
+
+    async def try_acquire(self, requests: int, tokens: int, reserve: float = 0.0) -> float:
+        wait_time, _ = await self._apply(requests, tokens, False, reserve)
+        return wait_time
+
+    async def refund(self, requests: int, tokens: int) -> None:
+        await self._apply(requests, tokens, True)
+
+    async def available_tokens(self) -> float:
+        # Read-only, like the SQLite backend: HMGET and the server clock in
+        # one round trip, refilled here as the script would
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.hmget(self._keys[1], "tokens", "updated_at")
+        pipeline.time()
+        (level, updated_at), (seconds, microseconds) = await pipeline.execute()
+        capacity = float(self.tokens_per_minute)
+        if level is None or updated_at is None:
+            return capacity
+        now = seconds + microseconds / 1_000_000
+        return min(capacity, float(level) + max(0.0, now - float(updated_at)) * capacity / 60)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def create_rate_limit_backend(name: str, requests_per_minute: int, tokens_per_minute: int) -> RateLimitBackend:
+    """
+    Build the backend selected by LLM_RATE_LIMIT_BACKEND.
+
+    "auto" uses Redis when REDIS_URL is configured and the host-local SQLite
+    ledger otherwise; "local" keeps the budget in process memory.
+    """
+    settings = get_settings()
+    backend = settings.LLM_RATE_LIMIT_BACKEND
+    if backend == "auto":
+        backend = "redis" if settings.REDIS_URL else "sqlite"
+
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("LLM_RATE_LIMIT_BACKEND=redis requires REDIS_URL")
+        return RedisRateLimitBackend(settings.REDIS_URL, name, requests_per_minute, tokens_per_minute)
+    if backend == "sqlite":
+        try:
+            return SQLiteRateLimitBackend(
+                settings.LLM_RATE_LIMIT_PATH, name, requests_per_minute, tokens_per_minute
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Could not open rate limit ledger {settings.LLM_RATE_LIMIT_PATH}: {str(e)}")
+            logger.warning("Falling back to the in-process rate limiter")
+    elif backend != "local":
+        raise ValueError(f"Unknown rate limit backend: {backend}")
+    return LocalRateLimitBackend(requests_per_minute, tokens_per_minute)
+
+
+class AsyncRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter shared by all coroutines.
+
+    Callers are served strictly in arrival order: the head of the queue holds
+    the lock while it waits for budget, so a large request cannot be starved
+    by a stream of small ones. The budget itself lives in a RateLimitBackend,
+    which may be shared with other processes.
+    """
+
+    # Upper bound on a single sleep; other processes may refund budget early
+    MAX_POLL_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        name: str = "llm",
+        backend: Optional[RateLimitBackend] = None
+    ):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.backend = backend or LocalRateLimitBackend(requests_per_minute, tokens_per_minute)
+        self._lock = asyncio.Lock()
+        self._queued = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=100)
+
+    def _clamp(self, tokens: int) -> int:
+        if tokens > self.tokens_per_minute:
+            logger.warning(
+                f"Request of {tokens} tokens exceeds the {self.name} TPM budget "
+                f"({self.tokens_per_minute}); clamping to the bucket capacity"
+            )
+            return self.tokens_per_minute
+        return tokens
+
+    async def acquire(self, tokens: int, reserve: float = 0.0) -> float:
+        """
+        Wait until one request and `tokens` tokens are available, then reserve them.
+
+        With a `reserve`, wait until that share of each bucket would still be
+        left afterwards (see RateLimitBackend).
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        tokens = self._clamp(tokens)
+        if reserve:
+            # A larger request could never leave the reserve over
+            tokens = min(tokens, int(self.tokens_per_minute * (1 - reserve)))
+        start = time.monotonic()
+        self._queued += 1
+        try:
+            async with self._lock:
+                while True:
+                    wait_time = await self.backend.try_acquire(1, tokens, reserve)
+                    if wait_time <= 0:
+                        break
+                    await asyncio.sleep(min(wait_time, self.MAX_POLL_INTERVAL))
+        finally:
+            self._queued -= 1
+
+        waited = time.monotonic() - start
+        self._acquired += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        self._recent_waits.append(waited)
+        if waited > 1:
+            logger.info(f"{self.name} rate limiter delayed request by {waited:.2f} seconds")
+        return waited
+
+    async def release(self, tokens: int, requests: int = 1) -> None:
+        """Return an unused reservation to the buckets."""
+        await self.backend.refund(requests, self._clamp(tokens))
+
+    async def near_limit(self, tokens: int, margin: float = 0.25) -> bool:
+        """
+        True when a request of roughly `tokens` could run into the budget.
+
+        Used to decide when a cheap token estimate is not good enough: either
+        the request is a large share of the per-minute budget, or what is
+        left in the bucket is within `margin` of the estimate.
+        """
+        if tokens * (1 + margin) >= self.tokens_per_minute * 0.5:
+            return True
+        if self._queued:
+            return True
+        return await self.backend.available_tokens() < tokens * (1 + margin)
+
+    @property
+    def queue_length(self) -> int:
+        return self._queued
+
+    def get_stats(self) -> Dict[str, Any]:
+        recent = list(self._recent_waits)
+        return {
+            "name": self.name,
+            "queue_length": self._queued,
+            "backend": type(self.backend).__name__,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "acquired": self._acquired,
+            "average_wait": self._total_wait / self._acquired if self._acquired else 0.0,
+            "recent_average_wait": sum(recent) / len(recent) if recent else 0.0,
+            "max_wait": self._max_wait,
+        }
@@ -1,144 +1,442 @@
-from typing import Dict, Set, Optional
-from fastapi import BackgroundTasks
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 import asyncio
+import hashlib
+import heapq
+import itertools
 import logging
+import math
 import pytz
-from app.services.news import NewsService
-from app.services.rss import RSSService
+from app.core.database import job_session
+from app.core.metrics import metrics
+from app.services.job_queue import GenerationJobQueue, cohort_dedupe_key
+from app.services.leader import LeaderElector
 from app.models.news import UpdateFrequency
 from app.models.prompt import Prompt
+from app.models.prompt_run import PromptRun
 from app.models.user import User
+from app.services.llm_queue import JobPriority
+from app.config.settings import get_settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def next_fire_time(
+    timezone_name: str,
+    daily_hours: Tuple[int, int],
+    frequency: UpdateFrequency,
+    after: datetime
+) -> datetime:
+    """
+    First UTC instant strictly after `after` at which a user's job fires.
+
+    Daily jobs fire at the top of each daily hour in the user's timezone;
+    hourly jobs fire at the top of every other local hour.
+    """
+    user_tz = pytz.timezone(timezone_name)
+    local_after = after.astimezone(user_tz)
+
+    if frequency == UpdateFrequency.HOURLY:
+        # Local hour boundaries are whole UTC hours apart, across DST changes too
+        candidate = local_after.replace(minute=0, second=0, microsecond=0).astimezone(pytz.UTC)
+        for _ in range(48):
+            candidate += timedelta(hours=1)
+            if candidate.astimezone(user_tz).hour not in daily_hours:
+                return candidate
+        raise ValueError(f"No hourly slot for daily hours {daily_hours}")
+
+    for day_offset in range(3):
+        day = local_after.date() + timedelta(days=day_offset)
+        for hour in sorted(set(daily_hours)):
+            candidate = _localize(user_tz, day, hour).astimezone(pytz.UTC)
+            if candidate > after:
+                return candidate
+    raise ValueError(f"No daily slot for hours {daily_hours}")
+
+
+def previous_fire_time(
+    timezone_name: str,
+    daily_hours: Tuple[int, int],
+    frequency: UpdateFrequency,
+    before: datetime
+) -> datetime:
+    """Latest UTC instant at or before `before` at which a user's job fired (see next_fire_time)."""
+    user_tz = pytz.timezone(timezone_name)
+    local_before = before.astimezone(user_tz)
+
+    if frequency == UpdateFrequency.HOURLY:
+        candidate = local_before.replace(minute=0, second=0, microsecond=0).astimezone(pytz.UTC)
+        for _ in range(48):
+            if candidate.astimezone(user_tz).hour not in daily_hours:
+                return candidate
+            candidate -= timedelta(hours=1)
+        raise ValueError(f"No hourly slot for daily hours {daily_hours}")
+
+    for day_offset in range(3):
+        day = local_before.date() - timedelta(days=day_offset)
+        for hour in sorted(set(daily_hours), reverse=True):
+            candidate = _localize(user_tz, day, hour).astimezone(pytz.UTC)
+            if candidate <= before:
+                return candidate
+    raise ValueError(f"No daily slot for hours {daily_hours}")
+
+
+def _localize(user_tz, day: date, hour: int) -> datetime:
+    """Local wall-clock time as an aware datetime; hours skipped by DST move forward."""
+    naive = datetime(day.year, day.month, day.day, hour)
+    try:
+        return user_tz.localize(naive, is_dst=None)
+    except pytz.NonExistentTimeError:
+        return user_tz.normalize(user_tz.localize(naive + timedelta(hours=1), is_dst=True))
+    except pytz.AmbiguousTimeError:
+        return user_tz.localize(naive, is_dst=True)
+
+
+def spread_offset(user_id: int, window: float, slots: int) -> float:
+    """
+    Stable delay (seconds) of a user's runs after the top of the hour.
+
+    Users are hashed into `slots` evenly spaced offsets within `window`;
+    users sharing a slot still fire together and form one cohort.
+    """
+    if window <= 0 or slots <= 1:
+        return 0.0
+    slot = int.from_bytes(hashlib.sha1(str(user_id).encode("utf-8")).digest()[:4], "big") % slots
+    return slot * window / slots
+
+
+def estimate_wave_seconds(prompts: int) -> float:
+    """Time the LLM budget needs for `prompts` generations, batching included."""
+    if prompts <= 0:
+        return 0.0
+    batch_size = max(1, settings.LLM_BATCH_MAX_PROMPTS) if settings.LLM_BATCH_PROMPTS else 1
+    requests = math.ceil(prompts / batch_size)
+    minutes = max(
+        requests / max(1, settings.LLM_REQUESTS_PER_MINUTE),
+        requests * settings.SCHEDULER_WAVE_TOKENS_PER_REQUEST / max(1, settings.LLM_TOKENS_PER_MINUTE)
+    )
+    return minutes * 60
+
+
+def plan_spread_window(prompts: int) -> float:
+    """Spread window wide enough for a wave of `prompts` to fit the LLM budget."""
+    needed = estimate_wave_seconds(prompts)
+    window = min(max(settings.SCHEDULER_SPREAD_WINDOW, needed), settings.SCHEDULER_MAX_SPREAD_WINDOW)
+    if needed > settings.SCHEDULER_MAX_SPREAD_WINDOW:
+        logger.warning(
+            f"A wave of {prompts} prompts needs ~{needed / 60:.0f} min of LLM budget, "
+            f"more than the {window / 60:.0f} min spread window"
+        )
+    return window
+
+
+def wave_forecast(
+    base: datetime,
+    frequency: UpdateFrequency,
+    users: int,
+    prompts: int,
+    spread_window: float
+) -> Dict[str, Any]:
+    """Slots and predicted completion of the wave firing at top-of-hour `base`."""
+    slots = max(1, settings.SCHEDULER_SPREAD_SLOTS)
+    last_slot = base + timedelta(seconds=spread_window * (slots - 1) / slots)
+    budget_done = base + timedelta(seconds=estimate_wave_seconds(prompts))
+    return {
+        "frequency": frequency.value,
+        "starts_at": base.isoformat(),
+        "last_slot_at": last_slot.isoformat(),
+        "users": users,
+        "prompts": prompts,
+        "predicted_completion": max(last_slot, budget_done).isoformat()
+    }
+
 
 class NewsScheduler:
-    def __init__(self, db: Session):
-        self.db = db
-        self.news_service = NewsService(db)
-        self.rss_service = RSSService()
-        self._tasks: Set[asyncio.Task] = set()
+    """
+    Fires hourly and daily generation for every active user from one dispatcher task.
+
+    Each (user, frequency) has one entry in a min-heap keyed by its next fire
+    instant in UTC. The dispatcher sleeps until the earliest entry is due,
+    pops everything due and pushes each entry's next fire instant. Due
+    entries sharing a fire instant and frequency form a cohort, which is
+    stored as one durable generation job for the workers to run.
+    Rescheduling a user bumps a version number so stale heap entries are
+    skipped when popped instead of being searched for.
+
+    To avoid a thundering herd at the top of every hour, each user fires at
+    a stable offset within a spread window. The window is planned at start
+    against the LLM budget: it is stretched (up to
+    SCHEDULER_MAX_SPREAD_WINDOW) when the expected wave needs longer than
+    SCHEDULER_SPREAD_WINDOW to get through the rate limits. Every wave (all
+    runs due for one top-of-hour instant) has a predicted completion time,
+    see `schedule_snapshot`, and its measured duration (first slot to last
+    job finished) is recorded once all its jobs are done.
+
+    The scheduler holds no database session between passes: loading users,
+    queueing a due cohort and rescheduling a user each open (and close) a
+    bounded job session.
+    """
+
+    def __init__(self):
         self.running = False
         self.user_schedules: Dict[int, Dict] = {}  # Store user-specific schedules
+        self._heap: List[Tuple[datetime, int, int, UpdateFrequency, int, datetime]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.spread_window = settings.SCHEDULER_SPREAD_WINDOW
+        # (top-of-hour instant, frequency) -> users/prompts scheduled for it
+        self._waves: Dict[Tuple[datetime, UpdateFrequency], Dict[str, Any]] = {}
+        self._last_wave_check = datetime.min.replace(tzinfo=pytz.UTC)
+
+    def _wave_forecast(self, base: datetime, frequency: UpdateFrequency, wave: Dict[str, Any]) -> Dict[str, Any]:
+        return wave_forecast(base, frequency, wave["users"], wave["prompts"], self.spread_window)
+
+    def _prune_waves(self, now: datetime) -> None:
+        # Unfinished waves are kept (up to a day) until their duration is recorded
+        for key, wave in list(self._waves.items()):
+            age = now - key[0]
+            if age > timedelta(days=1) or (age > timedelta(hours=2) and wave["finished"]):
+                del self._waves[key]
+
+    def _publish_gauges(self, now: datetime) -> None:
+        metrics.set_gauge("scheduler_users", len(self.user_schedules))
+        metrics.set_gauge("scheduler_heap_entries", len(self._heap))
+        if self._heap:
+            metrics.set_gauge("scheduler_next_fire_seconds", (self._heap[0][0] - now).total_seconds())
 
-    async def _generate_news_for_user(self, user_id: int, frequency: UpdateFrequency):
-        """Generate news for a specific user's prompts."""
+    async def _check_waves(self, now: datetime) -> None:
+        """Record the duration of every started wave whose jobs have all finished."""
+        pending = [
+            (key, wave) for key, wave in self._waves.items()
+            if wave["announced"] and not wave["finished"]
+            and now >= key[0] + timedelta(seconds=self.spread_window)
+        ]
+        if not pending:
+            return
+        async with job_session("scheduler") as db:
+            job_queue = GenerationJobQueue(db)
+            for (base, frequency), wave in pending:
+                jobs, unfinished, finished_at = job_queue.wave_progress(
+                    frequency, base, base + timedelta(seconds=self.spread_window)
+                )
+                if unfinished:
+                    continue
+                wave["finished"] = True
+                if not jobs or finished_at is None:
+                    continue
+                duration = (finished_at - base).total_seconds()
+                labels = {"frequency": frequency.value}
+                metrics.observe("scheduler_wave_duration_seconds", duration, labels)
+                metrics.set_gauge("scheduler_last_wave_duration_seconds", duration, labels)
+                forecast = self._wave_forecast(base, frequency, wave)
+                logger.info(
+                    f"{frequency.value.capitalize()} wave {forecast['starts_at']} finished after "
+                    f"{duration / 60:.1f} min ({jobs} jobs), predicted completion {forecast['predicted_completion']}"
+                )
+
+    async def _enqueue_cohort(self, fire_at: datetime, base: datetime, frequency: UpdateFrequency, user_ids: List[int]):
+        """Persist a due cohort, firing at `fire_at` for schedule instant `base`, as a generation job."""
         try:
-            # Get user's prompts
-            prompts = self.db.query(Prompt).filter(Prompt.user_id == user_id).all()
-            if not prompts:
-                return
-
-            # Fetch RSS feeds once for all prompts
-            feeds = await self.rss_service.fetch_feeds()
-            
-            # Generate news for each prompt
-            for prompt in prompts:
-                try:
-                    await self.news_service.generate_news(
-                        prompt_id=prompt.id,
-                        frequency=frequency,
-                        feeds=feeds
-                    )
-                    logger.info(f"Generated {frequency.value} news for prompt {prompt.id} (user: {user_id})")
-                except Exception as e:
-                    logger.error(f"Error generating news for prompt {prompt.id}: {str(e)}")
-                    
+            async with job_session("scheduler") as db:
+                created = GenerationJobQueue(db).enqueue(
+                    frequency=frequency,
+                    user_ids=user_ids,
+                    fire_at=fire_at,
+                    dedupe_key=cohort_dedupe_key(frequency, base, user_ids)
+                )
+            if created:
+                logger.info(f"Queued {frequency.value} generation for a cohort of {len(user_ids)} users")
+            else:
+                metrics.inc("scheduler_skipped", labels={"reason": "duplicate", "frequency": frequency.value})
         except Exception as e:
-            logger.error(f"Error in news generation cycle for user {user_id}: {str(e)}")
+            metrics.inc("scheduler_skipped", labels={"reason": "enqueue_error", "frequency": frequency.value})
+            logger.error(f"Error queueing {frequency.value} generation for {len(user_ids)} users: {str(e)}")
+
+    def _schedule_catch_up(self, db: Session) -> None:
+        """
+        Queue one catch-up run per prompt whose last scheduled run was missed.
 
-    def _should_generate_hourly_news(self, user: User, current_time: datetime) -> bool:
-        """Check if hourly news should be generated for a user."""
-        user_time = current_time.astimezone(pytz.timezone(user.timezone))
-        return user_time.hour not in [user.news_generation_hour_1, user.news_generation_hour_2]
+        A prompt is behind when its last completed run (prompt_runs, written
+        whether or not there was new content) is older than its latest fire
+        instant that is at least SCHEDULER_CATCHUP_GRACE old; younger
+        instants may still be in the job queue. A prompt that has never run
+        counts from its creation. However many runs were missed, the prompt gets a single
+        generation covering everything since its last run (at most a day).
+        Catch-up jobs run at backfill priority and are released
+        SCHEDULER_CATCHUP_STAGGER seconds apart so recovery does not
+        saturate the LLM budget.
+        """
+        now = datetime.now(pytz.UTC)
+        horizon = now - timedelta(seconds=settings.SCHEDULER_CATCHUP_GRACE)
+        # (frequency, window start hour) -> prompt ids
+        missed: Dict[Tuple[UpdateFrequency, datetime], List[int]] = {}
+        for frequency in (UpdateFrequency.HOURLY, UpdateFrequency.DAILY):
+            rows = (
+                db.query(Prompt.id, Prompt.user_id, func.coalesce(PromptRun.last_run_at, Prompt.created_at))
+                .join(User, User.id == Prompt.user_id)
+                .outerjoin(PromptRun, and_(PromptRun.prompt_id == Prompt.id, PromptRun.frequency == frequency))
+                .filter(User.is_active == True)
+                .all()
+            )
+            for prompt_id, user_id, last_run_at in rows:
+                schedule = self.user_schedules.get(user_id)
+                if not schedule:
+                    continue
+                offset = timedelta(seconds=schedule['offset'])
+                expected = previous_fire_time(schedule['timezone'], schedule['hours'], frequency, horizon - offset) + offset
+                if last_run_at < expected:
+                    since = max(last_run_at, now - timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+                    missed.setdefault((frequency, since), []).append(prompt_id)
 
-    async def _schedule_user_task(self, user: User, frequency: UpdateFrequency):
-        """Handle scheduling for a specific user."""
-        user_tz = pytz.timezone(user.timezone)
-        
+        job_queue = GenerationJobQueue(db)
+        job_size = max(1, settings.SCHEDULER_CATCHUP_JOB_SIZE)
+        jobs = 0
+        for (frequency, since), prompt_ids in sorted(missed.items()):
+            prompt_ids.sort()
+            for start in range(0, len(prompt_ids), job_size):
+                chunk = prompt_ids[start:start + job_size]
+                job_queue.enqueue(
+                    frequency=frequency,
+                    user_ids=[],
+                    prompt_ids=chunk,
+                    window_start=since,
+                    priority=JobPriority.BACKFILL,
+                    run_after=now + timedelta(seconds=jobs * settings.SCHEDULER_CATCHUP_STAGGER),
+                    dedupe_key=f"catchup:{cohort_dedupe_key(frequency, since, chunk)}"
+                )
+                jobs += 1
+
+        if missed:
+            total = sum(len(prompt_ids) for prompt_ids in missed.values())
+            logger.info(f"Queued {jobs} catch-up jobs for {total} missed prompt runs")
+
+    def _push(self, user_id: int, frequency: UpdateFrequency, after: datetime) -> None:
+        """Schedule the next run of (user, frequency) after `after`."""
+        schedule = self.user_schedules[user_id]
+        offset = timedelta(seconds=schedule['offset'])
+        base = next_fire_time(schedule['timezone'], schedule['hours'], frequency, after - offset)
+        fire_at = base + offset
+
+        wave = self._waves.setdefault(
+            (base, frequency), {"users": 0, "prompts": 0, "announced": False, "finished": False}
+        )
+        wave["users"] += 1
+        wave["prompts"] += schedule['prompts']
+        heapq.heappush(self._heap, (fire_at, next(self._seq), user_id, frequency, schedule['version'], base))
+
+    def _add_user(self, user: User, prompts: int) -> None:
+        self.user_schedules[user.id] = {
+            'timezone': user.timezone,
+            'hours': (user.news_generation_hour_1, user.news_generation_hour_2),
+            'offset': spread_offset(user.id, self.spread_window, settings.SCHEDULER_SPREAD_SLOTS),
+            'prompts': prompts,
+            'version': next(self._seq)
+        }
+        now = datetime.now(pytz.UTC)
+        for frequency in (UpdateFrequency.HOURLY, UpdateFrequency.DAILY):
+            self._push(user.id, frequency, now)
+
+    def _is_current(self, user_id: int, version: int) -> bool:
+        schedule = self.user_schedules.get(user_id)
+        return schedule is not None and schedule['version'] == version
+
+    async def _dispatch(self):
+        """Sleep until the earliest entry is due, then start every due job."""
         while self.running:
             try:
-                current_time = datetime.now(pytz.UTC)
-                user_time = current_time.astimezone(user_tz)
-
-                should_generate = False
-                if frequency == UpdateFrequency.HOURLY:
-                    if self._should_generate_hourly_news(user, current_time):
-                        should_generate = user_time.minute < 5  # Generate within first 5 minutes of hour
-                else:  # DAILY
-                    # Generate at user's specified hours
-                    should_generate = user_time.hour in [
-                        user.news_generation_hour_1,
-                        user.news_generation_hour_2
-                    ] and user_time.minute < 5
-
-                if should_generate:
-                    await self._generate_news_for_user(user.id, frequency)
-
-                # Calculate next check interval
-                next_interval = self._calculate_next_interval(user, frequency, user_time)
-                await asyncio.sleep(next_interval)
+                # Drop entries of removed or rescheduled users from the top
+                while self._heap and not self._is_current(self._heap[0][2], self._heap[0][4]):
+                    heapq.heappop(self._heap)
+                    metrics.inc("scheduler_skipped", labels={"reason": "rescheduled"})
 
-            except Exception as e:
-                logger.error(f"Error in user scheduling task: {str(e)}")
-                await asyncio.sleep(60)  # Wait a minute before retrying
+                now = datetime.now(pytz.UTC)
+                interval = settings.SCHEDULER_METRICS_INTERVAL
+                if (now - self._last_wave_check).total_seconds() >= interval:
+                    self._last_wave_check = now
+                    self._publish_gauges(now)
+                    await self._check_waves(now)
+                    self._prune_waves(now)
 
-    def _calculate_next_interval(self, user: User, frequency: UpdateFrequency, current_time: datetime) -> int:
-        """Calculate seconds until next run for a user."""
-        if frequency == UpdateFrequency.HOURLY:
-            # Next hour, but skip daily news hours
-            next_time = current_time + timedelta(hours=1)
-            next_time = next_time.replace(minute=0, second=0, microsecond=0)
-            
-            # If next time would be a daily news hour, skip to the hour after
-            while next_time.hour in [user.news_generation_hour_1, user.news_generation_hour_2]:
-                next_time += timedelta(hours=1)
-                
-        else:  # DAILY
-            # Find next news generation hour
-            current_hour = current_time.hour
-            if current_hour < user.news_generation_hour_1:
-                next_time = current_time.replace(hour=user.news_generation_hour_1)
-            elif current_hour < user.news_generation_hour_2:
-                next_time = current_time.replace(hour=user.news_generation_hour_2)
-            else:
-                next_time = current_time.replace(
-                    hour=user.news_generation_hour_1,
-                    day=current_time.day + 1
-                )
-            
-            next_time = next_time.replace(minute=0, second=0, microsecond=0)
+                # Wake at least every metrics interval to keep gauges and wave durations current
+                self._wakeup.clear()
+                delay = (self._heap[0][0] - now).total_seconds() if self._heap else interval
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), min(delay, interval))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
 
-        return int((next_time - current_time).total_seconds())
+                # Group due entries into cohorts firing at the same instant
+                cohorts: Dict[Tuple[datetime, datetime, UpdateFrequency], List[int]] = {}
+                while self._heap and self._heap[0][0] <= now:
+                    fire_at, _, user_id, frequency, version, base = heapq.heappop(self._heap)
+                    if not self._is_current(user_id, version):
+                        continue
+                    wave = self._waves.get((base, frequency))
+                    if wave and not wave["announced"]:
+                        wave["announced"] = True
+                        forecast = self._wave_forecast(base, frequency, wave)
+                        logger.info(
+                            f"Starting {frequency.value} wave {forecast['starts_at']}: {wave['users']} users, "
+                            f"{wave['prompts']} prompts, predicted completion {forecast['predicted_completion']}"
+                        )
+                    cohorts.setdefault((fire_at, base, frequency), []).append(user_id)
+                    # Missed instants (e.g. after a suspend) are skipped, not replayed
+                    if now - fire_at > timedelta(minutes=1):
+                        schedule = self.user_schedules[user_id]
+                        offset = timedelta(seconds=schedule['offset'])
+                        if next_fire_time(schedule['timezone'], schedule['hours'], frequency, fire_at - offset) + offset <= now:
+                            metrics.inc("scheduler_skipped", labels={"reason": "missed_instant", "frequency": frequency.value})
+                    self._push(user_id, frequency, max(fire_at, now))
 
-    def _create_user_tasks(self, user: User) -> Set[asyncio.Task]:
-        """Create scheduling tasks for a user."""
-        return {
-            asyncio.create_task(self._schedule_user_task(user, UpdateFrequency.HOURLY)),
-            asyncio.create_task(self._schedule_user_task(user, UpdateFrequency.DAILY))
-        }
+                for (fire_at, base, frequency), user_ids in cohorts.items():
+                    metrics.observe(
+                        "scheduler_dispatch_lag_seconds",
+                        (now - fire_at).total_seconds(),
+                        {"frequency": frequency.value}
+                    )
+                    await self._enqueue_cohort(fire_at, base, frequency, user_ids)
+
+            except Exception as e:
+                logger.error(f"Error in scheduler dispatcher: {str(e)}")
+                await asyncio.sleep(60)  # Wait a minute before retrying
 
     async def start(self):
         """Start the scheduler for all users."""
         self.running = True
-        
+
         try:
-            # Get all active users
-            users = self.db.query(User).filter(User.is_active == True).all()
-            
-            # Create tasks for each user
-            for user in users:
-                user_tasks = self._create_user_tasks(user)
-                self._tasks.update(user_tasks)
-                self.user_schedules[user.id] = {
-                    'tasks': user_tasks,
-                    'timezone': user.timezone
-                }
-            
+            async with job_session("scheduler") as db:
+                # Get all active users
+                users = db.query(User).filter(User.is_active == True).all()
+                prompt_counts = dict(
+                    db.query(Prompt.user_id, func.count(Prompt.id)).group_by(Prompt.user_id).all()
+                )
+                # Nearly every active user is in each hourly wave
+                self.spread_window = plan_spread_window(sum(prompt_counts.get(user.id, 0) for user in users))
+                logger.info(f"Spreading scheduled runs over {self.spread_window / 60:.1f} minutes")
+
+                for user in users:
+                    try:
+                        self._add_user(user, prompt_counts.get(user.id, 0))
+                    except Exception as e:
+                        logger.error(f"Error scheduling user {user.id}: {str(e)}")
+
+                try:
+                    self._schedule_catch_up(db)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Error scheduling missed-run catch-up: {str(e)}")
+
+            self._dispatcher = asyncio.create_task(self._dispatch())
             logger.info(f"News scheduler started for {len(users)} users")
-            
+
         except Exception as e:
             logger.error(f"Error starting scheduler: {str(e)}")
             await self.stop()
@@ -146,39 +444,98 @@ class NewsScheduler:
     async def stop(self):
         """Stop the scheduler and clean up tasks."""
         self.running = False
-        
-        # Cancel all tasks
-        for task in self._tasks:
-            task.cancel()
-        
-        # Wait for tasks to complete
-        if self._tasks:
-            await asyncio.gather(*self._tasks, return_exceptions=True)
-        
-        self._tasks.clear()
+
+        # Cancel the dispatcher; queued jobs stay in the database
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+
+        self._dispatcher = None
+        self._heap.clear()
+        self._waves.clear()
         self.user_schedules.clear()
+        self._last_wave_check = datetime.min.replace(tzinfo=pytz.UTC)
         logger.info("News scheduler stopped")
 
     async def update_user_schedule(self, user_id: int):
         """Update scheduling for a specific user."""
         try:
-            # Remove existing tasks for the user
-            if user_id in self.user_schedules:
-                old_tasks = self.user_schedules[user_id]['tasks']
-                self._tasks.difference_update(old_tasks)
-                for task in old_tasks:
-                    task.cancel()
-
-            # Create new tasks if user is active
-            user = self.db.query(User).filter(User.id == user_id).first()
-            if user and user.is_active and self.running:
-                new_tasks = self._create_user_tasks(user)
-                self._tasks.update(new_tasks)
-                self.user_schedules[user_id] = {
-                    'tasks': new_tasks,
-                    'timezone': user.timezone
-                }
-                logger.info(f"Updated schedule for user {user_id}")
-                
+            # Existing heap entries for the user become stale
+            self.user_schedules.pop(user_id, None)
+
+            async with job_session("scheduler") as db:
+                user = db.query(User).filter(User.id == user_id).first()
+                if user and user.is_active and self.running:
+                    prompts = db.query(func.count(Prompt.id)).filter(Prompt.user_id == user_id).scalar()
+                    self._add_user(user, prompts or 0)
+                    self._wakeup.set()
+                    logger.info(f"Updated schedule for user {user_id}")
+
         except Exception as e:
-            logger.error(f"Error updating user schedule: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error updating user schedule: {str(e)}")
+
+
+def schedule_snapshot(db: Session, limit: int = 50, waves: int = 24) -> Dict[str, Any]:
+    """
+    Spread window, next fire times and wave forecasts, derived from the database.
+
+    The schedule is a function of the active users' settings and prompt
+    counts, so any process can report it whether or not it runs the
+    scheduler. Waves that have started carry their job progress from
+    generation_jobs.
+    """
+    now = datetime.now(pytz.UTC)
+    users = (
+        db.query(User.id, User.timezone, User.news_generation_hour_1, User.news_generation_hour_2)
+        .filter(User.is_active == True)
+        .all()
+    )
+    prompt_counts = dict(db.query(Prompt.user_id, func.count(Prompt.id)).group_by(Prompt.user_id).all())
+    spread_window = plan_spread_window(sum(prompt_counts.get(user.id, 0) for user in users))
+
+    entries: List[Tuple[datetime, int, UpdateFrequency]] = []
+    totals: Dict[Tuple[datetime, UpdateFrequency], Dict[str, int]] = {}
+    for user in users:
+        hours = (user.news_generation_hour_1, user.news_generation_hour_2)
+        offset = timedelta(seconds=spread_offset(user.id, spread_window, settings.SCHEDULER_SPREAD_SLOTS))
+        for frequency in (UpdateFrequency.HOURLY, UpdateFrequency.DAILY):
+            base = next_fire_time(user.timezone, hours, frequency, now - offset)
+            entries.append((base + offset, user.id, frequency))
+            bases = [base]
+            # The wave this user last fired in, while it may still be running
+            previous = previous_fire_time(user.timezone, hours, frequency, now - offset)
+            if now - previous < timedelta(hours=1):
+                bases.append(previous)
+            for wave_base in bases:
+                wave = totals.setdefault((wave_base, frequency), {"users": 0, "prompts": 0})
+                wave["users"] += 1
+                wave["prompts"] += prompt_counts.get(user.id, 0)
+
+    job_queue = GenerationJobQueue(db)
+    forecasts = []
+    for base, frequency in sorted(totals)[:waves]:
+        wave = totals[(base, frequency)]
+        forecast = wave_forecast(base, frequency, wave["users"], wave["prompts"], spread_window)
+        if base <= now:
+            jobs, unfinished, _ = job_queue.wave_progress(frequency, base, base + timedelta(seconds=spread_window))
+            forecast.update({"jobs": jobs, "unfinished_jobs": unfinished})
+        forecasts.append(forecast)
+
+    return {
+        "spread_window": spread_window,
+        "upcoming": [
+            {"user_id": user_id, "frequency": frequency.value, "fire_at": fire_at.isoformat()}
+            for fire_at, user_id, frequency in heapq.nsmallest(limit, entries)
+        ],
+        "waves": forecasts
+    }
+
+
+def elect_scheduler(scheduler: NewsScheduler) -> LeaderElector:
+    """Run `scheduler` only while this process holds the cluster-wide scheduler lock."""
+    return LeaderElector(
+        "whatsnews:news-scheduler",
+        on_elected=scheduler.start,
+        on_revoked=scheduler.stop,
+        check_interval=settings.SCHEDULER_LEADER_CHECK_INTERVAL
+    )
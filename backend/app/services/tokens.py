@@ -0,0 +1,111 @@
+# app/services/tokens.py
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+import tiktoken
+
+# Articles are joined with a blank line by NewsService._filter_content_by_time
+ARTICLE_SEPARATOR = "\n\n"
+
+# Short strings tokenize too irregularly to say anything about the ratio
+MIN_CALIBRATION_CHARS = 200
+
+
+class TokenCounter:
+    """
+    Token counting with a per-article cache and a calibrated length estimator.
+
+    Exact counts are cached by content hash, so the same article is encoded
+    once no matter how many prompts or frequencies include it. `estimate`
+    avoids encoding altogether using a chars-per-token ratio that is
+    re-calibrated from every exact count (and provider usage report) seen.
+
+    The encoder is loaded by `load_encoder` on the first exact count:
+    tiktoken may download its tables, which importing the app must not do.
+    """
+
+    def __init__(
+        self,
+        load_encoder: Callable[[], tiktoken.Encoding],
+        max_cache_entries: int = 20000,
+        chars_per_token: float = 4.0,
+        calibration_weight: float = 0.05
+    ):
+        self._load_encoder = load_encoder
+        self._encoder: Optional[tiktoken.Encoding] = None
+        self.max_cache_entries = max_cache_entries
+        self.chars_per_token = chars_per_token
+        self.calibration_weight = calibration_weight
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def encoder(self) -> tiktoken.Encoding:
+        if self._encoder is None:
+            self._encoder = self._load_encoder()
+        return self._encoder
+
+    def count(self, text: str) -> int:
+        """Exact token count, bypassing the cache."""
+        tokens = len(self.encoder.encode(text))
+        self.calibrate(len(text), tokens)
+        return tokens
+
+    def count_cached(self, text: str) -> int:
+        """Exact token count, memoized by content hash."""
+        if not text:
+            return 0
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return tokens
+            self._misses += 1
+
+        tokens = self.count(text)
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_articles(self, content: str) -> int:
+        """
+        Token count of feed content, summed over its cached articles.
+
+        Splitting on the article separator can shift a token at each
+        boundary, which is well within the margin the rate limiter needs.
+        """
+        if not content:
+            return 0
+        articles = content.split(ARTICLE_SEPARATOR)
+        separator_tokens = self.count_cached(ARTICLE_SEPARATOR)
+        return sum(self.count_cached(article) for article in articles) + separator_tokens * (len(articles) - 1)
+
+    def estimate(self, text: str) -> int:
+        """Character-based estimate using the calibrated chars-per-token ratio."""
+        if not text:
+            return 0
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def calibrate(self, chars: int, tokens: int) -> None:
+        """Fold an observed (characters, tokens) pair into the ratio."""
+        if chars < MIN_CALIBRATION_CHARS or tokens <= 0:
+            return
+        observed = chars / tokens
+        self.chars_per_token += self.calibration_weight * (observed - self.chars_per_token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "cached_entries": len(self._cache),
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "chars_per_token": round(self.chars_per_token, 3),
+        }
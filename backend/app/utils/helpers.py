@@ -0,0 +1,58 @@
+# app/utils/helpers.py
+import asyncio
+import time
+from typing import Awaitable, Optional, TypeVar
+
+from app.core.exceptions import DeadlineExceeded
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """
+    Absolute point in time by which an operation must complete.
+
+    Created by the caller (API request, scheduler job) and passed down so
+    that every step spends only what is left of the overall budget.
+    ``Deadline(None)`` never expires.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None for no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, what: str = "operation") -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+    def clamp(self, seconds: Optional[float]) -> Optional[float]:
+        """The smaller of `seconds` and the time remaining."""
+        remaining = self.remaining()
+        if remaining is None:
+            return seconds
+        if seconds is None:
+            return remaining
+        return min(seconds, remaining)
+
+    async def run(self, awaitable: Awaitable[T], what: str = "operation") -> T:
+        """Await `awaitable`, cancelling it and raising DeadlineExceeded when time runs out."""
+        if self.expired:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded(f"Deadline exceeded before {what}")
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError as e:
+            # Timeouts raised by the operation itself pass through unchanged
+            if isinstance(e, DeadlineExceeded) or not self.expired:
+                raise
+            raise DeadlineExceeded(f"Deadline exceeded during {what}") from e
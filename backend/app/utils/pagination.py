@@ -0,0 +1,59 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque token for the position just after (created_at, id)."""
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; a malformed token is the client's error (400)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def paginate(
+    query: Query,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of `query`, newest first, and the cursor for the next page.
+
+    With a cursor the page starts right after it: a keyset condition on
+    (created_at, id) that an index on those columns answers without
+    reading the skipped rows, so every page costs the same. Without one,
+    `skip` is still honoured as a plain offset. The next cursor is None on
+    the last page.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    elif skip:
+        query = query.offset(skip)
+
+    # One extra row tells whether another page exists
+    items = query.limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1].created_at, items[-1].id)
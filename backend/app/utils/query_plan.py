@@ -0,0 +1,50 @@
+# app/utils/query_plan.py
+import json
+import re
+from typing import List
+
+from sqlalchemy.orm import Query, Session
+
+
+def explain(db: Session, query: Query, analyze: bool = False) -> List[str]:
+    """PostgreSQL plan for an ORM query, one line per plan row."""
+    connection = db.connection()
+    compiled = query.statement.compile(dialect=connection.dialect)
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    rows = connection.exec_driver_sql(f"EXPLAIN ({options}) {compiled}", compiled.params).all()
+    return [row[0] for row in rows]
+
+
+def estimate_rows(db: Session, query: Query) -> int:
+    """The planner's row estimate for a query, without running it."""
+    connection = db.connection()
+    compiled = query.statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def seq_scanned_tables(plan: List[str]) -> List[str]:
+    """Tables the plan reads in full."""
+    return [match.group(1) for match in (re.search(r"Seq Scan on (\w+)", line) for line in plan) if match]
+
+
+def sorts_table(plan: List[str], table: str) -> bool:
+    """
+    True if the plan sorts rows it read from `table` with a full scan.
+
+    A listing backed by an index on its ORDER BY reads rows in order and
+    stops at its LIMIT; a Sort over a Seq Scan reads the whole table first.
+    """
+    sort_depth = None
+    for line in plan:
+        node = line.strip()
+        depth = len(line) - len(line.lstrip())
+        if sort_depth is not None and node.startswith("->") and depth <= sort_depth:
+            sort_depth = None  # left the Sort's subtree
+        if sort_depth is None and re.match(r"(->\s+)?Sort\b", node):
+            sort_depth = depth
+        elif sort_depth is not None and re.match(rf"(->\s+)?(Parallel )?Seq Scan on {table}\b", node):
+            return True
+    return False
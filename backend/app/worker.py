@@ -0,0 +1,108 @@
+# app/worker.py
+"""
+Standalone scheduling and generation process.
+
+Run with ``python -m app.worker`` next to an API started with
+``SCHEDULER_ENABLED=false GENERATION_WORKER_ENABLED=false`` so generation
+waves never share an event loop or database session with API requests.
+Any number of workers can share the durable job queue, and only the elected
+leader among them schedules. Each has its own job concurrency and, through
+the usual environment variables, its own LLM concurrency bounds, and serves
+its own Prometheus metrics on ``--metrics-port``.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from typing import Optional
+
+from aiohttp import web
+
+from app.config.settings import get_settings
+from app.core.metrics import metrics
+from app.services.generation_worker import GenerationWorker
+from app.services.job_queue import publish_queue_depth
+from app.services.scheduler import NewsScheduler, elect_scheduler
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def serve_metrics(port: int) -> web.AppRunner:
+    """Serve this process's metrics at /metrics for Prometheus to scrape."""
+    async def handle(request: web.Request) -> web.Response:
+        await asyncio.to_thread(publish_queue_depth)
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    logger.info(f"Serving metrics on port {port}")
+    return runner
+
+
+async def run(
+    concurrency: int,
+    with_scheduler: bool,
+    worker_id: Optional[str] = None,
+    metrics_port: int = 0
+) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    election = elect_scheduler(NewsScheduler()) if with_scheduler else None
+    worker = GenerationWorker(worker_id=worker_id, concurrency=concurrency)
+    metrics_runner = await serve_metrics(metrics_port) if metrics_port else None
+    try:
+        if election:
+            await election.start()
+        await worker.start()
+        await stop.wait()
+        logger.info("Shutting down worker...")
+    finally:
+        if election:
+            await election.stop()
+        await worker.stop()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the WhatsNews scheduler and generation worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.GENERATION_WORKER_CONCURRENCY,
+        help="Generation jobs run at once"
+    )
+    parser.add_argument("--no-scheduler", action="store_true", help="Only run queued jobs, never stand for scheduler leadership")
+    parser.add_argument("--worker-id", default=None, help="Lease owner name (default: host:pid:random)")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.WORKER_METRICS_PORT,
+        help="Port serving Prometheus /metrics (0 disables)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(run(
+        args.concurrency,
+        with_scheduler=not args.no_scheduler,
+        worker_id=args.worker_id,
+        metrics_port=args.metrics_port
+    ))
+
+
+if __name__ == "__main__":
+    main()
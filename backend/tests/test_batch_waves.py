@@ -0,0 +1,26 @@
+# tests/test_batch_waves.py
+"""Daily cohorts hand their prompts to wave jobs without waiting for the wave."""
+from sqlalchemy import func
+
+
+def test_cohorts_join_the_pending_wave_until_it_is_claimed(db):
+    from app.models.generation_job import GenerationJob
+    from app.services.batch_jobs import DailyBatchService
+    from app.services.job_queue import GenerationJobQueue
+
+    service = DailyBatchService()
+    wave_at = service.hand_off(db, [1, 2])
+    assert service.hand_off(db, [3]) == wave_at
+    wave = db.query(GenerationJob).filter(GenerationJob.batch_wave.is_(True)).one()
+    assert sorted(wave.prompt_ids) == [1, 2, 3]
+    assert wave.run_after == wave_at
+
+    db.query(GenerationJob).update({GenerationJob.run_after: func.now()})
+    db.commit()
+    assert [job.id for job in GenerationJobQueue(db).claim("worker")] == [wave.id]
+
+    # Its prompts are fixed once claimed: later cohorts start a new wave
+    later = service.hand_off(db, [4])
+    assert later > wave_at
+    waves = db.query(GenerationJob).filter(GenerationJob.batch_wave.is_(True)).order_by(GenerationJob.id).all()
+    assert [sorted(job.prompt_ids) for job in waves] == [[1, 2, 3], [4]]
@@ -0,0 +1,80 @@
+# tests/test_generation_sessions.py
+"""Generation must not keep a transaction (and its pooled connection) open while waiting on the LLM."""
+import asyncio
+from datetime import datetime, timezone
+
+from app.models.news import UpdateFrequency
+
+
+def fresh_feeds():
+    return [{
+        "url": "https://example.com/feed",
+        "entries": [{"title": "Story", "description": "Details", "published": datetime.now(timezone.utc).isoformat()}],
+    }]
+
+
+def fake_llm(monkeypatch, service, db):
+    """Replace the LLM calls; returns whether a transaction was open at each call."""
+    open_at_call = []
+
+    async def generate_summary(**kwargs):
+        open_at_call.append(db.in_transaction())
+        return "Summary"
+
+    async def generate_batch_summary(**kwargs):
+        open_at_call.append(db.in_transaction())
+        return {}  # unanswered: every prompt falls back to its own call
+
+    monkeypatch.setattr(service.llm_service, "generate_summary", generate_summary)
+    monkeypatch.setattr(service.llm_service, "generate_batch_summary", generate_batch_summary)
+    return open_at_call
+
+
+def test_batch_generation_holds_no_transaction_across_llm_calls(db, factory, monkeypatch):
+    from app.services.news import NewsService
+
+    owner = factory.user()
+    prompt_ids = [factory.prompt(owner).id for _ in range(3)]
+    service = NewsService(db)
+    open_at_call = fake_llm(monkeypatch, service, db)
+
+    outcome = asyncio.run(service.generate_news_batch(prompt_ids, UpdateFrequency.HOURLY, fresh_feeds()))
+
+    assert sorted(outcome.generated) == sorted(prompt_ids)
+    assert len(open_at_call) == 4
+    assert not any(open_at_call)
+
+
+def test_single_generation_holds_no_transaction_across_the_llm_call(db, factory, monkeypatch):
+    from app.services.news import NewsService
+
+    prompt_id = factory.prompt(factory.user()).id
+    service = NewsService(db)
+    open_at_call = fake_llm(monkeypatch, service, db)
+
+    assert asyncio.run(service.generate_news(prompt_id, UpdateFrequency.HOURLY, fresh_feeds())) is not None
+    assert open_at_call == [False]
+
+
+def test_streaming_holds_no_transaction_while_tokens_arrive(db, factory, monkeypatch):
+    from app.services.news import NewsService
+
+    prompt_id = factory.prompt(factory.user()).id
+    service = NewsService(db)
+    open_at_token = []
+
+    async def stream_summary(**kwargs):
+        for token in ("Sum", "mary"):
+            open_at_token.append(db.in_transaction())
+            yield token
+
+    monkeypatch.setattr(service.llm_service, "stream_summary", stream_summary)
+
+    async def consume():
+        return [event async for event in service.stream_news(prompt_id, UpdateFrequency.HOURLY, fresh_feeds())]
+
+    events = asyncio.run(consume())
+    assert [event["event"] for event in events] == ["token", "token", "done"]
+    assert events[-1]["data"]["content"] == "Summary"
+    assert open_at_token == [False, False]
+    assert not db.in_transaction()
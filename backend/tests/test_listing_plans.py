@@ -0,0 +1,133 @@
+# tests/test_listing_plans.py
+"""
+EXPLAIN regressions for the listing endpoints.
+
+Each listing must be served by an index that yields its ORDER BY, reading
+only the rows of one page. Test tables are too small for the planner to
+prefer an index on its own, so sequential scans are priced out: a listing
+without a matching index then shows up as a Sort.
+"""
+import re
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import event, text
+
+from app.core.database import engine as app_engine
+from app.models.news import UpdateFrequency
+from app.models.prompt import VisibilityType
+from app.services.news import NewsService
+from app.services.prompt import PromptService
+from app.utils.query_plan import seq_scanned_tables, sorts_table
+
+
+@contextmanager
+def captured_listings() -> Iterator[List[Tuple[str, object]]]:
+    """Ordered SELECTs run inside the block, with their parameters."""
+    statements: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "ORDER BY" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(app_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(app_engine, "before_cursor_execute", capture)
+
+
+def plans_of(db, run) -> List[List[str]]:
+    with captured_listings() as statements:
+        run()
+    assert statements, "the listing ran no ordered query"
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    connection = db.connection()
+    return [
+        [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+        for statement, parameters in statements
+    ]
+
+
+def has_sort(plan: List[str]) -> bool:
+    return any(re.match(r"(->\s+)?(Incremental )?Sort\b", line.strip()) for line in plan)
+
+
+def assert_index_ordered(plans: List[List[str]], table: str) -> None:
+    for plan in plans:
+        text_plan = "\n".join(plan)
+        assert table not in seq_scanned_tables(plan), text_plan
+        assert not sorts_table(plan, table), text_plan
+        assert not has_sort(plan), text_plan
+
+
+@pytest.fixture
+def listings(db, factory):
+    """Two owners with prompts of every visibility, each with news at both frequencies."""
+    owner = factory.user()
+    other = factory.user()
+    prompts = [
+        factory.prompt(user, visibility=visibility)
+        for user in (owner, other)
+        for visibility in VisibilityType
+        for _ in range(5)
+    ]
+    for frequency in UpdateFrequency:
+        factory.news(prompts, per_prompt=20, frequency=frequency, bulk=True)
+    db.execute(text("ANALYZE"))
+    db.commit()
+    public = next(p for p in prompts if p.user_id == owner.id and p.visibility == VisibilityType.PUBLIC)
+    return {"owner": owner, "prompt": public}
+
+
+NEWS_LISTINGS = {
+    "public": lambda service, data: service.get_public_news(limit=20, include_total=False),
+    "public_by_frequency": lambda service, data: service.get_public_news(
+        limit=20, frequency=UpdateFrequency.DAILY, include_total=False
+    ),
+    "public_by_prompt": lambda service, data: service.get_public_news(
+        limit=20, prompt_id=data["prompt"].id, include_total=False
+    ),
+    "prompt_page": lambda service, data: service.get_news_by_prompt_path(
+        data["owner"].username, data["prompt"].slug, data["owner"], limit=20, include_total=False
+    ),
+    "prompt_page_by_frequency": lambda service, data: service.get_news_by_prompt_path(
+        data["owner"].username, data["prompt"].slug, data["owner"],
+        limit=20, frequency=UpdateFrequency.HOURLY, include_total=False
+    ),
+    "user_feed": lambda service, data: service.get_user_news(data["owner"], limit=20, include_total=False),
+    "latest_public": lambda service, data: service.get_latest_public_news(limit=10),
+}
+
+
+@pytest.mark.parametrize("listing", sorted(NEWS_LISTINGS))
+def test_news_listing_uses_an_ordered_index(db, listings, listing):
+    service = NewsService(db)
+    plans = plans_of(db, lambda: NEWS_LISTINGS[listing](service, listings))
+    assert_index_ordered(plans, "news")
+
+
+def test_news_next_page_uses_an_ordered_index(db, listings):
+    service = NewsService(db)
+    first = service.get_public_news(limit=20, include_total=False)
+    assert first.next_cursor
+    plans = plans_of(db, lambda: service.get_public_news(limit=20, cursor=first.next_cursor, include_total=False))
+    assert_index_ordered(plans, "news")
+
+
+PROMPT_LISTINGS = {
+    "own": lambda service, data: service.get_prompts(
+        data["owner"], limit=5, include_internal=False, include_public=False
+    ),
+    "visible": lambda service, data: service.get_prompts(data["owner"], limit=5),
+    "public": lambda service, data: service.get_public_prompts(limit=5),
+    "internal": lambda service, data: service.get_internal_prompts(data["owner"], limit=5),
+}
+
+
+@pytest.mark.parametrize("listing", sorted(PROMPT_LISTINGS))
+def test_prompt_listing_uses_an_ordered_index(db, listings, listing):
+    service = PromptService(db)
+    plans = plans_of(db, lambda: PROMPT_LISTINGS[listing](service, listings))
+    assert_index_ordered(plans, "prompts")
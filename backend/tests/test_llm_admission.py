@@ -0,0 +1,39 @@
+# tests/test_llm_admission.py
+"""Admission of LLM requests against the rate limiter."""
+import asyncio
+
+
+def test_every_attempt_is_charged_a_request_but_tokens_only_once(monkeypatch):
+    import app.services.llm as llm
+    from app.services.llm_providers import CompletionResult
+    from app.services.llm_queue import JobPriority
+    from app.utils.helpers import Deadline
+
+    service = llm.llm_service
+    pool = service.default_pool
+    charged = []
+    attempts = iter([RuntimeError("502 from upstream"), RuntimeError("timed out"), CompletionResult(content="ok")])
+
+    async def acquire(tokens, reserve=0.0):
+        charged.append(tokens)
+        return 0.0
+
+    async def complete(payload, timeout=None):
+        outcome = next(attempts)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(pool.rate_limiter, "acquire", acquire)
+    monkeypatch.setattr(service.provider, "complete", complete)
+    monkeypatch.setattr(llm, "sleep", no_sleep)
+
+    payload = {"messages": [{"role": "user", "content": "Summarize"}]}
+    result = asyncio.run(service._complete(pool, payload, 500, JobPriority.SCHEDULED, Deadline(), max_retries=3))
+
+    assert result.content == "ok"
+    # One acquire (one request) per attempt; the tokens are reserved by the first only
+    assert charged == [500, 0, 0]
@@ -0,0 +1,14 @@
+# tests/test_llm_providers.py
+import pytest
+
+from app.services.llm_providers import OpenAICompatibleProvider
+
+
+@pytest.mark.parametrize("api_base, batches, expected", [
+    ("https://api.openai.com/v1", None, True),
+    ("http://localhost:8080/v1", None, False),  # llama.cpp, vLLM, Ollama: no /files or /batches
+    ("http://localhost:8000/v1", True, True),
+    ("https://api.openai.com/v1", False, False),
+])
+def test_batch_support_is_configured_per_server(api_base, batches, expected):
+    assert OpenAICompatibleProvider(api_base, batches=batches).supports_batches is expected
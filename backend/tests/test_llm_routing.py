@@ -0,0 +1,18 @@
+# tests/test_llm_routing.py
+import pytest
+
+from app.services.llm_routing import ModelRoute, check_shared_models
+
+DEFAULT = ModelRoute(name="default", model="gpt-4o-mini", max_tokens=1000)
+
+
+def test_routes_on_one_model_must_agree_on_its_limits():
+    cheap = ModelRoute(name="hourly", model="gpt-4o-mini", max_tokens=600, tokens_per_minute=5000)
+    with pytest.raises(ValueError, match="tokens_per_minute"):
+        check_shared_models([DEFAULT, cheap], requests_per_minute=50, tokens_per_minute=15000)
+
+
+def test_routes_repeating_the_shared_limits_are_accepted():
+    same = ModelRoute(name="hourly", model="gpt-4o-mini", max_tokens=600, tokens_per_minute=15000)
+    other = ModelRoute(name="long", model="gpt-4o", max_tokens=2000, tokens_per_minute=30000)
+    check_shared_models([DEFAULT, same, other], requests_per_minute=50, tokens_per_minute=15000)
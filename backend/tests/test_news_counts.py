@@ -0,0 +1,77 @@
+# tests/test_news_counts.py
+"""news_counts must match COUNT(*) over news after every ORM change."""
+from typing import Dict, Tuple
+
+from sqlalchemy import func
+
+from app.core.query_budget import count_queries
+from app.models.news import News, UpdateFrequency
+from app.models.news_count import NewsCount
+from app.services.news import NewsService
+from app.services.prompt import PromptService
+
+
+def stored_counts(db) -> Dict[Tuple[int, UpdateFrequency], int]:
+    return {
+        (row.prompt_id, row.frequency): row.total
+        for row in db.query(NewsCount).all()
+        if row.total
+    }
+
+
+def actual_counts(db) -> Dict[Tuple[int, UpdateFrequency], int]:
+    return {
+        (prompt_id, frequency): total
+        for prompt_id, frequency, total in
+        db.query(News.prompt_id, News.frequency, func.count(News.id))
+        .group_by(News.prompt_id, News.frequency)
+        .all()
+    }
+
+
+def test_counts_follow_inserts_deletes_and_frequency_changes(db, factory):
+    owner = factory.user()
+    first, second = factory.prompt(owner), factory.prompt(owner)
+    ids = factory.news([first], per_prompt=3)
+    factory.news([second], per_prompt=2, frequency=UpdateFrequency.DAILY)
+    assert stored_counts(db) == actual_counts(db) == {
+        (first.id, UpdateFrequency.HOURLY): 3,
+        (second.id, UpdateFrequency.DAILY): 2,
+    }
+
+    NewsService(db).delete_news(ids[0], owner)
+    assert stored_counts(db) == actual_counts(db)
+
+    item = db.get(News, ids[1])
+    item.frequency = UpdateFrequency.DAILY
+    db.commit()
+    assert stored_counts(db) == actual_counts(db) == {
+        (first.id, UpdateFrequency.HOURLY): 1,
+        (first.id, UpdateFrequency.DAILY): 1,
+        (second.id, UpdateFrequency.DAILY): 2,
+    }
+
+    item.prompt_id = second.id
+    db.commit()
+    assert stored_counts(db) == actual_counts(db)
+
+
+def test_deleting_a_prompt_drops_its_counts_without_per_item_updates(db, factory):
+    owner = factory.user()
+    small, large, kept = factory.prompt(owner), factory.prompt(owner), factory.prompt(owner)
+    factory.news([small], per_prompt=1)
+    factory.news([large], per_prompt=10)
+    factory.news([kept], per_prompt=2)
+    service = PromptService(db)
+
+    statements = []
+    for prompt in (small, large):
+        prompt_id = prompt.id
+        db.expire_all()
+        with count_queries() as queries:
+            service.delete_prompt(prompt_id, owner)
+        statements.append(queries.count)
+        assert not db.query(NewsCount).filter(NewsCount.prompt_id == prompt_id).count()
+
+    assert statements[0] == statements[1]
+    assert stored_counts(db) == actual_counts(db) == {(kept.id, UpdateFrequency.HOURLY): 2}
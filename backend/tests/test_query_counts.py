@@ -0,0 +1,104 @@
+# tests/test_query_counts.py
+"""
+Listings must run a constant number of queries, however many rows they return.
+
+Each listing, serialized the way its endpoint does, is counted once over a
+single row per prompt and owner/visibility, then again after the data
+grows; the two counts must be equal, so no query runs per row.
+"""
+import pytest
+
+from app.core.query_budget import count_queries
+from app.models.prompt import Prompt, VisibilityType
+from app.models.user import User
+from app.schemas.prompt import Prompt as PromptSchema, PromptWithStats
+from app.services.news import NewsService
+from app.services.news_counts import _totals
+from app.services.prompt import PromptService
+
+ROWS = 8
+
+
+@pytest.fixture
+def listing_data(db, factory):
+    """Grows by `rows` prompts per owner and visibility, and `rows` news per prompt."""
+    owner_id, other_id = factory.user().id, factory.user().id
+
+    def grow(rows: int) -> dict:
+        # Reloaded each time: queries_for() detaches everything
+        owner, other = db.get(User, owner_id), db.get(User, other_id)
+        for user in (owner, other):
+            for visibility in VisibilityType:
+                for _ in range(rows):
+                    factory.prompt(user, visibility=visibility)
+        prompts = db.query(Prompt).order_by(Prompt.id).all()
+        factory.news(prompts, per_prompt=rows)
+        public = next(p for p in prompts if p.user_id == owner_id and p.visibility == VisibilityType.PUBLIC)
+        return {"owner_id": owner_id, "username": owner.username, "prompt_id": public.id, "slug": public.slug}
+
+    return grow
+
+
+def queries_for(db, service_class, listing, data) -> int:
+    """Statements run by one listing, starting from an empty session and totals cache."""
+    db.expunge_all()
+    _totals._entries.clear()
+    owner = db.get(User, data["owner_id"])
+    with count_queries() as queries:
+        listing(service_class(db), owner, data)
+    return queries.count
+
+
+def assert_constant(db, listing_data, service_class, listing) -> None:
+    one = queries_for(db, service_class, listing, listing_data(1))
+    many = queries_for(db, service_class, listing, listing_data(ROWS - 1))
+    assert one == many, f"{one} queries for one row, {many} for {ROWS}"
+
+
+NEWS_LISTINGS = {
+    "public": lambda service, owner, data: service.get_public_news(),
+    "public_by_prompt": lambda service, owner, data: service.get_public_news(prompt_id=data["prompt_id"]),
+    "prompt_page": lambda service, owner, data: service.get_news_by_prompt_path(
+        data["username"], data["slug"], owner
+    ),
+    "user_feed": lambda service, owner, data: service.get_user_news(owner),
+    "user_feed_by_prompt": lambda service, owner, data: service.get_user_news(owner, prompt_id=data["prompt_id"]),
+    "latest_public": lambda service, owner, data: service.get_latest_public_news(limit=100),
+}
+
+
+@pytest.mark.parametrize("listing", sorted(NEWS_LISTINGS))
+def test_news_listing_query_count_is_constant(db, listing_data, listing):
+    assert_constant(db, listing_data, NewsService, NEWS_LISTINGS[listing])
+
+
+def serialized(page):
+    prompts, _ = page
+    return [PromptSchema.model_validate(prompt) for prompt in prompts]
+
+
+def serialized_with_stats(service, page):
+    prompts, _ = page
+    return [
+        PromptWithStats(
+            **PromptSchema.model_validate(item["prompt"]).model_dump(),
+            news_count=item["news_count"]
+        )
+        for item in service.with_news_stats(prompts)
+    ]
+
+
+PROMPT_LISTINGS = {
+    "own": lambda service, owner, data: serialized(
+        service.get_prompts(owner, include_internal=False, include_public=False)
+    ),
+    "visible": lambda service, owner, data: serialized(service.get_prompts(owner)),
+    "public": lambda service, owner, data: serialized(service.get_public_prompts()),
+    "internal": lambda service, owner, data: serialized(service.get_internal_prompts(owner)),
+    "with_stats": lambda service, owner, data: serialized_with_stats(service, service.get_prompts(owner)),
+}
+
+
+@pytest.mark.parametrize("listing", sorted(PROMPT_LISTINGS))
+def test_prompt_listing_query_count_is_constant(db, listing_data, listing):
+    assert_constant(db, listing_data, PromptService, PROMPT_LISTINGS[listing])
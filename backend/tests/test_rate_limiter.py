@@ -0,0 +1,36 @@
+# tests/test_rate_limiter.py
+"""Shared rate-limit budgets: priority headroom across processes."""
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import LocalRateLimitBackend, SQLiteRateLimitBackend
+
+RPM, TPM = 60, 6000
+
+
+def shared_backends(kind, tmp_path):
+    """An API process's and a worker process's view of the same budget."""
+    if kind == "local":
+        backend = LocalRateLimitBackend(RPM, TPM)
+        return backend, backend
+    path = str(tmp_path / "ledger.db")
+    return (
+        SQLiteRateLimitBackend(path, "model", RPM, TPM),
+        SQLiteRateLimitBackend(path, "model", RPM, TPM),
+    )
+
+
+@pytest.mark.parametrize("kind", ["local", "sqlite"])
+def test_scheduled_work_leaves_the_reserve_to_interactive_requests(kind, tmp_path):
+    api, worker = shared_backends(kind, tmp_path)
+
+    async def scenario():
+        # The worker's wave may spend down to the 20% reserve, but not into it
+        assert await worker.try_acquire(1, 4700, reserve=0.2) == 0
+        assert await worker.try_acquire(1, 300, reserve=0.2) > 0
+        # An interactive request in the other process still gets through at once
+        assert await api.try_acquire(1, 1000) == 0
+        assert await api.available_tokens() < 400
+
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+# tests/test_scheduler.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.models.news import UpdateFrequency
+
+
+def test_leaders_with_different_spread_windows_enqueue_a_cohort_once(db):
+    from app.models.generation_job import GenerationJob
+    from app.services.scheduler import NewsScheduler
+
+    base = datetime(2026, 1, 1, 8, tzinfo=timezone.utc)
+    first, failover = NewsScheduler(), NewsScheduler()
+    first.spread_window, failover.spread_window = 900.0, 1800.0
+
+    async def fire_both():
+        # Same slot, so the same users, but offsets scaled by each leader's window
+        await first._enqueue_cohort(base + timedelta(seconds=300), base, UpdateFrequency.DAILY, [1, 2])
+        await failover._enqueue_cohort(base + timedelta(seconds=600), base, UpdateFrequency.DAILY, [2, 1])
+
+    asyncio.run(fire_both())
+    assert db.query(GenerationJob).count() == 1